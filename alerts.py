@@ -0,0 +1,238 @@
+"""
+Regole di allarme valutate a ogni campione
+
+Le regole sono dichiarate in config.json e compilate all'avvio in un
+operatore e una soglia, quindi la valutazione di un campione costa un
+confronto per regola. Isteresi (soglia di rientro), durata minima e limiti
+di frequenza evitano che una metrica che oscilla intorno alla soglia
+generi una raffica di notifiche.
+"""
+
+import operator
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+# "metrica operatore numero", es. "cpu > 95" o "wifi_signal_dbm < -80"
+_CONDITION = re.compile(r'^\s*([A-Za-z_][\w:.]*)\s*(>=|<=|==|!=|>|<)\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+class AlertRule:
+    """
+    Regola compilata con il suo stato
+
+    Scatta quando la condizione è vera per almeno for_seconds; rientra
+    quando il valore non supera più la soglia di rientro (clear, di default
+    uguale alla soglia). Es. "cpu > 95" con clear 90 resta attiva finché la
+    CPU è sopra il 90%.
+    """
+
+    __slots__ = ('name', 'condition', 'metric', 'test', 'threshold', 'clear', 'for_seconds',
+                 'severity', 'cooldown', 'pending_since', 'firing', 'value',
+                 'notified', 'last_notified', 'deferred', 'fired', 'suppressed')
+
+    def __init__(self, spec: Dict, cooldown: float = 300):
+        """
+        Args:
+            spec: name, condition e opzionali for_seconds, clear, severity,
+                  cooldown_seconds
+            cooldown: Secondi minimi tra due notifiche di attivazione
+
+        Raises:
+            ValueError: Se la regola non è valida
+        """
+        match = _CONDITION.match(str(spec.get('condition', '')))
+        if match is None:
+            raise ValueError(f"Condizione non valida: {spec.get('condition')!r}")
+        self.metric, op, threshold = match.groups()
+        self.name = spec.get('name') or match.group(0).strip()
+        self.condition = f'{self.metric} {op} {threshold}'
+        self.test = OPERATORS[op]
+        self.threshold = float(threshold)
+        self.clear = float(spec.get('clear', self.threshold))
+        self.for_seconds = float(spec.get('for_seconds', 0))
+        self.severity = spec.get('severity', 'warning')
+        self.cooldown = float(spec.get('cooldown_seconds', cooldown))
+
+        self.pending_since: Optional[float] = None
+        self.firing = False
+        self.value: Optional[float] = None
+        # Ultimo stato notificato, quando, e se un cambio di stato è in attesa
+        self.notified = False
+        self.last_notified = -float('inf')
+        self.deferred = False
+        self.fired = 0
+        self.suppressed = 0
+
+    def update(self, now: float, value: float):
+        """Aggiorna lo stato con un nuovo valore"""
+        self.value = value
+        if self.firing:
+            if not self.test(value, self.clear):
+                self.firing = False
+                self.pending_since = None
+            return
+
+        if not self.test(value, self.threshold):
+            self.pending_since = None
+            return
+        if self.pending_since is None:
+            self.pending_since = now
+        if now - self.pending_since >= self.for_seconds:
+            self.firing = True
+            self.fired += 1
+
+
+class AlertEngine:
+    """
+    Valuta le regole sui valori di ogni campione e notifica i cambi di stato
+
+    Le notifiche sincronizzano lo stato della regola con il destinatario:
+    l'attivazione è notificata subito, poi non prima di cooldown secondi
+    dalla notifica precedente; il rientro è notificato subito se era stata
+    notificata l'attivazione. Oltre max_per_hour notifiche in un'ora le
+    successive attendono: una regola che oscilla produce al più due
+    notifiche per cooldown e le oscillazioni intermedie sono solo contate.
+    """
+
+    def __init__(self, rules: List[Dict], notify: Callable[[Dict], None],
+                 device_id: str = '', cooldown: float = 300, max_per_hour: int = 20,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rules: Regole da config.json (compilate qui, una volta)
+            notify: Funzione che invia una notifica (non deve bloccare)
+            device_id: ID del dispositivo nelle notifiche
+            cooldown: Secondi minimi predefiniti tra due attivazioni notificate
+            max_per_hour: Notifiche massime in un'ora (tutte le regole)
+
+        Le regole non valide o con nome duplicato vengono scartate e
+        descritte in errors.
+        """
+        self.rules: List[AlertRule] = []
+        self.errors: List[str] = []
+        for spec in rules:
+            try:
+                rule = AlertRule(spec, cooldown)
+            except (ValueError, TypeError, AttributeError) as e:
+                self.errors.append(f"Regola {spec!r} scartata: {e}")
+                continue
+            if any(existing.name == rule.name for existing in self.rules):
+                self.errors.append(f"Regola {rule.name!r} scartata: nome duplicato")
+                continue
+            self.rules.append(rule)
+        self.notify = notify
+        self.device_id = device_id
+        self.max_per_hour = max_per_hour
+        self.clock = clock
+        self._sent: List[float] = []
+        # evaluate gira nel thread di campionamento, summary in quello di invio
+        self._lock = threading.Lock()
+        # Metriche usate dalle regole, per leggere solo quelle necessarie
+        self.metrics = {rule.metric for rule in self.rules}
+
+    def adopt(self, previous: 'AlertEngine'):
+        """
+        Riprende lo stato di un motore precedente (ricarica della configurazione)
+
+        Le regole con lo stesso nome e la stessa condizione mantengono stato,
+        conteggi e ultima notifica, così una regola attiva non viene notificata
+        di nuovo; le altre ripartono da zero.
+        """
+        rules = {rule.name: rule for rule in previous.rules}
+        with previous._lock:
+            for rule in self.rules:
+                old = rules.get(rule.name)
+                if old is not None and old.condition == rule.condition:
+                    for attr in ('pending_since', 'firing', 'value', 'notified', 'last_notified',
+                                 'deferred', 'fired', 'suppressed'):
+                        setattr(rule, attr, getattr(old, attr))
+            self._sent = list(previous._sent)
+
+    def evaluate(self, values: Dict[str, Optional[float]], now: Optional[float] = None):
+        """
+        Valuta tutte le regole su un campione
+
+        Args:
+            values: Valori del campione; le metriche assenti o None lasciano
+                    invariato lo stato della regola
+        """
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            for rule in self.rules:
+                value = values.get(rule.metric)
+                if value is not None:
+                    rule.update(now, value)
+                if rule.firing != rule.notified:
+                    self._sync(rule, now)
+                else:
+                    # Tornata allo stato notificato prima che la notifica partisse
+                    rule.deferred = False
+
+    def _sync(self, rule: AlertRule, now: float):
+        """Notifica lo stato corrente della regola se i limiti lo consentono"""
+        # Finestra scorrevole di un'ora per il limite globale
+        while self._sent and now - self._sent[0] >= 3600:
+            self._sent.pop(0)
+        if ((rule.firing and now - rule.last_notified < rule.cooldown)
+                or len(self._sent) >= self.max_per_hour):
+            # Conta una volta ogni cambio di stato rimandato
+            if not rule.deferred:
+                rule.suppressed += 1
+                rule.deferred = True
+            return
+
+        self._sent.append(now)
+        rule.notified = rule.firing
+        rule.last_notified = now
+        rule.deferred = False
+        self.notify({
+            'device_id': self.device_id,
+            'timestamp': datetime.now().isoformat(),
+            'rule': rule.name,
+            'state': 'firing' if rule.firing else 'resolved',
+            'severity': rule.severity,
+            'condition': rule.condition,
+            'value': rule.value,
+            'duration_seconds': round(now - rule.pending_since, 1) if rule.firing and rule.pending_since is not None else None,
+            'fired': rule.fired,
+            'suppressed': rule.suppressed
+        })
+
+    def summary(self, reset: bool = False) -> Dict:
+        """
+        Stato delle regole per il payload del periodo
+
+        Args:
+            reset: Azzera i conteggi (fine periodo)
+        """
+        with self._lock:
+            return self._summary(reset)
+
+    def _summary(self, reset: bool) -> Dict:
+        result = {
+            'firing': [rule.name for rule in self.rules if rule.firing],
+            'rules': {
+                rule.name: {'active': rule.firing, 'fired': rule.fired, 'value': rule.value}
+                for rule in self.rules
+            },
+            'suppressed': sum(rule.suppressed for rule in self.rules)
+        }
+        if reset:
+            for rule in self.rules:
+                rule.fired = 0
+                rule.suppressed = 0
+        return result
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark dei percorsi principali del monitor: campionamento, aggregazione,
+serializzazione e invio a un server HTTP locale
+
+Esempio:
+    python benchmark.py --output bench-nuovo.json --compare bench-vecchio.json
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import logging
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from monitor import SystemMonitor
+from wire import CONTENT_TYPE_CBOR, DecodeError, apply_delta, decode_cbor, expand_keys
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+TOKEN = 'benchmark-token'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Server di prova come test_server.py, ma solo con la libreria standard e senza output"""
+
+    protocol_version = 'HTTP/1.1'
+    # Intestazioni e corpo sono scritti separatamente: con Nagle ogni risposta
+    # attenderebbe l'ACK ritardato (~40 ms) e misureremmo quello
+    disable_nagle_algorithm = True
+
+    # Ultimo payload ricevuto per dispositivo, base dei payload differenziali (api_delta)
+    last_payloads: Dict = {}
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Authorization') != f'Bearer {TOKEN}':
+            return self._reply(401, {'error': 'Invalid token'})
+        try:
+            encoding = self.headers.get('Content-Encoding', '')
+            if encoding == 'gzip':
+                body = gzip.decompress(body)
+            elif encoding == 'zstd':
+                body = zstandard.ZstdDecompressor().decompress(body)
+            if self.headers.get('Content-Type', '').split(';')[0].strip() == CONTENT_TYPE_CBOR:
+                data = expand_keys(decode_cbor(body))
+            else:
+                data = json.loads(body)
+        except (DecodeError, ValueError, OSError) as e:
+            return self._reply(400, {'error': f'Invalid body: {e}'})
+
+        # Payload differenziali ricostruiti come in test_server.py
+        items = data if isinstance(data, list) else [data]
+        try:
+            for item in items:
+                item = apply_delta(item, self.last_payloads.get(item.get('device_id')))
+                self.last_payloads[item.get('device_id')] = item
+        except KeyError:
+            return self._reply(409, {'error': 'Unknown delta base'})
+        self._reply(200, {'status': 'success'})
+
+    def _reply(self, status: int, data: Dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    """Avvia il server di prova su una porta libera di localhost"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, name='bench-server', daemon=True).start()
+    return server
+
+
+def rss_mb() -> float:
+    """RSS attuale del processo in MB (da /proc/self/statm)"""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / (1024**2)
+
+
+def peak_rss_mb() -> float:
+    """RSS massimo del processo in MB (ru_maxrss è in KiB su Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Percentile con interpolazione lineare su una lista ordinata"""
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(func: Callable[[], object], iterations: int, warmup: int = 3) -> Dict:
+    """
+    Misura tempi e allocazioni di una funzione
+
+    I tempi sono misurati senza tracemalloc (che rallenta ogni allocazione);
+    le allocazioni in un secondo passaggio con tracemalloc attivo.
+
+    Returns:
+        ops_per_s, latenze (p50, p90, p99, max, media) in ms, byte
+        trattenuti per chiamata, picco di memoria allocata e RSS
+    """
+    for _ in range(warmup):
+        func()
+
+    gc.collect()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    ordered = sorted(durations)
+    total_s = sum(durations) / 1000
+
+    alloc_iterations = max(1, iterations // 4)
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    blocks_before = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    for _ in range(alloc_iterations):
+        func()
+    current, peak = tracemalloc.get_traced_memory()
+    blocks_after = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'ops_per_s': round(iterations / total_s, 1) if total_s > 0 else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(durations), 4),
+            'p50': round(percentile(ordered, 0.50), 4),
+            'p90': round(percentile(ordered, 0.90), 4),
+            'p99': round(percentile(ordered, 0.99), 4),
+            'max': round(ordered[-1], 4)
+        },
+        'alloc': {
+            'retained_bytes_per_call': round((current - before) / alloc_iterations, 1),
+            'retained_blocks_per_call': round((blocks_after - blocks_before) / alloc_iterations, 2),
+            'peak_kb': round((peak - before) / 1024, 1)
+        },
+        'rss_mb': round(rss_mb(), 2)
+    }
+
+
+def create_monitor(log_dir: str, api_url: str, overrides: Dict) -> SystemMonitor:
+    """SystemMonitor con la configurazione predefinita e l'API di prova"""
+    config = Config(str(Path(log_dir) / 'config.json'))
+    config.config.update({
+        'log_dir': log_dir,
+        'api_url': api_url,
+        'api_bearer_token': TOKEN
+    })
+    config.config.update(overrides)
+    monitor = SystemMonitor(config)
+    # I messaggi INFO di ogni invio falserebbero i tempi
+    monitor.logger.setLevel(logging.WARNING)
+    return monitor
+
+
+def run_benchmarks(iterations: int, period_samples: int, overrides: Dict) -> Dict:
+    """Esegue tutti i benchmark e ritorna i risultati"""
+    server = start_server()
+    api_url = f'http://127.0.0.1:{server.server_port}/monitoring'
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='monitor-bench-') as log_dir:
+        monitor = create_monitor(log_dir, api_url, overrides)
+        try:
+            results['collect_sample'] = measure(monitor.collect_sample, iterations)
+
+            # Periodo tipico: period_samples campioni aggregati in un payload
+            monitor.samples = monitor.new_sample_set()
+            for _ in range(period_samples):
+                monitor.collect_sample()
+            samples = monitor.samples
+            results['aggregate_samples'] = measure(lambda: monitor.aggregate_samples(samples), iterations)
+
+            payload = monitor.aggregate_samples(samples)
+            results['json_dumps'] = measure(
+                lambda: json.dumps(payload, ensure_ascii=False, separators=(',', ':')), iterations
+            )
+            results['encode_body'] = measure(lambda: monitor.encode_body(payload), iterations)
+            body, _, raw_size = monitor.encode_body(payload)
+            results['encode_body']['body_bytes'] = len(body)
+            results['encode_body']['raw_bytes'] = raw_size
+
+            failures = []
+
+            def send():
+                if not monitor.send_to_api(payload):
+                    failures.append(1)
+            results['send_to_api'] = measure(send, iterations)
+            results['send_to_api']['failures'] = len(failures)
+        finally:
+            monitor.session.close()
+            monitor.stop_workers()
+            server.shutdown()
+
+    return results
+
+
+def git_version() -> Optional[str]:
+    """Commit corrente del repository, se disponibile"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Righe di confronto tra due risultati (variazione percentuale)"""
+    lines = [f"{'benchmark':<20} {'ops/s':>12} {'Δ':>8} {'p50 ms':>10} {'Δ':>8} {'byte/call':>10} {'Δ':>8}"]
+    for name, result in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+
+        def delta(new_value, old_value):
+            if old is None or not old_value:
+                return '-'
+            return f"{(new_value - old_value) / old_value * 100:+.1f}%"
+
+        ops = result['ops_per_s'] or 0
+        p50 = result['latency_ms']['p50']
+        retained = result['alloc']['retained_bytes_per_call']
+        lines.append(
+            f"{name:<20} {ops:>12.1f} {delta(ops, old and old['ops_per_s']):>8}"
+            f" {p50:>10.3f} {delta(p50, old and old['latency_ms']['p50']):>8}"
+            f" {retained:>10.0f} {delta(retained, old and old['alloc']['retained_bytes_per_call']):>8}"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del monitor di sistema")
+    parser.add_argument('--iterations', type=int, default=200, help="Chiamate per benchmark (default: 200)")
+    parser.add_argument('--period-samples', type=int, default=12,
+                        help="Campioni per periodo usati per aggregazione e invio (default: 12)")
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default='none',
+                        help="api_compression usata per encode_body e send_to_api")
+    parser.add_argument('--config', help="JSON con altre impostazioni da sovrascrivere (es. '{\"cpu_per_core\": true}')")
+    parser.add_argument('--output', help="File JSON in cui salvare i risultati")
+    parser.add_argument('--compare', help="Risultati JSON precedenti da confrontare")
+    args = parser.parse_args(argv)
+
+    overrides = {'api_compression': args.compression}
+    if args.config:
+        overrides.update(json.loads(args.config))
+
+    results = run_benchmarks(args.iterations, args.period_samples, overrides)
+    report = {
+        'version': git_version(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'settings': {
+            'iterations': args.iterations,
+            'period_samples': args.period_samples,
+            'overrides': overrides
+        },
+        'peak_rss_mb': round(peak_rss_mb(), 2),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Risultati salvati in {args.output}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Confronto con {args.compare} (versione {baseline.get('version')})")
+    print('\n'.join(compare(report, baseline)))
+    for name, result in results.items():
+        if result.get('failures'):
+            print(f"ATTENZIONE: {name} fallito {result['failures']} volte, i tempi non sono significativi")
+    print(f"RSS massimo: {report['peak_rss_mb']} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
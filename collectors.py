@@ -0,0 +1,546 @@
+"""
+Collettori delle metriche: interfaccia dei plugin, registro e collettori predefiniti
+"""
+
+import importlib
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+from diskio import DiskIOCollector
+from netstats import NetworkCounterCollector
+from pressure import PressureCollector
+from procwatch import ProcessWatcher
+from stats import MetricSet
+from thermal import THROTTLED_FLAGS, ThermalCollector, decode_throttled
+
+if TYPE_CHECKING:
+    from monitor import SystemMonitor
+
+
+# Valore di interval per i collettori letti solo al momento dell'invio
+AT_SEND = None
+
+
+class Collector:
+    """
+    Interfaccia dei collettori
+
+    Un collettore ha un nome univoco, una cadenza e due metodi:
+
+    - collect(samples): chiamato dal loop di campionamento quando è il suo
+      turno; aggiunge valori a samples (MetricSet del periodo) e ritorna i
+      valori istantanei da salvare nello storico e nell'archivio locale
+    - aggregate(samples): chiamato dal thread di invio alla chiusura del
+      periodo; ritorna i campi da aggiungere al payload
+
+    interval è in secondi: 0 = a ogni campione, AT_SEND (None) = collect non
+    viene chiamato dal loop e aggregate legge il valore al momento
+    dell'invio. Intervalli più lunghi del periodo sono ammessi: aggregate
+    riceve in quel caso un MetricSet senza valori del collettore.
+
+    I nomi delle metriche in samples sono condivisi tra i collettori: i
+    plugin devono usare il proprio nome come prefisso (es. 'ups:battery').
+    """
+
+    name = ''
+    default_interval: Optional[float] = 0
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        """
+        Args:
+            monitor: SystemMonitor che usa il collettore
+            interval: Secondi tra due letture (vedi sopra)
+            options: Opzioni del collettore da config.json
+        """
+        self.monitor = monitor
+        self.interval = interval
+        self.options = options
+        self.next_due: Optional[float] = None
+        self.last_run: Optional[float] = None
+
+    def is_due(self, now: float, tolerance: float = 0.0) -> bool:
+        """È il momento di chiamare collect?"""
+        if self.interval is AT_SEND:
+            return False
+        return self.next_due is None or now >= self.next_due - tolerance
+
+    def schedule_next(self, now: float):
+        """Calcola la prossima scadenza dopo una lettura"""
+        self.last_run = now
+        if self.next_due is None or now - self.next_due >= self.interval:
+            # Prima lettura o scadenze saltate: si riparte da adesso
+            self.next_due = now + self.interval
+        else:
+            self.next_due += self.interval
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        return {}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        return {}
+
+    def close(self):
+        pass
+
+
+COLLECTORS: Dict[str, Type[Collector]] = {}
+
+
+def register_collector(cls: Type[Collector]) -> Type[Collector]:
+    """Decoratore che registra un collettore con il suo nome"""
+    if not cls.name:
+        raise ValueError(f"Collettore senza nome: {cls.__name__}")
+    COLLECTORS[cls.name] = cls
+    return cls
+
+
+def load_plugins(specs: List[str]) -> List[str]:
+    """
+    Importa i moduli dei plugin
+
+    Args:
+        specs: 'modulo' (i collettori si registrano con @register_collector)
+               oppure 'modulo:Classe' (la classe viene registrata)
+
+    Returns:
+        Nomi dei collettori registrati dai plugin
+    """
+    before = set(COLLECTORS)
+    for spec in specs:
+        module_name, _, class_name = spec.partition(':')
+        module = importlib.import_module(module_name)
+        if class_name:
+            register_collector(getattr(module, class_name))
+    return [name for name in COLLECTORS if name not in before]
+
+
+@register_collector
+class CpuCollector(Collector):
+    """Utilizzo CPU (con iowait/steal e per core se abilitati)"""
+
+    name = 'cpu'
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        cpu = self.monitor.cpu_collector.sample()
+        if cpu is None:
+            # Prima lettura: solo i contatori di riferimento
+            return {}
+        samples.add('cpu', cpu['percent'])
+        for field in ('iowait', 'steal'):
+            if f'{field}_percent' in cpu:
+                samples.add(field, cpu[f'{field}_percent'])
+        for index, value in enumerate(cpu.get('per_core_percent', ())):
+            samples.add(f'cpu_core{index}', value)
+        return {'cpu': cpu['percent']}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """CPU (max, average, p95 e deviazione standard) con il dettaglio opzionale"""
+        stats = samples.get('cpu')
+        if not stats:
+            return {}
+        cpu = {**stats.summary('_percent'), 'samples': stats.count}
+
+        for field in ('iowait', 'steal'):
+            detail = samples.get(field)
+            if detail:
+                cpu[f'{field}_max_percent'] = round(detail.max, 2)
+                cpu[f'{field}_avg_percent'] = round(detail.mean, 2)
+
+        cores = []
+        while samples.get(f'cpu_core{len(cores)}'):
+            cores.append(samples.get(f'cpu_core{len(cores)}'))
+        if cores:
+            cpu['per_core_max_percent'] = [round(c.max, 2) for c in cores]
+            cpu['per_core_avg_percent'] = [round(c.mean, 2) for c in cores]
+        return {'cpu': cpu}
+
+
+@register_collector
+class MemoryCollector(Collector):
+    """Utilizzo della RAM"""
+
+    name = 'memory'
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        percent = self.monitor.get_memory_usage()['percent']
+        samples.add('memory', percent)
+        return {'memory': percent}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """RAM (max, average, p95 e deviazione standard) con la lettura attuale"""
+        stats = samples.get('memory')
+        if not stats:
+            return {}
+        return {'memory': {
+            **stats.summary('_percent'),
+            'current': self.monitor.get_memory_usage(),
+            'samples': stats.count
+        }}
+
+
+@register_collector
+class NetworkCollector(Collector):
+    """Traffico per interfaccia dalle differenze dei contatori"""
+
+    name = 'network'
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        super().__init__(monitor, interval, **options)
+        self.counters = NetworkCounterCollector()
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        net = self.counters.sample(self.monitor.interfaces.relevant_names())
+        for iface, values in net.items():
+            for key, value in values.items():
+                samples.add(f'net:{iface}:{key}', value, quantile=False)
+        if not net:
+            return {}
+        return {
+            'net_rx_bytes_per_s': sum(v['rx_bytes_per_s'] for v in net.values()),
+            'net_tx_bytes_per_s': sum(v['tx_bytes_per_s'] for v in net.values()),
+            'net_bytes': sum(v['rx_bytes'] + v['tx_bytes'] for v in net.values())
+        }
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """Traffico per interfaccia (byte/s e pacchetti/s max e average, totali)"""
+        interfaces = sorted({
+            name.split(':')[1] for name in samples.metrics if name.startswith('net:')
+        })
+        network = {}
+        for iface in interfaces:
+            def get(key):
+                return samples.get(f'net:{iface}:{key}')
+
+            block = {}
+            for direction in ('rx', 'tx'):
+                byte_rate = get(f'{direction}_bytes_per_s')
+                packet_rate = get(f'{direction}_packets_per_s')
+                block[direction] = {
+                    'max_bytes_per_s': round(byte_rate.max, 1),
+                    'avg_bytes_per_s': round(byte_rate.mean, 1),
+                    'max_packets_per_s': round(packet_rate.max, 1),
+                    'avg_packets_per_s': round(packet_rate.mean, 1),
+                    'bytes': int(get(f'{direction}_bytes').total),
+                    'errors': int(get(f'{direction}_errors').total),
+                    'drops': int(get(f'{direction}_drops').total)
+                }
+            block['samples'] = get('rx_bytes_per_s').count
+            network[iface] = block
+        return {'network': network} if network else {}
+
+
+@register_collector
+class DiskCollector(Collector):
+    """Spazio (letto all'invio) e I/O per punto di montaggio"""
+
+    name = 'disk'
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        super().__init__(monitor, interval, **options)
+        self.mount_points = monitor.config.disk_mount_points
+        self.io = DiskIOCollector(self.mount_points)
+        self._devices: Dict[str, str] = {}
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        disks = self.io.sample()
+        for mount_point, values in disks.items():
+            self._devices[mount_point] = values['device']
+            for key, value in values.items():
+                if key != 'device' and value is not None:
+                    samples.add(f'disk:{mount_point}:{key}', value, quantile=False)
+        if not disks:
+            return {}
+        return {'disk_write_bytes_per_s': sum(v['write_bytes_per_s'] for v in disks.values())}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """Spazio del primo punto di montaggio, spazio e I/O del periodo di ciascuno"""
+        disks = {}
+        for mount_point in self.mount_points:
+            try:
+                disk = self.monitor.get_disk_usage(mount_point)
+            except OSError:
+                # Punto di montaggio assente (es. chiavetta USB rimossa)
+                continue
+
+            def get(key):
+                return samples.get(f'disk:{mount_point}:{key}')
+
+            if get('read_iops'):
+                io = {'device': self._devices.get(mount_point)}
+                for key, unit, digits in (('read_iops', '', 1), ('write_iops', '', 1),
+                                          ('read_bytes_per_s', '', 1), ('write_bytes_per_s', '', 1),
+                                          ('await', '_ms', 2), ('util', '_percent', 2)):
+                    stats = get(key + unit)
+                    if stats:
+                        io[f'max_{key}{unit}'] = round(stats.max, digits)
+                        io[f'avg_{key}{unit}'] = round(stats.mean, digits)
+                io['written_bytes'] = int(get('written_bytes').total)
+                io['samples'] = get('read_iops').count
+                disk['io'] = io
+            disks[mount_point] = disk
+
+        first = disks.get(self.mount_points[0])
+        result = {'disk': {k: v for k, v in first.items() if k != 'io'}} if first else {}
+        result['disks'] = disks
+        return result
+
+
+@register_collector
+class PressureLoadCollector(Collector):
+    """Pressione delle risorse (PSI, se abilitata) e carico medio"""
+
+    name = 'pressure'
+    default_interval = 15
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        super().__init__(monitor, interval, **options)
+        self.pressure = PressureCollector() if monitor.config.pressure_enabled else None
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        values = {}
+        pressure = self.pressure.sample() if self.pressure is not None else {}
+        for resource, stall in pressure.items():
+            for key, value in stall.items():
+                samples.add(f'pressure:{resource}:{key}', value, quantile=False)
+            values[f'{resource}_pressure_percent'] = stall.get('some_percent')
+        load1, _, _ = os.getloadavg()
+        samples.add('load1', load1, quantile=False)
+        values['load1'] = load1
+        return values
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """
+        Percentuale di tempo in stallo (max e average) e tempo totale per
+        risorsa, con il massimo delle medie avg10/avg60 del kernel; carico
+        medio a 1 minuto nel periodo e valori attuali a 5 e 15 minuti
+        """
+        pressure = {}
+        for resource in PressureCollector.RESOURCES:
+            block = {}
+            for kind in ('some', 'full'):
+                def get(key):
+                    return samples.get(f'pressure:{resource}:{kind}_{key}')
+
+                stats = get('percent')
+                if not stats:
+                    continue
+                block[f'{kind}_max_percent'] = round(stats.max, 2)
+                block[f'{kind}_avg_percent'] = round(stats.mean, 2)
+                block[f'{kind}_stall_ms'] = round(get('stall_ms').total, 1)
+                for window in ('avg10', 'avg60'):
+                    if get(window):
+                        block[f'{kind}_{window}_max'] = round(get(window).max, 2)
+            if block:
+                pressure[resource] = block
+
+        result = {'pressure': pressure} if pressure else {}
+        load1 = samples.get('load1')
+        if load1:
+            _, load5, load15 = os.getloadavg()
+            result['load'] = {
+                'load1_max': round(load1.max, 2),
+                'load1_avg': round(load1.mean, 2),
+                'load5': round(load5, 2),
+                'load15': round(load15, 2),
+                'cpu_count': os.cpu_count()
+            }
+        return result
+
+
+@register_collector
+class ProcessCollector(Collector):
+    """Stato e risorse dei processi in watch_processes"""
+
+    name = 'processes'
+    default_interval = 30
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        super().__init__(monitor, interval, **options)
+        self.watcher = ProcessWatcher(
+            monitor.config.watch_processes,
+            rescan_interval=monitor.config.process_rescan_seconds
+        )
+        self._state: Dict[str, Dict] = {}
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        if not self.watcher:
+            return {}
+        for name, proc in self.watcher.sample().items():
+            self._state[name] = {'running': proc['running'], 'pids': proc['pids']}
+            samples.add(f'proc:{name}:running', 1.0 if proc['running'] else 0.0, quantile=False)
+            samples.add(f'proc:{name}:restarts', proc['restarts'], quantile=False)
+            if proc['running']:
+                for key in ('rss_bytes', 'cpu_percent', 'threads', 'fds'):
+                    samples.add(f'proc:{name}:{key}', proc[key], quantile=False)
+        return {}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """Stato, riavvii e risorse (max e average) di ogni processo controllato"""
+        processes = {}
+        for watch in self.watcher.watches:
+            def get(key):
+                return samples.get(f'proc:{watch.name}:{key}')
+
+            running = get('running')
+            if not running:
+                continue
+            state = self._state.get(watch.name, {})
+            block = {
+                'running': state.get('running', False),
+                'pids': state.get('pids', []),
+                'up_percent': round(running.mean * 100, 1),
+                'restarts': int(get('restarts').total)
+            }
+            if get('rss_bytes'):
+                block.update({
+                    'rss_max_mb': round(get('rss_bytes').max / (1024**2), 2),
+                    'rss_avg_mb': round(get('rss_bytes').mean / (1024**2), 2),
+                    'cpu_max_percent': round(get('cpu_percent').max, 2),
+                    'cpu_avg_percent': round(get('cpu_percent').mean, 2),
+                    'threads_max': int(get('threads').max),
+                    'fds_max': int(get('fds').max)
+                })
+            block['samples'] = running.count
+            processes[watch.name] = block
+        return {'processes': processes} if processes else {}
+
+
+@register_collector
+class SocThermalCollector(Collector):
+    """Temperatura, frequenza CPU e throttling del SoC"""
+
+    name = 'thermal'
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = 0, **options):
+        super().__init__(monitor, interval, **options)
+        self.thermal = ThermalCollector(
+            thermal_root=monitor.config.thermal_sysfs_root,
+            cpufreq_root=monitor.config.cpufreq_sysfs_root,
+            throttled_path=monitor.config.throttled_path
+        )
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        # Un valore 0/1 per ogni condizione di throttling
+        thermal = self.thermal.sample()
+        if thermal['temperature_c'] is not None:
+            samples.add('temperature', thermal['temperature_c'])
+        for zone, value in thermal['zones'].items():
+            samples.add(f'thermal_zone:{zone}', value, quantile=False)
+        if thermal['cpu_freq_mhz'] is not None:
+            samples.add('cpu_freq', thermal['cpu_freq_mhz'], quantile=False)
+        if thermal['throttled'] is not None:
+            for flag, active in decode_throttled(thermal['throttled'])['current'].items():
+                samples.add(f'throttled:{flag}', 1.0 if active else 0.0, quantile=False)
+        return {'temperature': thermal['temperature_c'], 'cpu_freq_mhz': thermal['cpu_freq_mhz']}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        """Temperatura e frequenza (max e average) e condizioni di throttling"""
+        result = {}
+        temperature = samples.get('temperature')
+        if temperature:
+            result.update(temperature.summary('_c', digits=1))
+            result['zones'] = {
+                name.split(':', 1)[1]: {'max_c': round(stats.max, 1), 'avg_c': round(stats.mean, 1)}
+                for name, stats in samples.metrics.items() if name.startswith('thermal_zone:')
+            }
+
+        freq = samples.get('cpu_freq')
+        if freq:
+            result['cpu_freq_max_mhz'] = round(freq.max)
+            result['cpu_freq_avg_mhz'] = round(freq.mean)
+            result['cpu_freq_min_mhz'] = round(freq.min)
+
+        if samples.get('throttled:under_voltage'):
+            # Maschera letta ora per le condizioni verificatesi dall'avvio
+            mask = self.thermal.read_throttled()
+            since_boot = decode_throttled(mask)['since_boot'] if mask is not None else {}
+            result['throttling'] = {
+                flag: {
+                    'active': samples.get(f'throttled:{flag}').max > 0,
+                    'active_percent': round(samples.get(f'throttled:{flag}').mean * 100, 1),
+                    'since_boot': since_boot.get(flag)
+                }
+                for flag in THROTTLED_FLAGS
+            }
+            result['throttled_mask'] = hex(mask) if mask is not None else None
+
+        if not result:
+            return {}
+        stats = temperature or freq or samples.get('throttled:under_voltage')
+        result['samples'] = stats.count
+        return {'thermal': result}
+
+
+class SnapshotCollector(Collector):
+    """
+    Base dei collettori di stato istantaneo (un solo valore per periodo)
+
+    Con interval AT_SEND lo stato viene letto al momento dell'invio;
+    altrimenti collect lo legge alla sua cadenza e aggregate riporta
+    l'ultima lettura.
+    """
+
+    default_interval = AT_SEND
+    field = ''
+
+    def __init__(self, monitor: 'SystemMonitor', interval: Optional[float] = AT_SEND, **options):
+        super().__init__(monitor, interval, **options)
+        self.last = None
+
+    def read(self):
+        raise NotImplementedError
+
+    def collect(self, samples: MetricSet) -> Dict[str, Optional[float]]:
+        self.last = self.read()
+        return {}
+
+    def aggregate(self, samples: MetricSet) -> Dict:
+        value = self.read() if self.interval is AT_SEND or self.last is None else self.last
+        # Stato non disponibile (es. nessun controllo di connettività ancora)
+        return {} if value is None or value == {} else {self.field: value}
+
+
+@register_collector
+class EthernetCollector(SnapshotCollector):
+    """Stato dell'interfaccia ethernet principale"""
+
+    name = field = 'ethernet'
+
+    def read(self) -> Dict:
+        return self.monitor.get_ethernet_status()
+
+
+@register_collector
+class WifiCollector(SnapshotCollector):
+    """Stato e segnale dell'interfaccia WiFi principale"""
+
+    name = field = 'wifi'
+
+    def read(self) -> Dict:
+        return self.monitor.get_wifi_status()
+
+
+@register_collector
+class InterfacesCollector(SnapshotCollector):
+    """Stato di tutte le interfacce di rete rilevanti"""
+
+    name = field = 'interfaces'
+
+    def read(self) -> List[Dict]:
+        return self.monitor.get_interfaces()
+
+
+@register_collector
+class InternetCollector(SnapshotCollector):
+    """Esito dell'ultimo controllo di connettività con le latenze"""
+
+    name = field = 'internet'
+
+    def read(self) -> Dict:
+        return self.monitor.prober.status()
+
+
+# Ordine di raccolta e di aggregazione dei collettori predefiniti
+# (cpu per primo: la sua lettura copre l'intervallo dal campione precedente)
+BUILTIN_COLLECTORS = ('cpu', 'memory', 'network', 'disk', 'pressure', 'processes',
+                      'thermal', 'ethernet', 'wifi', 'interfaces', 'internet')
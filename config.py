@@ -5,7 +5,72 @@ Gestione della configurazione per il sistema di monitoraggio
 import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+# Tipi numerici ammessi per i valori con limiti (bool escluso)
+NUMBER = (int, float)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, NUMBER) and not isinstance(value, bool)
+
+
+def check_triggers(value: Dict) -> Optional[str]:
+    """adaptive_triggers: per metrica un oggetto con above e change numerici (opzionali)"""
+    for name, trigger in value.items():
+        if not isinstance(trigger, dict):
+            return f"{name} deve essere un oggetto con above e/o change"
+        for field, threshold in trigger.items():
+            if field not in ('above', 'change'):
+                return f"{name}: campo sconosciuto {field!r}"
+            if not _is_number(threshold):
+                return f"{name}.{field} deve essere un numero"
+            if field == 'change' and threshold < 0:
+                return f"{name}.change non può essere negativo"
+    return None
+
+
+def check_commands(value: Dict) -> Optional[str]:
+    """recovery_commands: per azione una lista di comandi, ognuno una lista di stringhe"""
+    for action, commands in value.items():
+        if not isinstance(commands, list):
+            return f"{action} deve essere una lista di comandi"
+        for argv in commands:
+            if not isinstance(argv, list) or not argv or not all(isinstance(part, str) for part in argv):
+                return f"{action}: {argv!r} non è un comando (lista di stringhe)"
+    return None
+
+
+def check_probe_targets(value: List[Dict]) -> Optional[str]:
+    """probe_targets: tipo noto e host (tcp, dns) o URL http(s) (http_head) per ogni controllo"""
+    for spec in value:
+        kind = spec.get('type')
+        if kind not in ('tcp', 'dns', 'http_head'):
+            return f"{spec!r}: type deve essere tcp, dns o http_head"
+        if kind == 'http_head':
+            url = spec.get('url')
+            if not isinstance(url, str) or not url.startswith(('http://', 'https://')) or not urlsplit(url).hostname:
+                return f"{spec!r}: url deve essere un URL http(s)"
+        elif not isinstance(spec.get('host'), str) or not spec['host']:
+            return f"{spec!r}: host mancante"
+        port = spec.get('port', 53)
+        if kind == 'tcp' and (isinstance(port, bool) or not isinstance(port, int) or not 0 < port < 65536):
+            return f"{spec!r}: port non valida"
+    return None
+
+
+def check_collectors(value: Dict) -> Optional[str]:
+    """collectors: per collettore un oggetto con enabled (bool) e interval_seconds (>= 0 o null)"""
+    for name, settings in value.items():
+        if not isinstance(settings, dict):
+            return f"{name} deve essere un oggetto (enabled, interval_seconds, opzioni)"
+        if not isinstance(settings.get('enabled', True), bool):
+            return f"{name}.enabled deve essere true o false"
+        interval = settings.get('interval_seconds', 0)
+        if interval is not None and (not _is_number(interval) or interval < 0):
+            return f"{name}.interval_seconds deve essere un numero >= 0 o null"
+    return None
 
 
 class Config:
@@ -15,20 +80,165 @@ class Config:
         'device_id': 'raspberry-pi-001',  # ID univoco del dispositivo/webcam
         'check_period_minutes': 1,  # Periodo di controllo in minuti
         'sample_interval_seconds': 5,  # Intervallo tra i campioni in secondi
+        'adaptive_sampling': False,  # Adatta l'intervallo tra i campioni all'andamento delle metriche
+        'sample_interval_min_seconds': 1,  # Intervallo minimo con il campionamento adattivo
+        'sample_interval_max_seconds': 60,  # Intervallo massimo con il campionamento adattivo
+        'adaptive_triggers': {  # Soglie (above) e variazioni tra campioni (change) che accorciano l'intervallo
+            'cpu': {'above': 80, 'change': 20},
+            'memory': {'above': 90, 'change': 5},
+            'temperature': {'above': 70, 'change': 3}
+        },
         'reboot_timeout_minutes': 15,  # Minuti senza internet prima del riavvio
+        'recovery_steps': [  # Azioni di recupero provate prima del riavvio, dopo after_minutes di interruzione
+            {'action': 'reprobe', 'after_minutes': 1},
+            {'action': 'dhcp', 'after_minutes': 3},
+            {'action': 'interface', 'after_minutes': 5},
+            {'action': 'wifi_driver', 'after_minutes': 8},
+            {'action': 'service', 'after_minutes': 11}
+        ],
+        'recovery_services': [],  # Servizi riavviati dall'azione service (es. NetworkManager)
+        'recovery_interface': '',  # Interfaccia delle azioni di recupero (vuoto = quella della rotta predefinita)
+        'recovery_wifi_module': '',  # Modulo del driver WiFi (vuoto = rilevato da sysfs)
+        'recovery_commands': {},  # Comandi che sostituiscono quelli predefiniti, per azione
+        'recovery_settle_seconds': 20,  # Attesa dopo ogni azione prima di ricontrollare la connessione
         'api_url': 'https://api.example.com/monitoring',  # URL dell'API REST
         'api_bearer_token': '',  # Token Bearer per l'autenticazione
-        'log_dir': '/var/log/raspberry-monitor'  # Directory dei log
+        'log_dir': '/var/log/raspberry-monitor',  # Directory dei log
+        'outbox_max_mb': 20,  # Dimensione massima della coda di invio su disco
+        'outbox_max_age_hours': 72,  # Età massima dei dati in coda
+        'outbox_batch_size': 20,  # Payload inviati per richiesta durante il recupero
+        'outbox_retry_seconds': 60,  # Intervallo tra i tentativi di svuotare la coda
+        'api_compression': 'none',  # Compressione del corpo: none, gzip o zstd
+        'api_format': 'json',  # Formato del corpo: json o cbor (chiavi numeriche, vedi wire.py)
+        'api_delta': False,  # Invia i sotto-oggetti invariati come riferimenti all'ultimo payload confermato
+        'upload_queue_size': 10,  # Periodi in attesa di elaborazione dal thread di invio
+        'cpu_breakdown': False,  # Aggiunge iowait e steal al blocco cpu
+        'cpu_per_core': False,  # Aggiunge l'utilizzo per core al blocco cpu
+        'aggregate_quantiles': True,  # Stima il 95° percentile di cpu e memory
+        'history_hours': 6,  # Ore di campioni grezzi tenute in memoria (0 = disabilitato)
+        'history_export_format': 'csv',  # Formato dell'esportazione dello storico: csv o binary
+        'tsdb_enabled': True,  # Archivio locale delle metriche in log_dir/metrics.db
+        'tsdb_raw_hours': 24,  # Conservazione dei campioni grezzi
+        'tsdb_minute_days': 7,  # Conservazione dell'aggregato a 1 minuto
+        'tsdb_hour_days': 90,  # Conservazione dell'aggregato a 1 ora
+        'probe_targets': [],  # Controlli di connettività (vuoto = predefiniti)
+        'probe_timeout_seconds': 3,  # Timeout di ogni controllo di connettività
+        'probe_window': 20,  # Controlli usati per calcolare la perdita percentuale
+        'wireless_nl80211': True,  # Legge bitrate e ritrasmissioni WiFi via nl80211
+        'thermal_sysfs_root': '/sys/class/thermal',  # Directory delle zone termiche
+        'cpufreq_sysfs_root': '/sys/devices/system/cpu',  # Directory di cpufreq
+        'throttled_path': '/sys/devices/platform/soc/soc:firmware/get_throttled',  # Maschera di throttling del firmware
+        'disk_mount_points': ['/'],  # Punti di montaggio controllati (il primo è riportato in disk)
+        'pressure_enabled': True,  # Pressione di cpu, memoria e I/O (PSI) del kernel
+        'watch_processes': [],  # Processi da controllare (per nome, cmdline o pidfile)
+        'process_rescan_seconds': 10,  # Intervallo minimo tra le ricerche di un processo mancante
+        'collectors': {  # Per collettore: enabled, interval_seconds e opzioni dei plugin
+            'pressure': {'interval_seconds': 15},
+            'processes': {'interval_seconds': 30}
+        },
+        'collector_plugins': [],  # Moduli con collettori aggiuntivi ("modulo" o "modulo:Classe")
+        'self_instrumentation': False,  # Aggiunge al payload tempi e risorse del monitor stesso
+        'exporter_enabled': False,  # Espone le metriche in formato OpenMetrics su /metrics
+        'exporter_host': '0.0.0.0',  # Indirizzo dell'endpoint /metrics
+        'exporter_port': 9101,  # Porta dell'endpoint /metrics
+        'alert_rules': [],  # Regole di allarme valutate a ogni campione (es. {"condition": "cpu > 95", "for_seconds": 30})
+        'alert_url': '',  # Endpoint a cui inviare subito gli allarmi (vuoto = solo log)
+        'alert_cooldown_seconds': 300,  # Secondi minimi tra due notifiche di attivazione della stessa regola
+        'alert_max_per_hour': 20,  # Notifiche di allarme massime in un'ora
+        'config_watch': True  # Ricarica questo file quando cambia (controllato a fine periodo)
+    }
+    
+    # Tipo e limiti (inclusi) di ogni valore, controllati al caricamento e
+    # a ogni ricarica: type, min, max, choices, min_length (stringhe e
+    # liste), items (tipo degli elementi di una lista), url (http:// o
+    # https://, oppure vuoto), check (controllo del contenuto)
+    SCHEMA = {
+        'device_id': {'type': str, 'min_length': 1},
+        'check_period_minutes': {'type': NUMBER, 'min': 0.01, 'max': 1440},
+        'sample_interval_seconds': {'type': NUMBER, 'min': 0.1, 'max': 3600},
+        'adaptive_sampling': {'type': bool},
+        'sample_interval_min_seconds': {'type': NUMBER, 'min': 0.1, 'max': 3600},
+        'sample_interval_max_seconds': {'type': NUMBER, 'min': 0.1, 'max': 3600},
+        'adaptive_triggers': {'type': dict, 'check': check_triggers},
+        'reboot_timeout_minutes': {'type': NUMBER, 'min': 1, 'max': 10080},
+        'recovery_steps': {'type': list, 'items': dict},
+        'recovery_services': {'type': list, 'items': str},
+        'recovery_interface': {'type': str},
+        'recovery_wifi_module': {'type': str},
+        'recovery_commands': {'type': dict, 'check': check_commands},
+        'recovery_settle_seconds': {'type': NUMBER, 'min': 0, 'max': 600},
+        'api_url': {'type': str, 'url': True},
+        'api_bearer_token': {'type': str},
+        'log_dir': {'type': str, 'min_length': 1},
+        'outbox_max_mb': {'type': NUMBER, 'min': 0.01, 'max': 10240},
+        'outbox_max_age_hours': {'type': NUMBER, 'min': 0.01, 'max': 8760},
+        'outbox_batch_size': {'type': int, 'min': 1, 'max': 1000},
+        'outbox_retry_seconds': {'type': NUMBER, 'min': 1, 'max': 86400},
+        'api_compression': {'type': str, 'choices': ('none', 'gzip', 'zstd')},
+        'api_format': {'type': str, 'choices': ('json', 'cbor')},
+        'api_delta': {'type': bool},
+        'upload_queue_size': {'type': int, 'min': 1, 'max': 1000},
+        'cpu_breakdown': {'type': bool},
+        'cpu_per_core': {'type': bool},
+        'aggregate_quantiles': {'type': bool},
+        'history_hours': {'type': NUMBER, 'min': 0, 'max': 168},
+        'history_export_format': {'type': str, 'choices': ('csv', 'binary')},
+        'tsdb_enabled': {'type': bool},
+        'tsdb_raw_hours': {'type': NUMBER, 'min': 0, 'max': 8760},
+        'tsdb_minute_days': {'type': NUMBER, 'min': 0, 'max': 3650},
+        'tsdb_hour_days': {'type': NUMBER, 'min': 0, 'max': 3650},
+        'probe_targets': {'type': list, 'items': dict, 'check': check_probe_targets},
+        'probe_timeout_seconds': {'type': NUMBER, 'min': 0.1, 'max': 60},
+        'probe_window': {'type': int, 'min': 1, 'max': 10000},
+        'wireless_nl80211': {'type': bool},
+        'thermal_sysfs_root': {'type': str},
+        'cpufreq_sysfs_root': {'type': str},
+        'throttled_path': {'type': str},
+        'disk_mount_points': {'type': list, 'min_length': 1, 'items': str},
+        'pressure_enabled': {'type': bool},
+        'watch_processes': {'type': list, 'items': dict},
+        'process_rescan_seconds': {'type': NUMBER, 'min': 0, 'max': 86400},
+        'collectors': {'type': dict, 'check': check_collectors},
+        'collector_plugins': {'type': list, 'items': str},
+        'self_instrumentation': {'type': bool},
+        'exporter_enabled': {'type': bool},
+        'exporter_host': {'type': str},
+        'exporter_port': {'type': int, 'min': 0, 'max': 65535},
+        'alert_rules': {'type': list, 'items': dict},
+        'alert_url': {'type': str, 'url': True},
+        'alert_cooldown_seconds': {'type': NUMBER, 'min': 0, 'max': 86400},
+        'alert_max_per_hour': {'type': int, 'min': 1, 'max': 3600},
+        'config_watch': {'type': bool}
+    }
+    
+    # Chiavi usate solo per creare componenti all'avvio (archivi, collettori,
+    # endpoint, ...): una ricarica le ignora finché il servizio non riparte
+    RESTART_KEYS = {
+        'device_id', 'log_dir', 'upload_queue_size', 'cpu_breakdown', 'cpu_per_core',
+        'history_hours', 'tsdb_enabled', 'tsdb_raw_hours', 'tsdb_minute_days', 'tsdb_hour_days',
+        'wireless_nl80211', 'thermal_sysfs_root', 'cpufreq_sysfs_root', 'throttled_path',
+        'disk_mount_points', 'pressure_enabled', 'watch_processes', 'process_rescan_seconds',
+        'collectors', 'collector_plugins', 'self_instrumentation',
+        'exporter_enabled', 'exporter_host', 'exporter_port'
     }
     
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, values: Optional[Dict] = None):
         """
         Inizializza la configurazione
         
         Args:
             config_file: Path al file di configurazione JSON. 
                         Se None, cerca config.json nella directory corrente o in /etc
+            values: Valori già letti e validati (vedi read): il file non
+                    viene letto né creato
         """
+        # Identità del file all'ultima lettura, per accorgersi delle modifiche
+        self._stamp = None
+        if values is not None:
+            self.config_file = config_file
+            self.config = values
+            return
+        
         if config_file is None:
             # Cerca il file di configurazione in diverse posizioni
             possible_paths = [
@@ -55,12 +265,94 @@ class Config:
     def load_config(self):
         """Carica la configurazione dal file JSON"""
         try:
-            with open(self.config_file, 'r') as f:
-                user_config = json.load(f)
-                self.config.update(user_config)
+            self.config = self.read()
         except Exception as e:
             print(f"Errore nel caricamento della configurazione: {e}")
             print("Utilizzo della configurazione di default")
+            return
+        
+        # All'avvio i valori non validi vengono sostituiti dai predefiniti
+        for key, error in self.invalid_keys(self.config).items():
+            print(f"Configurazione: {error}, uso il valore predefinito")
+            self.config[key] = self.DEFAULT_CONFIG[key]
+    
+    def read(self) -> Dict:
+        """
+        Legge il file e ritorna i valori completati con i predefiniti, senza
+        applicarli né validarli
+        
+        Raises:
+            OSError, ValueError: Se il file non è leggibile o non è un oggetto JSON
+        """
+        self._stamp = self._file_stamp()
+        with open(self.config_file, 'r') as f:
+            user_config = json.load(f)
+        if not isinstance(user_config, dict):
+            raise ValueError("il file non contiene un oggetto JSON")
+        return {**self.DEFAULT_CONFIG, **user_config}
+    
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.config_file)
+        except (OSError, TypeError):
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def changed_on_disk(self) -> bool:
+        """Il file è cambiato dall'ultima lettura (anche se sostituito con rename)"""
+        return self._file_stamp() != self._stamp
+    
+    @classmethod
+    def check_value(cls, key: str, value) -> Optional[str]:
+        """Errore di un valore rispetto allo schema (None se valido o senza schema)"""
+        spec = cls.SCHEMA.get(key)
+        if spec is None:
+            return None
+        expected = spec['type']
+        if isinstance(value, bool) != (expected is bool) or not isinstance(value, expected):
+            return f"{key}: tipo non valido ({type(value).__name__})"
+        if 'choices' in spec and value not in spec['choices']:
+            return f"{key}: {value!r} non è tra {', '.join(spec['choices'])}"
+        if 'min' in spec and value < spec['min']:
+            return f"{key}: {value} è minore di {spec['min']}"
+        if 'max' in spec and value > spec['max']:
+            return f"{key}: {value} è maggiore di {spec['max']}"
+        if isinstance(value, (str, list)) and len(value) < spec.get('min_length', 0):
+            return f"{key}: non può essere vuoto"
+        if spec.get('url') and value and not value.startswith(('http://', 'https://')):
+            return f"{key}: {value!r} non è un URL http(s)"
+        if 'items' in spec and not all(isinstance(item, spec['items']) for item in value):
+            return f"{key}: gli elementi devono essere di tipo {spec['items'].__name__}"
+        if 'check' in spec:
+            error = spec['check'](value)
+            if error is not None:
+                return f"{key}: {error}"
+        return None
+    
+    @classmethod
+    def invalid_keys(cls, values: Dict) -> Dict[str, str]:
+        """Chiavi con valori non validi e relativo errore, compresi i vincoli tra chiavi"""
+        invalid = {}
+        for key, value in values.items():
+            error = cls.check_value(key, value)
+            if error is not None:
+                invalid[key] = error
+        if ('sample_interval_min_seconds' not in invalid and 'sample_interval_max_seconds' not in invalid
+                and values['sample_interval_min_seconds'] > values['sample_interval_max_seconds']):
+            invalid['sample_interval_max_seconds'] = (
+                "sample_interval_max_seconds: minore di sample_interval_min_seconds"
+            )
+        return invalid
+    
+    @classmethod
+    def validate(cls, values: Dict) -> List[str]:
+        """Errori dei valori indicati (lista vuota se la configurazione è valida)"""
+        return list(cls.invalid_keys(values).values())
+    
+    @classmethod
+    def unknown_keys(cls, values: Dict) -> Set[str]:
+        """Chiavi non riconosciute (es. errori di battitura)"""
+        return set(values) - set(cls.DEFAULT_CONFIG)
     
     def save_config(self):
         """Salva la configurazione corrente nel file JSON"""
@@ -90,11 +382,61 @@ class Config:
         """Intervallo tra i campioni in secondi"""
         return self.config['sample_interval_seconds']
     
+    @property
+    def adaptive_sampling(self) -> bool:
+        """Intervallo tra i campioni variabile in base alle metriche"""
+        return self.config['adaptive_sampling']
+    
+    @property
+    def sample_interval_min_seconds(self) -> float:
+        """Intervallo minimo tra i campioni in secondi (campionamento adattivo)"""
+        return self.config['sample_interval_min_seconds']
+    
+    @property
+    def sample_interval_max_seconds(self) -> float:
+        """Intervallo massimo tra i campioni in secondi (campionamento adattivo)"""
+        return self.config['sample_interval_max_seconds']
+    
+    @property
+    def adaptive_triggers(self) -> Dict[str, Dict[str, float]]:
+        """Per valore del campione: soglia 'above' e variazione 'change' che accorciano l'intervallo"""
+        return self.config['adaptive_triggers']
+    
     @property
     def reboot_timeout_minutes(self) -> int:
         """Minuti senza internet prima del riavvio"""
         return self.config['reboot_timeout_minutes']
     
+    @property
+    def recovery_steps(self) -> List[Dict]:
+        """Azioni di recupero (action, after_minutes) provate prima del riavvio"""
+        return self.config['recovery_steps']
+    
+    @property
+    def recovery_services(self) -> List[str]:
+        """Servizi riavviati dall'azione di recupero service"""
+        return self.config['recovery_services']
+    
+    @property
+    def recovery_interface(self) -> str:
+        """Interfaccia delle azioni di recupero (vuoto = rilevata)"""
+        return self.config['recovery_interface']
+    
+    @property
+    def recovery_wifi_module(self) -> str:
+        """Modulo del driver WiFi (vuoto = rilevato)"""
+        return self.config['recovery_wifi_module']
+    
+    @property
+    def recovery_commands(self) -> Dict[str, List[List[str]]]:
+        """Comandi delle azioni di recupero che sostituiscono i predefiniti"""
+        return self.config['recovery_commands']
+    
+    @property
+    def recovery_settle_seconds(self) -> float:
+        """Attesa dopo un'azione di recupero prima di ricontrollare la connessione"""
+        return self.config['recovery_settle_seconds']
+    
     @property
     def api_url(self) -> str:
         """URL dell'API REST"""
@@ -109,3 +451,198 @@ class Config:
     def log_dir(self) -> str:
         """Directory dei log"""
         return self.config['log_dir']
+    
+    @property
+    def outbox_max_mb(self) -> float:
+        """Dimensione massima della coda di invio su disco in MB"""
+        return self.config['outbox_max_mb']
+    
+    @property
+    def outbox_max_age_hours(self) -> float:
+        """Età massima dei dati in coda in ore"""
+        return self.config['outbox_max_age_hours']
+    
+    @property
+    def outbox_batch_size(self) -> int:
+        """Numero massimo di payload inviati in una singola richiesta"""
+        return self.config['outbox_batch_size']
+    
+    @property
+    def outbox_retry_seconds(self) -> int:
+        """Secondi tra i tentativi di svuotare la coda di invio"""
+        return self.config['outbox_retry_seconds']
+    
+    @property
+    def api_compression(self) -> str:
+        """Compressione del corpo delle richieste (none, gzip, zstd)"""
+        return self.config['api_compression']
+    
+    @property
+    def api_format(self) -> str:
+        """Formato del corpo delle richieste (json, cbor)"""
+        return self.config['api_format']
+    
+    @property
+    def api_delta(self) -> bool:
+        """Invio differenziale rispetto all'ultimo payload confermato"""
+        return self.config['api_delta']
+    
+    @property
+    def upload_queue_size(self) -> int:
+        """Numero massimo di periodi in attesa del thread di invio"""
+        return self.config['upload_queue_size']
+    
+    @property
+    def cpu_breakdown(self) -> bool:
+        """Riporta anche le percentuali di iowait e steal"""
+        return self.config['cpu_breakdown']
+    
+    @property
+    def cpu_per_core(self) -> bool:
+        """Riporta anche l'utilizzo di ogni core"""
+        return self.config['cpu_per_core']
+    
+    @property
+    def aggregate_quantiles(self) -> bool:
+        """Stima in streaming il 95° percentile delle metriche"""
+        return self.config['aggregate_quantiles']
+    
+    @property
+    def history_hours(self) -> float:
+        """Ore di campioni grezzi conservate in memoria"""
+        return self.config['history_hours']
+    
+    @property
+    def history_export_format(self) -> str:
+        """Formato dell'esportazione dello storico (csv, binary)"""
+        return self.config['history_export_format']
+    
+    @property
+    def tsdb_enabled(self) -> bool:
+        """Abilita l'archivio locale delle metriche"""
+        return self.config['tsdb_enabled']
+    
+    @property
+    def tsdb_raw_hours(self) -> float:
+        """Ore di conservazione dei campioni grezzi nell'archivio"""
+        return self.config['tsdb_raw_hours']
+    
+    @property
+    def tsdb_minute_days(self) -> float:
+        """Giorni di conservazione dell'aggregato a 1 minuto"""
+        return self.config['tsdb_minute_days']
+    
+    @property
+    def tsdb_hour_days(self) -> float:
+        """Giorni di conservazione dell'aggregato a 1 ora"""
+        return self.config['tsdb_hour_days']
+    
+    @property
+    def probe_targets(self) -> List[Dict]:
+        """Controlli di connettività (tcp, dns, http_head); vuoto per i predefiniti"""
+        return self.config['probe_targets']
+    
+    @property
+    def probe_timeout_seconds(self) -> float:
+        """Timeout di ogni controllo di connettività in secondi"""
+        return self.config['probe_timeout_seconds']
+    
+    @property
+    def probe_window(self) -> int:
+        """Numero di controlli per target usati per la perdita percentuale"""
+        return self.config['probe_window']
+    
+    @property
+    def wireless_nl80211(self) -> bool:
+        """Interroga nl80211 per bitrate e ritrasmissioni WiFi"""
+        return self.config['wireless_nl80211']
+    
+    @property
+    def thermal_sysfs_root(self) -> str:
+        """Directory sysfs delle zone termiche"""
+        return self.config['thermal_sysfs_root']
+    
+    @property
+    def cpufreq_sysfs_root(self) -> str:
+        """Directory sysfs delle CPU con i dati cpufreq"""
+        return self.config['cpufreq_sysfs_root']
+    
+    @property
+    def throttled_path(self) -> str:
+        """File get_throttled del firmware Raspberry Pi"""
+        return self.config['throttled_path']
+    
+    @property
+    def disk_mount_points(self) -> List[str]:
+        """Punti di montaggio di cui riportare spazio e I/O"""
+        return self.config['disk_mount_points'] or ['/']
+    
+    @property
+    def pressure_enabled(self) -> bool:
+        """Legge la pressione delle risorse da /proc/pressure"""
+        return self.config['pressure_enabled']
+    
+    @property
+    def watch_processes(self) -> List[Dict]:
+        """Processi da controllare (vedi procwatch.ProcessWatch)"""
+        return self.config['watch_processes']
+    
+    @property
+    def process_rescan_seconds(self) -> float:
+        """Secondi minimi tra due ricerche di un processo non in esecuzione"""
+        return self.config['process_rescan_seconds']
+    
+    @property
+    def collectors(self) -> Dict[str, Dict]:
+        """Impostazioni dei collettori per nome (enabled, interval_seconds, opzioni)"""
+        return self.config['collectors']
+    
+    @property
+    def collector_plugins(self) -> List[str]:
+        """Moduli Python con collettori aggiuntivi"""
+        return self.config['collector_plugins']
+    
+    @property
+    def self_instrumentation(self) -> bool:
+        """Misura i tempi delle funzioni principali e le risorse del monitor"""
+        return self.config['self_instrumentation']
+    
+    @property
+    def exporter_enabled(self) -> bool:
+        """Avvia l'endpoint /metrics per Prometheus"""
+        return self.config['exporter_enabled']
+    
+    @property
+    def exporter_host(self) -> str:
+        """Indirizzo su cui ascolta l'endpoint /metrics"""
+        return self.config['exporter_host']
+    
+    @property
+    def exporter_port(self) -> int:
+        """Porta dell'endpoint /metrics"""
+        return self.config['exporter_port']
+    
+    @property
+    def alert_rules(self) -> List[Dict]:
+        """Regole di allarme (vedi alerts.AlertRule)"""
+        return self.config['alert_rules']
+    
+    @property
+    def alert_url(self) -> str:
+        """URL a cui inviare gli allarmi"""
+        return self.config['alert_url']
+    
+    @property
+    def alert_cooldown_seconds(self) -> float:
+        """Secondi minimi tra due notifiche di attivazione della stessa regola"""
+        return self.config['alert_cooldown_seconds']
+    
+    @property
+    def alert_max_per_hour(self) -> int:
+        """Notifiche di allarme massime in un'ora"""
+        return self.config['alert_max_per_hour']
+    
+    @property
+    def config_watch(self) -> bool:
+        """Ricarica il file di configurazione quando cambia"""
+        return self.config['config_watch']
@@ -0,0 +1,101 @@
+"""
+Misura dell'utilizzo CPU dalle differenze dei contatori cumulativi (jiffies)
+"""
+
+import psutil
+from typing import Callable, Dict, List, Optional
+
+
+def _split_times(times) -> tuple:
+    """
+    Ritorna (totale, occupato) da una lettura di psutil.cpu_times
+
+    guest e guest_nice sono già conteggiati in user/nice, quindi vengono
+    esclusi dal totale; idle e iowait sono considerati tempo non occupato.
+    """
+    fields = times._asdict()
+    total = sum(fields.values()) - fields.get('guest', 0.0) - fields.get('guest_nice', 0.0)
+    idle = fields.get('idle', 0.0) + fields.get('iowait', 0.0)
+    return total, total - idle
+
+
+def _percent(part: float, total: float) -> float:
+    """Percentuale limitata a 0-100 (i contatori possono tornare indietro di poco)"""
+    if total <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, part / total * 100)), 2)
+
+
+class CpuTimesCollector:
+    """
+    Calcola l'utilizzo CPU come differenza tra due letture successive
+
+    A differenza di psutil.cpu_percent(interval=0.1) non blocca il processo e
+    copre l'intero intervallo tra due campioni, non solo una finestra di
+    100 ms. La prima chiamata a sample() legge solo i contatori di
+    riferimento: una lettura alla creazione precederebbe il primo campione
+    di pochi millisecondi e la differenza darebbe 0% o 100%.
+    """
+
+    def __init__(self, per_core: bool = False, breakdown: bool = False,
+                 cpu_times: Callable = psutil.cpu_times):
+        """
+        Args:
+            per_core: Calcola anche l'utilizzo di ogni core
+            breakdown: Calcola anche le percentuali di iowait e steal
+            cpu_times: Funzione di lettura dei contatori (sostituibile nei test)
+        """
+        self.per_core = per_core
+        self.breakdown = breakdown
+        self.cpu_times = cpu_times
+        self._last = None
+        self._last_per_core: Optional[List] = None
+        # Ultimo risultato di sample(), per chi legge senza avanzare i contatori
+        self.last: Optional[Dict] = None
+
+    def sample(self) -> Optional[Dict]:
+        """
+        Utilizzo CPU dall'ultima chiamata
+
+        Returns:
+            Dizionario con 'percent' e, se abilitati, 'iowait_percent',
+            'steal_percent' e 'per_core_percent'; None alla prima chiamata
+        """
+        current = self.cpu_times()
+        if self._last is None:
+            self._last = current
+            self._last_per_core = self.cpu_times(percpu=True) if self.per_core else None
+            return None
+        total, busy = _split_times(current)
+        last_total, last_busy = _split_times(self._last)
+        delta_total = total - last_total
+
+        result = {'percent': _percent(busy - last_busy, delta_total)}
+
+        if self.breakdown:
+            for field in ('iowait', 'steal'):
+                delta = getattr(current, field, 0.0) - getattr(self._last, field, 0.0)
+                result[f'{field}_percent'] = _percent(delta, delta_total)
+
+        if self.per_core:
+            per_core = self.cpu_times(percpu=True)
+            result['per_core_percent'] = self._per_core_percent(per_core)
+            self._last_per_core = per_core
+
+        self._last = current
+        self.last = result
+        return result
+
+    def _per_core_percent(self, per_core: List) -> List[float]:
+        """Utilizzo di ogni core dall'ultima lettura"""
+        last: Optional[List] = self._last_per_core
+        if not last or len(last) != len(per_core):
+            # Numero di core cambiato (hotplug): nessun riferimento valido
+            return [0.0] * len(per_core)
+
+        values = []
+        for now, before in zip(per_core, last):
+            total, busy = _split_times(now)
+            last_total, last_busy = _split_times(before)
+            values.append(_percent(busy - last_busy, total - last_total))
+        return values
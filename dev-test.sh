@@ -27,6 +27,9 @@ source "$SCRIPT_DIR/venv/bin/activate"
 # Esegui il test
 python "$SCRIPT_DIR/test.py"
 
+# Test dei parser e della logica con file di esempio
+(cd "$SCRIPT_DIR" && python -m unittest discover -s tests -t .)
+
 deactivate
 
 echo ""
@@ -0,0 +1,119 @@
+"""
+I/O dei dischi per punto di montaggio dalle differenze di /proc/diskstats
+"""
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from netstats import counter_delta
+
+
+# /proc/diskstats conta sempre settori da 512 byte
+SECTOR_BYTES = 512
+
+# Indici dei campi dopo major, minor e nome del dispositivo
+READS, SECTORS_READ, MS_READING = 0, 2, 3
+WRITES, SECTORS_WRITTEN, MS_WRITING = 4, 6, 7
+MS_BUSY = 9
+
+
+def parse_diskstats(text: str) -> Dict[Tuple[int, int], Tuple[str, List[int]]]:
+    """
+    Interpreta /proc/diskstats
+
+    Returns:
+        (major, minor) -> (nome del dispositivo, contatori)
+    """
+    result = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 14:
+            continue
+        result[(int(fields[0]), int(fields[1]))] = (fields[2], [int(v) for v in fields[3:14]])
+    return result
+
+
+class DiskIOCollector:
+    """
+    IOPS, throughput, latenza media e occupazione per punto di montaggio
+
+    Il dispositivo di ogni punto di montaggio è ricavato da st_dev (quindi
+    funziona anche con /dev/root) a ogni campione, così un disco montato
+    dopo l'avvio viene incluso dal campione successivo. I contatori sono
+    unsigned long, a 32 bit sui kernel armv7: gli overflow vengono gestiti.
+    La prima chiamata a sample() legge solo i contatori di riferimento.
+    """
+
+    def __init__(self, mount_points: List[str], diskstats_path: str = '/proc/diskstats',
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            mount_points: Punti di montaggio da seguire
+            diskstats_path: Path di /proc/diskstats (sostituibile nei test)
+            clock: Orologio monotono
+        """
+        self.mount_points = mount_points
+        self.diskstats_path = diskstats_path
+        self.clock = clock
+        self._last_time: Optional[float] = None
+        self._last: Dict[Tuple[int, int], Tuple[str, List[int]]] = {}
+
+    def _read(self) -> Dict[Tuple[int, int], Tuple[str, List[int]]]:
+        try:
+            with open(self.diskstats_path) as f:
+                return parse_diskstats(f.read())
+        except OSError:
+            return {}
+
+    @staticmethod
+    def device_of(mount_point: str) -> Optional[Tuple[int, int]]:
+        """(major, minor) del dispositivo montato, None se non esiste"""
+        try:
+            st_dev = os.stat(mount_point).st_dev
+        except OSError:
+            return None
+        return os.major(st_dev), os.minor(st_dev)
+
+    def sample(self) -> Dict[str, Dict]:
+        """
+        I/O dall'ultima chiamata
+
+        Returns:
+            Punto di montaggio -> dispositivo, IOPS e byte/s in lettura e
+            scrittura, latenza media (await) in ms, occupazione percentuale e
+            byte scritti nell'intervallo. Mancano i punti di montaggio senza
+            dispositivo a blocchi (tmpfs, overlay, non montati). Vuoto
+            alla prima chiamata.
+        """
+        now = self.clock()
+        current = self._read()
+        if self._last_time is None:
+            self._last, self._last_time = current, now
+            return {}
+        elapsed = now - self._last_time
+
+        result = {}
+        for mount_point in self.mount_points:
+            device = self.device_of(mount_point)
+            if device is None or device not in current or device not in self._last or elapsed <= 0:
+                continue
+            name, counters = current[device]
+            delta = [counter_delta(c, p) for c, p in zip(counters, self._last[device][1])]
+
+            ios = delta[READS] + delta[WRITES]
+            result[mount_point] = {
+                'device': name,
+                'read_iops': delta[READS] / elapsed,
+                'write_iops': delta[WRITES] / elapsed,
+                'read_bytes_per_s': delta[SECTORS_READ] * SECTOR_BYTES / elapsed,
+                'write_bytes_per_s': delta[SECTORS_WRITTEN] * SECTOR_BYTES / elapsed,
+                'written_bytes': delta[SECTORS_WRITTEN] * SECTOR_BYTES,
+                # Senza operazioni nell'intervallo la latenza non è definita
+                'await_ms': (delta[MS_READING] + delta[MS_WRITING]) / ios if ios else None,
+                'util_percent': min(100.0, delta[MS_BUSY] / (elapsed * 1000) * 100)
+            }
+
+        self._last = current
+        self._last_time = now
+        return result
@@ -0,0 +1,202 @@
+"""
+Endpoint HTTP locale con le metriche in formato OpenMetrics (Prometheus)
+
+Il testo della risposta viene costruito quando arrivano nuovi valori (un
+campione o un periodo aggregato), non durante lo scrape: una richiesta
+restituisce solo i byte già pronti e non legge mai psutil o /proc.
+"""
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Blocchi del payload le cui chiavi sono nomi (interfacce, mount point, ...)
+# e diventano quindi etichette invece che parti del nome della metrica
+LABELLED_BLOCKS = {
+    ('network',): 'interface',
+    ('disks',): 'mount_point',
+    ('pressure',): 'resource',
+    ('processes',): 'process',
+    ('thermal', 'zones'): 'zone',
+    ('thermal', 'throttling'): 'flag',
+    ('self', 'timings'): 'function',
+    ('alerts', 'rules'): 'rule',
+    ('recovery', 'totals'): 'action'
+}
+
+# Chiavi del payload non esportate (già coperte da altre metriche)
+SKIPPED_KEYS = {'histogram_ms', 'timestamp'}
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def metric_name(*parts: str) -> str:
+    """Nome di metrica valido dalle parti indicate"""
+    return _INVALID_NAME_CHARS.sub('_', '_'.join(parts))
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value) -> Optional[str]:
+    """Valore nel formato del testo (None se non numerico)"""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value) if value == value else 'NaN'
+    return None
+
+
+class OpenMetricsExporter:
+    """
+    Metriche dell'ultimo periodo aggregato e dell'ultimo campione
+
+    Il payload aggregato è esportato come <prefix>_<blocco>_<chiave> (es.
+    raspberry_monitor_cpu_avg_percent), i valori dell'ultimo campione come
+    <prefix>_live_<nome> (es. raspberry_monitor_live_cpu). Le righe sono
+    composte con prefissi "nome{etichette} " tenuti in cache, così ogni
+    aggiornamento concatena solo i valori nuovi.
+    """
+
+    def __init__(self, prefix: str = 'raspberry_monitor', labels: Optional[Dict[str, str]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.prefix = metric_name(prefix)
+        self.clock = clock
+        self._labels = ','.join(
+            f'{metric_name(key)}="{escape_label_value(value)}"' for key, value in (labels or {}).items()
+        )
+        # (nome, etichette aggiuntive) -> "nome{etichette} "
+        self._line_prefixes: Dict[Tuple[str, Tuple], str] = {}
+        self._lock = threading.Lock()
+        self._aggregate_text = ''
+        self._live_text = ''
+        self._body = b'# EOF\n'
+
+    def _line_prefix(self, name: str, labels: Tuple = ()) -> str:
+        key = (name, labels)
+        prefix = self._line_prefixes.get(key)
+        if prefix is None:
+            rendered = ','.join(filter(None, [self._labels] + [
+                f'{label}="{escape_label_value(value)}"' for label, value in labels
+            ]))
+            prefix = self._line_prefixes[key] = f'{name}{{{rendered}}} ' if rendered else f'{name} '
+        return prefix
+
+    def _render(self, families: Dict[str, List[Tuple[Tuple, str]]]) -> str:
+        lines = []
+        for name, samples in families.items():
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in samples:
+                lines.append(self._line_prefix(name, labels) + value)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _flatten(self, data: Dict, path: Tuple, labels: Tuple,
+                 families: Dict[str, List[Tuple[Tuple, str]]], labelled: bool = False):
+        """
+        Raccoglie i valori numerici di data nelle famiglie (nome -> [(etichette, valore)])
+
+        labelled indica che data è il contenuto di una voce di un blocco
+        etichettato, la cui chiave è già diventata un'etichetta.
+        """
+        label = None if labelled else LABELLED_BLOCKS.get(path)
+        for key, value in data.items():
+            if key in SKIPPED_KEYS:
+                continue
+            if label is not None and isinstance(value, dict):
+                # La chiave (es. il nome dell'interfaccia) non fa parte del nome
+                self._flatten(value, path, labels + ((label, key),), families, labelled=True)
+                continue
+            if isinstance(value, dict):
+                self._flatten(value, path + (key,), labels, families)
+                continue
+            rendered = format_value(value)
+            if rendered is not None:
+                name = metric_name(self.prefix, *path, key)
+                families.setdefault(name, []).append((labels, rendered))
+
+    def _publish(self):
+        self._body = (self._aggregate_text + self._live_text + '# EOF\n').encode()
+
+    def update_aggregate(self, data: Dict):
+        """Sostituisce le metriche del periodo con quelle del payload indicato"""
+        families: Dict[str, List[Tuple[Tuple, str]]] = {}
+        self._flatten(data, (), (), families)
+        families[metric_name(self.prefix, 'last_aggregate_timestamp_seconds')] = [((), repr(self.clock()))]
+        text = self._render(families)
+        with self._lock:
+            self._aggregate_text = text
+            self._publish()
+
+    def update_live(self, values: Dict[str, Optional[float]]):
+        """Sostituisce i valori dell'ultimo campione (chiamato a ogni campione)"""
+        families = {}
+        for key, value in values.items():
+            rendered = format_value(value)
+            if rendered is not None:
+                families[metric_name(self.prefix, 'live', key)] = [((), rendered)]
+        families[metric_name(self.prefix, 'last_sample_timestamp_seconds')] = [((), repr(self.clock()))]
+        text = self._render(families)
+        with self._lock:
+            self._live_text = text
+            self._publish()
+
+    def body(self) -> bytes:
+        """Risposta pronta per lo scrape"""
+        return self._body
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Intestazioni e corpo sono scritti separatamente: senza questo ogni
+    # risposta attenderebbe l'ACK ritardato del client
+    disable_nagle_algorithm = True
+    exporter: OpenMetricsExporter
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            body = b'Not Found\n'
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        else:
+            body = self.exporter.body()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """Server HTTP su un thread separato che espone /metrics"""
+
+    def __init__(self, exporter: OpenMetricsExporter, host: str = '0.0.0.0', port: int = 9101):
+        handler = type('MetricsHandler', (_MetricsHandler,), {'exporter': exporter})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_port
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.server.server_close()
@@ -0,0 +1,124 @@
+"""
+Storico compatto dei campioni grezzi in un buffer circolare
+"""
+
+import csv
+import math
+import struct
+import threading
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class SampleHistory:
+    """
+    Buffer circolare a dimensione fissa degli ultimi campioni
+
+    Ogni colonna è un array preallocato, quindi la memoria è nota in anticipo
+    (28 byte per campione) e non cresce nel tempo. Il timestamp è quello
+    dell'orologio monotono; i valori non disponibili (es. temperatura) sono
+    memorizzati come NaN.
+    """
+
+    COLUMNS = ('timestamp', 'cpu_percent', 'memory_percent', 'temperature_c', 'net_bytes')
+    # Double per timestamp e contatori, float a 32 bit per le percentuali
+    TYPECODES = ('d', 'f', 'f', 'f', 'd')
+
+    # Formato binario: intestazione (magic, versione, colonne, righe) + righe
+    BINARY_MAGIC = b'RMHS'
+    BINARY_VERSION = 1
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Numero massimo di campioni conservati
+        """
+        self.capacity = max(1, int(capacity))
+        self._columns = {
+            name: array(typecode, [math.nan]) * self.capacity
+            for name, typecode in zip(self.COLUMNS, self.TYPECODES)
+        }
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memoria occupata dai dati"""
+        return sum(col.itemsize * len(col) for col in self._columns.values())
+
+    def append(self, timestamp: float, cpu_percent: float, memory_percent: float,
+               temperature_c: Optional[float] = None, net_bytes: Optional[float] = None):
+        """Aggiunge un campione sovrascrivendo il più vecchio se il buffer è pieno"""
+        values = (timestamp, cpu_percent, memory_percent, temperature_c, net_bytes)
+        with self._lock:
+            index = self._next
+            for name, value in zip(self.COLUMNS, values):
+                self._columns[name][index] = math.nan if value is None else value
+            self._next = (index + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def rows(self, time_offset: float = 0.0) -> Iterator[Tuple[float, ...]]:
+        """
+        Campioni dal più vecchio al più recente
+
+        Args:
+            time_offset: Valore sommato al timestamp monotono (es.
+                         time.time() - time.monotonic() per l'ora Unix)
+        """
+        with self._lock:
+            start = (self._next - self._size) % self.capacity
+            columns = [self._columns[name] for name in self.COLUMNS[1:]]
+            timestamps = self._columns['timestamp']
+            snapshot = []
+            for i in range(self._size):
+                index = (start + i) % self.capacity
+                snapshot.append(
+                    (timestamps[index] + time_offset,) + tuple(col[index] for col in columns)
+                )
+        return iter(snapshot)
+
+    def export_csv(self, path: str, time_offset: float = 0.0) -> int:
+        """Esporta lo storico in CSV (celle vuote per i valori mancanti)"""
+        count = 0
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            for row in self.rows(time_offset):
+                writer.writerow(['' if math.isnan(v) else round(v, 3) for v in row])
+                count += 1
+        return count
+
+    def export_binary(self, path: str, time_offset: float = 0.0) -> int:
+        """
+        Esporta lo storico in formato binario compatto
+
+        Intestazione little-endian '<4sHHI' (magic, versione, numero colonne,
+        numero righe) seguita dalle righe come double '<Nd'.
+        """
+        rows = list(self.rows(time_offset))
+        row_format = struct.Struct(f'<{len(self.COLUMNS)}d')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sHHI', self.BINARY_MAGIC, self.BINARY_VERSION,
+                                len(self.COLUMNS), len(rows)))
+            for row in rows:
+                f.write(row_format.pack(*row))
+        return len(rows)
+
+    @classmethod
+    def read_binary(cls, path: str) -> Iterator[Dict]:
+        """Legge un file esportato con export_binary"""
+        with open(path, 'rb') as f:
+            magic, version, columns, count = struct.unpack('<4sHHI', f.read(12))
+            if magic != cls.BINARY_MAGIC or version != cls.BINARY_VERSION:
+                raise ValueError(f"Formato storico non riconosciuto: {path}")
+            row_format = struct.Struct(f'<{columns}d')
+            for _ in range(count):
+                row = row_format.unpack(f.read(row_format.size))
+                yield {
+                    name: None if math.isnan(value) else value
+                    for name, value in zip(cls.COLUMNS, row)
+                }
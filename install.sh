@@ -26,12 +26,32 @@ mkdir -p "$LOG_DIR"
 
 echo "2. Installazione dipendenze di sistema..."
 apt-get update
-apt-get install -y python3 python3-pip python3-venv wireless-tools
+apt-get install -y python3 python3-pip python3-venv
 
 echo "3. Copia dei file del programma..."
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 cp "$SCRIPT_DIR/monitor.py" "$INSTALL_DIR/"
 cp "$SCRIPT_DIR/config.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/alerts.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/collectors.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/cpustat.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/diskio.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/exporter.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/history.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/netinfo.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/netstats.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/outbox.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/pressure.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/prober.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/procwatch.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/recovery.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/scheduler.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/selfstats.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/stats.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/thermal.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/tsdb.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/wire.py" "$INSTALL_DIR/"
+cp "$SCRIPT_DIR/wireless.py" "$INSTALL_DIR/"
 cp "$SCRIPT_DIR/requirements.txt" "$INSTALL_DIR/"
 
 # Copia il file di configurazione se non esiste già
@@ -5,28 +5,173 @@ Raccoglie dati di sistema e li invia a un'API REST con autenticazione Bearer
 """
 
 import time
+import gzip
 import json
+import queue
+import signal
 import logging
 import psutil
 import requests
-import subprocess
+import threading
 from datetime import datetime
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from alerts import AlertEngine
 from config import Config
+from collectors import BUILTIN_COLLECTORS, COLLECTORS, Collector, load_plugins
+from cpustat import CpuTimesCollector
+from exporter import MetricsServer, OpenMetricsExporter
+from netinfo import InterfaceInventory, default_route_interface
+from history import SampleHistory
+from outbox import Outbox
+from prober import ConnectivityProber
+from recovery import RecoveryLadder, wifi_driver_module
+from scheduler import AdaptiveInterval, FixedRateScheduler
+from selfstats import Instrumentation
+from stats import MetricSet
+from tsdb import TimeSeriesStore
+from wire import CONTENT_TYPE_CBOR, SCHEMA_VERSION, compact_keys, encode_cbor, make_delta, make_delta_batch
+from wireless import WirelessReader
+
+try:
+    import zstandard
+except ImportError:  # Compressione zstd opzionale
+    zstandard = None
 
 
 class SystemMonitor:
     """Monitora i parametri di sistema del Raspberry Pi"""
     
+    # Risposte con cui l'API rifiuta definitivamente un payload: ritentarle
+    # bloccherebbe la coda, gli altri errori (rete, 5xx, 408, 429) sono ritentati
+    REJECTED_STATUS = (400, 413, 422)
+    
     def __init__(self, config: Config):
         self.config = config
         self.setup_logging()
-        self.samples: List[Dict] = []
         self.last_internet_check = datetime.now()
         self.internet_down_since: Optional[datetime] = None
         
+        # Statistiche del periodo corrente, aggiornate in O(1) per campione
+        self.samples = self.new_sample_set()
+        
+        # Archivio locale interrogabile delle serie temporali (None se disabilitato)
+        self.tsdb: Optional[TimeSeriesStore] = None
+        if self.config.tsdb_enabled:
+            self.tsdb = TimeSeriesStore(
+                str(Path(self.config.log_dir) / 'metrics.db'),
+                raw_retention=self.config.tsdb_raw_hours * 3600,
+                minute_retention=self.config.tsdb_minute_days * 86400,
+                hour_retention=self.config.tsdb_hour_days * 86400
+            )
+        
+        # Storico dei campioni grezzi delle ultime ore (None se disabilitato)
+        self.history: Optional[SampleHistory] = None
+        if self.config.history_hours > 0:
+            # Con il campionamento adattivo il buffer copre history_hours
+            # anche alla cadenza più fitta
+            interval = self.config.sample_interval_seconds
+            if self.config.adaptive_sampling:
+                interval = min(interval, self.config.sample_interval_min_seconds)
+            self.history = SampleHistory(self.config.history_hours * 3600 / interval)
+        
+        # Controlli di connettività eseguiti in parallelo
+        self.prober = self.create_prober(self.config)
+        
+        # Tabella delle interfacce di rete, ricostruita solo quando cambia
+        self.interfaces = InterfaceInventory()
+        self.wireless = WirelessReader(use_nl80211=self.config.wireless_nl80211)
+        
+        # CPU misurata come differenza dei contatori tra due campioni
+        self.cpu_collector = CpuTimesCollector(
+            per_core=self.config.cpu_per_core,
+            breakdown=self.config.cpu_breakdown
+        )
+        
+        # Collettori delle metriche, ognuno con la sua cadenza
+        self.collectors = self.create_collectors()
+        
+        # Coda persistente dei dati da inviare
+        self.outbox = Outbox(
+            str(Path(self.config.log_dir) / 'outbox.db'),
+            max_bytes=int(self.config.outbox_max_mb * 1024 * 1024),
+            max_age_seconds=self.config.outbox_max_age_hours * 3600
+        )
+        self._stop_event = threading.Event()
+        
+        # Coda limitata tra il thread di campionamento e quello di invio:
+        # contiene (statistiche, info periodo) dei periodi chiusi
+        # (None = solo svuota l'outbox)
+        self.upload_queue: queue.Queue = queue.Queue(maxsize=self.config.upload_queue_size)
+        self._workers: List[threading.Thread] = []
+        
+        # Sessione HTTP riutilizzata (keep-alive) per evitare un nuovo
+        # handshake TCP/TLS a ogni invio
+        self.session = self.create_session()
+        
+        # Regole di allarme valutate a ogni campione (None se non configurate);
+        # le notifiche partono da un thread dedicato verso alert_url
+        self.alert_queue: queue.Queue = queue.Queue(maxsize=50)
+        self.alerts = self.create_alerts(self.config)
+        if self.alerts is not None:
+            for error in self.alerts.errors:
+                self.logger.error(error)
+        self._alert_sources = self.select_alert_sources(self.alerts)
+        
+        # Azioni di recupero durante un'interruzione, dalla più economica al
+        # riavvio; lo storico dei tentativi è salvato in log_dir
+        self.recovery = RecoveryLadder(
+            self.config.recovery_steps,
+            self.config.reboot_timeout_minutes,
+            # Risolto a ogni chiamata, così i controlli del recupero passano
+            # anche dalla strumentazione applicata più avanti
+            probe=lambda: self.check_internet_connectivity(),
+            history_path=str(Path(self.config.log_dir) / 'recovery.json'),
+            context=self.recovery_context,
+            services=self.config.recovery_services,
+            commands=self.config.recovery_commands,
+            settle_seconds=self.config.recovery_settle_seconds,
+            wait=self._stop_event.wait,
+            logger=self.logger
+        )
+        for error in self.recovery.errors:
+            self.logger.error(error)
+        
+        # Ultimo payload confermato dall'API, base dell'invio differenziale
+        # (None = il prossimo invio è completo)
+        self._delta_base: Optional[Dict] = None
+        # Codice HTTP dell'ultimo invio rifiutato definitivamente (None se
+        # l'ultimo invio è riuscito o va ritentato)
+        self._rejected_status: Optional[int] = None
+        
+        # Ricarica della configurazione richiesta con SIGHUP, eseguita dal
+        # loop principale a fine periodo
+        self._reload_requested = threading.Event()
+        # Impostazioni di campionamento (vedi sampling_settings), preparate
+        # da reload_config e adottate dal loop principale
+        self._sampling: Optional[tuple] = None
+        
+        # Metriche per Prometheus: il testo è preparato a ogni campione e
+        # periodo, lo scrape non esegue letture (None se disabilitato)
+        self.exporter: Optional[OpenMetricsExporter] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        if self.config.exporter_enabled:
+            self.exporter = OpenMetricsExporter(labels={'device_id': self.config.device_id})
+        
+        # Tempi delle funzioni principali e risorse del monitor (None se
+        # disabilitato: in quel caso nessuna funzione viene avvolta)
+        self.instrumentation: Optional[Instrumentation] = None
+        if self.config.self_instrumentation:
+            self.instrumentation = Instrumentation()
+            self.instrumentation.instrument(self, [
+                'collect_sample', 'aggregate_samples', 'get_wifi_status',
+                'check_internet_connectivity', 'send_to_api', 'drain_outbox'
+            ])
+            for collector in self.collectors:
+                self.instrumentation.instrument(collector, ['collect'], prefix=f'collector:{collector.name}.')
+        
     def setup_logging(self):
         """Configura il logging con rotazione automatica"""
         log_dir = Path(self.config.log_dir)
@@ -54,9 +199,9 @@ class SystemMonitor:
         console_handler.setFormatter(formatter)
         self.logger.addHandler(console_handler)
         
-    def get_disk_usage(self) -> Dict:
-        """Ottiene lo spazio su disco"""
-        disk = psutil.disk_usage('/')
+    def get_disk_usage(self, mount_point: str = '/') -> Dict:
+        """Ottiene lo spazio su disco di un punto di montaggio"""
+        disk = psutil.disk_usage(mount_point)
         return {
             'total_gb': round(disk.total / (1024**3), 2),
             'used_gb': round(disk.used / (1024**3), 2),
@@ -67,31 +212,14 @@ class SystemMonitor:
     def get_ethernet_status(self) -> Dict:
         """Verifica lo stato della connettività ethernet"""
         try:
-            # Cerca interfacce ethernet (eth0, enp, etc.)
-            stats = psutil.net_if_stats()
-            addrs = psutil.net_if_addrs()
-            
-            # Trova interfaccia ethernet
-            eth_interface = None
-            for iface in stats.keys():
-                if iface.startswith('eth') or iface.startswith('enp'):
-                    eth_interface = iface
-                    break
+            # Interfaccia ethernet principale (eth0, end0, enp..., classificata da sysfs)
+            eth = self.interfaces.primary('ethernet')
             
-            if eth_interface and eth_interface in stats:
-                is_up = stats[eth_interface].isup
-                # Ottieni IP se disponibile
-                ip_address = None
-                if eth_interface in addrs:
-                    for addr in addrs[eth_interface]:
-                        if addr.family == 2:  # AF_INET
-                            ip_address = addr.address
-                            break
-                
+            if eth:
                 return {
-                    'interface': eth_interface,
-                    'connected': is_up,
-                    'ip_address': ip_address
+                    'interface': eth['interface'],
+                    'connected': eth['is_up'],
+                    'ip_address': eth['ip_address']
                 }
             else:
                 return {
@@ -111,54 +239,26 @@ class SystemMonitor:
     def get_wifi_status(self) -> Dict:
         """Verifica lo stato della connettività WiFi e il segnale"""
         try:
-            # Cerca interfacce wifi (wlan0, wlp, etc.)
-            stats = psutil.net_if_stats()
-            addrs = psutil.net_if_addrs()
-            
-            # Trova interfaccia wifi
-            wifi_interface = None
-            for iface in stats.keys():
-                if iface.startswith('wlan') or iface.startswith('wlp'):
-                    wifi_interface = iface
-                    break
+            # Interfaccia wifi principale (wlan0, wlp..., classificata da sysfs)
+            wifi = self.interfaces.primary('wifi')
             
-            if not wifi_interface:
+            if not wifi:
                 return {
                     'interface': None,
                     'connected': False,
                     'ip_address': None,
-                    'signal_strength': None
+                    'signal_strength_dbm': None
                 }
             
-            is_up = stats[wifi_interface].isup
-            
-            # Ottieni IP
-            ip_address = None
-            if wifi_interface in addrs:
-                for addr in addrs[wifi_interface]:
-                    if addr.family == 2:  # AF_INET
-                        ip_address = addr.address
-                        break
+            wifi_interface = wifi['interface']
+            is_up = wifi['is_up']
+            ip_address = wifi['ip_address']
             
-            # Ottieni intensità del segnale WiFi usando iwconfig
-            signal_strength = None
+            # Segnale e statistiche del link letti in-process
+            # (/proc/net/wireless e nl80211, senza lanciare iwconfig)
+            link = {}
             try:
-                result = subprocess.run(
-                    ['iwconfig', wifi_interface],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                # Parsing dell'output di iwconfig
-                for line in result.stdout.split('\n'):
-                    if 'Signal level' in line:
-                        # Estrae il valore del segnale (es: "Signal level=-45 dBm")
-                        parts = line.split('Signal level=')
-                        if len(parts) > 1:
-                            signal = parts[1].split()[0]
-                            signal_strength = int(signal)
-                        break
+                link = self.wireless.read(wifi_interface)
             except Exception as e:
                 self.logger.debug(f"Non è stato possibile ottenere il segnale WiFi: {e}")
             
@@ -166,7 +266,15 @@ class SystemMonitor:
                 'interface': wifi_interface,
                 'connected': is_up and ip_address is not None,
                 'ip_address': ip_address,
-                'signal_strength_dbm': signal_strength
+                'signal_strength_dbm': link.get('signal_dbm'),
+                'noise_dbm': link.get('noise_dbm'),
+                'link_quality': link.get('link_quality'),
+                'tx_bitrate_mbps': link.get('tx_bitrate_mbps'),
+                'rx_bitrate_mbps': link.get('rx_bitrate_mbps'),
+                'tx_retries': link.get('tx_retries'),
+                'tx_failed': link.get('tx_failed'),
+                'discarded_retry': link.get('discarded_retry'),
+                'missed_beacons': link.get('missed_beacons')
             }
             
         except Exception as e:
@@ -179,6 +287,14 @@ class SystemMonitor:
                 'error': str(e)
             }
     
+    def get_interfaces(self) -> List[Dict]:
+        """Stato di tutte le interfacce di rete rilevanti"""
+        try:
+            return self.interfaces.interfaces()
+        except Exception as e:
+            self.logger.error(f"Errore nella lettura delle interfacce di rete: {e}")
+            return []
+    
     def get_memory_usage(self) -> Dict:
         """Ottiene l'utilizzo della RAM"""
         mem = psutil.virtual_memory()
@@ -189,110 +305,726 @@ class SystemMonitor:
             'percent': mem.percent
         }
     
-    def get_cpu_usage(self) -> float:
-        """Ottiene la percentuale di utilizzo della CPU"""
-        return psutil.cpu_percent(interval=0.1)
+    def get_cpu_usage(self) -> Optional[float]:
+        """
+        Percentuale di utilizzo della CPU dell'ultimo campione (None se non
+        ancora misurata); non avanza i contatori del campionamento
+        """
+        last = self.cpu_collector.last
+        return last['percent'] if last else None
     
     def check_internet_connectivity(self) -> bool:
-        """Verifica la connettività a Internet"""
+        """Verifica la connettività a Internet (controlli TCP, DNS e HTTP in parallelo)"""
         try:
-            # Prova a connettersi a servizi affidabili
-            for host in ['8.8.8.8', '1.1.1.1']:
-                try:
-                    response = requests.get(
-                        f'http://{host}',
-                        timeout=5
-                    )
-                    return True
-                except:
-                    continue
-            
-            # Prova anche con DNS
-            try:
-                response = requests.get(
-                    'http://www.google.com',
-                    timeout=5
-                )
-                return True
-            except:
-                pass
-            
-            return False
+            return self.prober.probe()
         except Exception as e:
             self.logger.error(f"Errore nel controllo connettività: {e}")
             return False
     
-    def collect_sample(self):
-        """Raccoglie un campione di dati"""
-        sample = {
-            'timestamp': datetime.now().isoformat(),
-            'cpu_percent': self.get_cpu_usage(),
-            'memory': self.get_memory_usage()
-        }
-        self.samples.append(sample)
+    def recovery_context(self) -> Dict:
+        """
+        Interfaccia e modulo del driver WiFi su cui agiscono le azioni di recupero
+        
+        Senza recovery_interface si usa l'interfaccia della rotta predefinita,
+        altrimenti la prima WiFi o ethernet attiva con un IP, altrimenti
+        quella WiFi principale (o ethernet).
+        """
+        interface = self.config.recovery_interface or default_route_interface()
+        if not interface:
+            entry = (self.interfaces.connected()
+                     or self.interfaces.primary('wifi') or self.interfaces.primary('ethernet'))
+            interface = entry['interface'] if entry else None
+        module = self.config.recovery_wifi_module
+        if not module and interface:
+            module = wifi_driver_module(interface)
+        return {'interface': interface, 'module': module}
     
-    def aggregate_samples(self) -> Dict:
-        """Aggrega i campioni raccolti nel periodo di controllo"""
-        if not self.samples:
+    def create_prober(self, config: Config) -> ConnectivityProber:
+        """Crea i controlli di connettività dalla configurazione indicata"""
+        prober = ConnectivityProber(
+            config.probe_targets,
+            timeout=config.probe_timeout_seconds,
+            window=config.probe_window,
+            api_url=config.api_url
+        )
+        for error in prober.errors:
+            self.logger.error(error)
+        return prober
+    
+    def create_alerts(self, config: Config) -> Optional[AlertEngine]:
+        """Crea il motore degli allarmi (None se non ci sono regole)"""
+        if not config.alert_rules:
+            return None
+        return AlertEngine(
+            config.alert_rules, self.enqueue_alert,
+            device_id=config.device_id,
+            cooldown=config.alert_cooldown_seconds,
+            max_per_hour=config.alert_max_per_hour
+        )
+    
+    def select_alert_sources(self, alerts: Optional[AlertEngine]) -> Dict:
+        """Letture aggiuntive solo per le metriche usate dalle regole"""
+        if alerts is None:
             return {}
+        return {name: source for name, source in self.alert_sources().items() if name in alerts.metrics}
+    
+    def alert_sources(self) -> Dict:
+        """Metriche delle regole di allarme non prodotte dai collettori a ogni campione"""
+        def wifi_signal():
+            wifi = self.interfaces.primary('wifi')
+            return self.wireless.signal_dbm(wifi['interface']) if wifi else None
         
-        cpu_values = [s['cpu_percent'] for s in self.samples]
-        mem_values = [s['memory']['percent'] for s in self.samples]
+        return {
+            'disk_percent': lambda: psutil.disk_usage(self.config.disk_mount_points[0]).percent,
+            'wifi_signal_dbm': wifi_signal
+        }
+    
+    def evaluate_alerts(self, values: Dict[str, Optional[float]]):
+        """Valuta le regole di allarme sui valori del campione"""
+        if self._alert_sources:
+            values = dict(values)
+            for name, source in self._alert_sources.items():
+                try:
+                    values[name] = source()
+                except Exception as e:
+                    self.logger.debug(f"Lettura di {name} per gli allarmi non riuscita: {e}")
+        self.alerts.evaluate(values)
+    
+    def enqueue_alert(self, alert: Dict):
+        """Registra l'allarme e lo passa al thread di notifica senza bloccare"""
+        self.logger.warning(f"ALERT: {json.dumps(alert, ensure_ascii=False)}")
+        if not self.config.alert_url:
+            return
+        try:
+            self.alert_queue.put_nowait(alert)
+        except queue.Full:
+            try:
+                self.alert_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.alert_queue.put_nowait(alert)
+    
+    def new_sample_set(self) -> MetricSet:
+        """Crea l'accumulatore dei campioni di un periodo"""
+        return MetricSet(quantile=0.95 if self.config.aggregate_quantiles else None)
+    
+    def create_collectors(self) -> List[Collector]:
+        """
+        Crea i collettori predefiniti e quelli dei plugin configurati
+        
+        La sezione 'collectors' di config.json può disabilitarli
+        ("enabled": false), cambiarne la cadenza ("interval_seconds") e
+        passare opzioni ai plugin.
+        """
+        names = list(BUILTIN_COLLECTORS)
+        for spec in self.config.collector_plugins:
+            try:
+                names.extend(n for n in load_plugins([spec]) if n not in names)
+            except Exception as e:
+                self.logger.error(f"Errore nel caricamento del plugin {spec}: {e}")
+        
+        settings = self.config.collectors
+        for name in settings:
+            if name not in COLLECTORS:
+                self.logger.warning(f"Collettore sconosciuto in configurazione: {name}")
+        
+        collectors = []
+        for name in names:
+            options = settings.get(name, {})
+            if not isinstance(options, dict):
+                self.logger.error(f"Impostazioni del collettore {name} non valide (non è un oggetto): ignorate")
+                options = {}
+            options = dict(options)
+            if not options.pop('enabled', True):
+                continue
+            cls = COLLECTORS[name]
+            interval = options.pop('interval_seconds', cls.default_interval)
+            try:
+                collectors.append(cls(self, interval, **options))
+            except Exception as e:
+                self.logger.error(f"Errore nella creazione del collettore {name}: {e}")
+        return collectors
+    
+    def collect_sample(self) -> Dict[str, Optional[float]]:
+        """
+        Esegue i collettori di turno e aggiorna le statistiche del periodo
+        
+        Returns:
+            Valori istantanei del campione (cpu, memory, temperature, ...)
+        """
+        now = time.monotonic()
+        # Metà intervallo di tolleranza: le scadenze dei collettori e quelle
+        # dello scheduler non coincidono esattamente
+        tolerance = self.config.sample_interval_seconds / 2
+        samples = self.samples
+        weighted = self.config.adaptive_sampling
+        values = {}
+        for collector in self.collectors:
+            if not collector.is_due(now, tolerance):
+                continue
+            if weighted:
+                # Con intervalli variabili ogni lettura pesa quanto il tempo
+                # trascorso dalla precedente: le medie sono medie nel tempo
+                if collector.last_run is not None:
+                    samples.weight = now - collector.last_run
+                else:
+                    samples.weight = collector.interval or self.config.sample_interval_seconds
+            try:
+                values.update(collector.collect(samples))
+            except Exception as e:
+                self.logger.error(f"Errore nel collettore {collector.name}: {e}")
+            collector.schedule_next(now)
+        
+        samples.tick()
+        
+        if self.history is not None:
+            self.history.append(now, values.get('cpu'), values.get('memory'),
+                                temperature_c=values.get('temperature'),
+                                net_bytes=values.get('net_bytes'))
+        if self.tsdb is not None and values:
+            self.tsdb.add(time.time(), values)
+        if self.exporter is not None:
+            self.exporter.update_live(values)
+        if self.alerts is not None:
+            self.evaluate_alerts(values)
+        return values
+    
+    def aggregate_samples(self, samples: Optional[MetricSet] = None,
+                          period: Optional[Dict] = None) -> Dict:
+        """
+        Aggrega i campioni raccolti nel periodo di controllo
+        
+        Args:
+            samples: Statistiche del periodo; se None usa quelle correnti
+            period: Durata misurata e statistiche di temporizzazione del
+                    periodo fornite dal loop principale
+        """
+        if samples is None:
+            samples = self.samples
+        if not samples:
+            return {}
         
         aggregated = {
             'device_id': self.config.device_id,
             'timestamp': datetime.now().isoformat(),
             'period_seconds': self.config.check_period_minutes * 60,
-            'samples_count': len(self.samples),
-            
-            # Dati disco (istantanei)
-            'disk': self.get_disk_usage(),
-            
-            # Connettività
-            'ethernet': self.get_ethernet_status(),
-            'wifi': self.get_wifi_status(),
-            
-            # CPU (max e average)
-            'cpu': {
-                'max_percent': round(max(cpu_values), 2),
-                'avg_percent': round(sum(cpu_values) / len(cpu_values), 2),
-                'samples': len(cpu_values)
-            },
-            
-            # RAM (max e average)
-            'memory': {
-                'max_percent': round(max(mem_values), 2),
-                'avg_percent': round(sum(mem_values) / len(mem_values), 2),
-                'current': self.get_memory_usage(),
-                'samples': len(mem_values)
-            }
+            'samples_count': len(samples)
         }
         
+        # Blocchi dei collettori (cpu, memory, disk, ethernet, wifi, ...)
+        for collector in self.collectors:
+            try:
+                aggregated.update(collector.aggregate(samples))
+            except Exception as e:
+                self.logger.error(f"Errore nell'aggregazione del collettore {collector.name}: {e}")
+        
+        # Stato delle regole di allarme nel periodo
+        if self.alerts is not None:
+            aggregated['alerts'] = self.alerts.summary(reset=True)
+        
+        # Tentativi di recupero della connessione dall'invio precedente
+        recovery = self.recovery.report(reset=True)
+        if recovery:
+            aggregated['recovery'] = recovery
+        
+        # Costo del monitor stesso nel periodo
+        if self.instrumentation is not None:
+            aggregated['self'] = self.instrumentation.report(reset=True)
+        
+        # Durata reale del periodo e qualità della temporizzazione
+        if period:
+            aggregated.update(period)
+        
         return aggregated
     
-    def send_to_api(self, data: Dict) -> bool:
-        """Invia i dati all'API REST con autenticazione Bearer"""
+    def export_history(self) -> Optional[str]:
+        """
+        Esporta lo storico dei campioni grezzi in log_dir
+        
+        Returns:
+            Path del file creato, o None se lo storico è disabilitato
+        """
+        if self.history is None:
+            return None
+        
+        binary = self.config.history_export_format == 'binary'
+        name = f"history-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{'bin' if binary else 'csv'}"
+        path = str(Path(self.config.log_dir) / name)
+        # Timestamp convertiti da orologio monotono a ora Unix
+        offset = time.time() - time.monotonic()
+        
+        try:
+            if binary:
+                count = self.history.export_binary(path, offset)
+            else:
+                count = self.history.export_csv(path, offset)
+        except OSError as e:
+            self.logger.error(f"Errore nell'esportazione dello storico: {e}")
+            return None
+        
+        self.logger.info(f"Storico esportato: {count} campioni in {path}")
+        return path
+    
+    def _handle_export_signal(self, signum, frame):
+        """SIGUSR2: esporta lo storico su un thread separato"""
+        # Il thread principale potrebbe essere dentro history.append:
+        # l'esportazione attende il lock senza bloccarlo
+        threading.Thread(target=self.export_history, name='history-export', daemon=True).start()
+    
+    def dump_self_stats(self) -> Optional[str]:
+        """
+        Scrive in log_dir i tempi e le risorse del monitor dall'ultimo invio
+        
+        Returns:
+            Path del file creato, o None se la strumentazione è disabilitata
+        """
+        if self.instrumentation is None:
+            self.logger.info("Strumentazione del monitor disabilitata (self_instrumentation): nessuna statistica da scrivere")
+            return None
+        report = self.instrumentation.report()
+        path = Path(self.config.log_dir) / f"self-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
         try:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            self.logger.error(f"Errore nella scrittura delle statistiche del monitor: {e}")
+            return None
+        self.logger.info(f"Statistiche del monitor scritte in {path}: {json.dumps(report)}")
+        return str(path)
+    
+    def _handle_dump_signal(self, signum, frame):
+        """Handler di SIGUSR1: scrive le statistiche del monitor in un thread separato"""
+        threading.Thread(target=self.dump_self_stats, name='self-dump', daemon=True).start()
+    
+    def _handle_reload_signal(self, signum, frame):
+        """SIGHUP: ricarica la configurazione alla fine del periodo in corso"""
+        self._reload_requested.set()
+    
+    def reload_due(self) -> bool:
+        """Ricarica richiesta con SIGHUP o file di configurazione modificato"""
+        if self._reload_requested.is_set():
+            self._reload_requested.clear()
+            return True
+        return bool(self.config.config_file) and self.config.config_watch and self.config.changed_on_disk()
+    
+    def reload_config(self) -> bool:
+        """
+        Rilegge il file di configurazione e applica i valori cambiati
+        
+        La nuova configurazione viene validata e i componenti da ricreare
+        (controlli di connettività, allarmi, recupero) vengono preparati
+        prima di modificare lo stato: se qualcosa non è valido si continua
+        con la configurazione in uso. Le chiavi di Config.RESTART_KEYS
+        mantengono il valore in uso fino al riavvio del servizio.
+        
+        Returns:
+            True se è stato applicato almeno un cambiamento
+        """
+        try:
+            values = self.config.read()
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Configurazione non ricaricata: {e}")
+            return False
+        
+        current = self.config.config
+        errors = Config.validate(values)
+        unknown = Config.unknown_keys(values)
+        if unknown:
+            self.logger.warning(f"Chiavi sconosciute in configurazione: {', '.join(sorted(unknown))}")
+        changed = {key for key in Config.DEFAULT_CONFIG if values.get(key) != current.get(key)}
+        restart = changed & Config.RESTART_KEYS
+        for key in restart:
+            values[key] = current[key]
+        changed -= restart
+        
+        # Componenti ricreati con i nuovi valori, senza ancora sostituirli
+        candidate = Config(self.config.config_file, values=values)
+        prober, alerts = self.prober, self.alerts
+        sampling = None
+        if not errors:
+            try:
+                sampling = self.sampling_settings(candidate)
+                if changed & {'probe_targets', 'probe_timeout_seconds', 'probe_window', 'api_url'}:
+                    prober = self.create_prober(candidate)
+                if changed & {'alert_rules', 'alert_cooldown_seconds', 'alert_max_per_hour'}:
+                    alerts = self.create_alerts(candidate)
+                    if alerts is not None:
+                        errors.extend(alerts.errors)
+            except Exception as e:
+                errors.append(str(e))
+            _, step_errors = RecoveryLadder.parse_steps(
+                candidate.recovery_steps, candidate.reboot_timeout_minutes, candidate.recovery_commands
+            )
+            errors.extend(step_errors)
+        if errors:
+            self.logger.error(f"Configurazione non applicata: {'; '.join(errors)}")
+            return False
+        if restart:
+            self.logger.warning(
+                f"Modifiche applicate al prossimo riavvio del servizio: {', '.join(sorted(restart))}"
+            )
+        if not changed:
+            return False
+        
+        # Applicazione: il loop principale è fermo tra due periodi e gli
+        # altri thread vedono i riferimenti vecchi o quelli nuovi
+        if alerts is not self.alerts and alerts is not None and self.alerts is not None:
+            alerts.adopt(self.alerts)
+        self.config.config = values
+        self._sampling = sampling
+        self.prober = prober
+        self._alert_sources = self.select_alert_sources(alerts)
+        self.alerts = alerts
+        if changed & {'recovery_steps', 'reboot_timeout_minutes', 'recovery_services',
+                      'recovery_commands', 'recovery_settle_seconds'}:
+            self.recovery.configure(
+                values['recovery_steps'], values['reboot_timeout_minutes'], values['recovery_services'],
+                values['recovery_commands'], values['recovery_settle_seconds']
+            )
+        self.outbox.max_bytes = int(values['outbox_max_mb'] * 1024 * 1024)
+        self.outbox.max_age_seconds = values['outbox_max_age_hours'] * 3600
+        if changed & {'api_url', 'api_format', 'api_delta'}:
+            self._delta_base = None
+        if self.config.alert_url and not any(worker.name == 'alerts' for worker in self._workers):
+            self.start_worker(self._alert_worker, 'alerts')
+        
+        self.logger.info(f"Configurazione ricaricata: {', '.join(sorted(changed))}")
+        return True
+    
+    def create_session(self) -> requests.Session:
+        """Crea la sessione HTTP con pool di connessioni persistenti"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def encode_body(self, data) -> tuple:
+        """
+        Serializza e, se configurato, comprime il corpo della richiesta
+        
+        Returns:
+            Tupla (body, content_encoding, dimensione non compressa)
+        """
+        if self.config.api_format == 'cbor':
+            body = encode_cbor(compact_keys(data))
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        raw_size = len(body)
+        compression = self.config.api_compression
+        
+        if compression == 'zstd' and zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress(body), 'zstd', raw_size
+        if compression in ('gzip', 'zstd'):
+            # zstd non disponibile: ripiega su gzip
+            return gzip.compress(body, compresslevel=6), 'gzip', raw_size
+        return body, None, raw_size
+    
+    def send_to_api(self, data) -> bool:
+        """
+        Invia i dati all'API REST con autenticazione Bearer
+        
+        Args:
+            data: Payload aggregato, oppure lista di payload durante il
+                  recupero della coda dopo un'interruzione
+        """
+        # Con api_delta i sotto-oggetti invariati rispetto all'ultimo
+        # payload confermato vengono inviati come riferimenti
+        base = self._delta_base if self.config.api_delta else None
+        self._rejected_status = None
+        if base is None:
+            wire_data = data
+        elif isinstance(data, list):
+            wire_data = make_delta_batch(data, base)
+        else:
+            wire_data = make_delta(data, base)
+        
+        try:
+            body, content_encoding, raw_size = self.encode_body(wire_data)
             headers = {
                 'Authorization': f'Bearer {self.config.api_bearer_token}',
-                'Content-Type': 'application/json'
+                'Content-Type': (
+                    f'{CONTENT_TYPE_CBOR}; schema={SCHEMA_VERSION}'
+                    if self.config.api_format == 'cbor' else 'application/json'
+                )
             }
+            if content_encoding:
+                headers['Content-Encoding'] = content_encoding
             
-            response = requests.post(
+            start = time.monotonic()
+            response = self.session.post(
                 self.config.api_url,
-                json=data,
+                data=body,
                 headers=headers,
                 timeout=30
             )
+            latency_ms = (time.monotonic() - start) * 1000
+            
+            if response.status_code == 409 and base is not None:
+                # L'API non ha il payload di base (es. server riavviato): invio completo
+                self.logger.warning("Payload di base non riconosciuto dall'API, invio completo")
+                self._delta_base = None
+                return self.send_to_api(data)
             
             response.raise_for_status()
-            self.logger.info(f"Dati inviati con successo all'API (Status: {response.status_code})")
+            if self.config.api_delta:
+                self._delta_base = data[-1] if isinstance(data, list) else data
+            self.logger.info(
+                f"Dati inviati con successo all'API (Status: {response.status_code}, "
+                f"{len(body)} byte inviati, {raw_size} non compressi, {latency_ms:.0f} ms)"
+            )
             return True
             
         except requests.exceptions.RequestException as e:
+            response = getattr(e, 'response', None)
+            if response is not None and response.status_code in self.REJECTED_STATUS:
+                self._rejected_status = response.status_code
             self.logger.error(f"Errore nell'invio dei dati all'API: {e}")
             return False
     
+    def drain_outbox(self) -> int:
+        """
+        Invia i dati in coda dal più vecchio, a blocchi, finché l'API risponde
+        
+        Returns:
+            Numero di payload inviati e rimossi dalla coda
+        """
+        sent = 0
+        dropped = 0
+        batch_size = max(1, self.config.outbox_batch_size)
+        
+        while not self._stop_event.is_set():
+            batch = self.outbox.peek_batch(batch_size)
+            if not batch:
+                break
+            
+            ok, batch_sent, batch_dropped = self.send_rows(batch)
+            sent += batch_sent
+            dropped += batch_dropped
+            if not ok:
+                break
+        
+        if sent or dropped:
+            pending = self.outbox.stats()['pending']
+            self.logger.info(
+                f"Coda di invio: {sent} payload inviati, {dropped} scartati, {pending} in attesa"
+            )
+        return sent
+    
+    def send_rows(self, rows: List[Tuple[int, Dict]]) -> Tuple[bool, int, int]:
+        """
+        Invia un blocco della coda e rimuove i payload confermati o rifiutati
+        
+        Un blocco rifiutato dall'API (REJECTED_STATUS) viene diviso a metà e
+        ritentato, finché il payload rifiutato resta da solo e viene scartato:
+        gli altri del blocco vengono comunque inviati.
+        
+        Returns:
+            (proseguire con la coda, payload inviati, payload scartati)
+        """
+        ids = [row_id for row_id, _ in rows]
+        payloads = [data for _, data in rows]
+        
+        # Il payload singolo mantiene il formato originale dell'API
+        body = payloads[0] if len(payloads) == 1 else payloads
+        if self.send_to_api(body):
+            self.outbox.ack(ids)
+            return True, len(ids), 0
+        
+        status = self._rejected_status
+        if status is None:
+            return False, 0, 0
+        if len(rows) == 1:
+            self.logger.error(
+                f"Payload {payloads[0].get('timestamp', ids[0])} rifiutato dall'API "
+                f"(Status: {status}): rimosso dalla coda"
+            )
+            self.outbox.ack(ids)
+            return True, 0, 1
+        
+        half = len(rows) // 2
+        ok, sent, dropped = self.send_rows(rows[:half])
+        if not ok or self._stop_event.is_set():
+            return False, sent, dropped
+        ok, second_sent, second_dropped = self.send_rows(rows[half:])
+        return ok, sent + second_sent, dropped + second_dropped
+    
+    def enqueue_for_upload(self, data: Dict):
+        """Accoda i dati su disco per l'invio all'API"""
+        try:
+            evicted = self.outbox.enqueue(data)
+            if evicted:
+                self.logger.warning(f"Coda di invio piena: eliminati {evicted} payload più vecchi")
+        except Exception as e:
+            self.logger.error(f"Errore nell'accodamento dei dati: {e}")
+    
+    def flush_tsdb(self):
+        """Scrive nell'archivio locale i campioni in attesa"""
+        if self.tsdb is None:
+            return
+        try:
+            self.tsdb.flush()
+        except Exception as e:
+            self.logger.error(f"Errore nella scrittura dell'archivio metriche: {e}")
+    
+    def submit_period(self, samples: MetricSet, period: Optional[Dict] = None):
+        """
+        Passa i campioni di un periodo chiuso al thread di invio senza bloccare
+        
+        Se il thread di invio è in ritardo viene scartato il periodo più vecchio
+        in attesa, così il campionamento non si ferma mai.
+        """
+        try:
+            self.upload_queue.put_nowait((samples, period))
+        except queue.Full:
+            try:
+                self.upload_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.logger.warning("Thread di invio in ritardo: scartato il periodo più vecchio in attesa")
+            try:
+                self.upload_queue.put_nowait((samples, period))
+            except queue.Full:
+                pass
+    
+    def request_drain(self):
+        """Chiede al thread di invio di svuotare subito l'outbox"""
+        try:
+            self.upload_queue.put_nowait(None)
+        except queue.Full:
+            # Il thread ha già lavoro in coda e svuoterà l'outbox comunque
+            pass
+    
+    def _upload_worker(self):
+        """Thread che aggrega i periodi chiusi, li salva e li invia all'API"""
+        while not self._stop_event.is_set():
+            try:
+                item = self.upload_queue.get(timeout=self.config.outbox_retry_seconds)
+            except queue.Empty:
+                item = None
+            if self._stop_event.is_set():
+                break
+            
+            try:
+                if item is not None and item[0]:
+                    aggregated_data = self.aggregate_samples(*item)
+                    
+                    # Salva nel log locale
+                    self.save_to_log(aggregated_data)
+                    
+                    if self.exporter is not None:
+                        self.exporter.update_aggregate(aggregated_data)
+                    
+                    # Accoda per l'invio all'API (ritentato finché non va a buon fine)
+                    self.enqueue_for_upload(aggregated_data)
+                    
+                    # Scrive su disco i campioni del periodo nell'archivio locale
+                    self.flush_tsdb()
+                
+                # Invia solo quando non ci sono altri periodi da accodare,
+                # così l'arretrato parte in un unico blocco
+                if self.upload_queue.empty():
+                    self.drain_outbox()
+            except Exception as e:
+                self.logger.error(f"Errore nel thread di invio: {e}", exc_info=True)
+    
+    def _alert_worker(self):
+        """Thread che invia gli allarmi ad alert_url appena scattano"""
+        session = self.create_session()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    alert = self.alert_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                # Pochi tentativi ravvicinati: l'allarme è utile solo se tempestivo
+                for attempt in range(3):
+                    try:
+                        response = session.post(
+                            self.config.alert_url,
+                            json=alert,
+                            headers={'Authorization': f'Bearer {self.config.api_bearer_token}'},
+                            timeout=10
+                        )
+                        response.raise_for_status()
+                        break
+                    except requests.exceptions.RequestException as e:
+                        self.logger.error(f"Errore nell'invio dell'allarme {alert['rule']}: {e}")
+                        if self._stop_event.wait(timeout=5 * (attempt + 1)):
+                            break
+        finally:
+            session.close()
+    
+    def _connectivity_worker(self):
+        """Thread che controlla la connessione Internet ogni minuto"""
+        while not self._stop_event.wait(timeout=60):
+            try:
+                self.handle_internet_outage()
+            except Exception as e:
+                self.logger.error(f"Errore nel thread di controllo connettività: {e}", exc_info=True)
+    
+    def start_workers(self):
+        """Avvia i thread di invio e di controllo connettività"""
+        self.start_worker(self._upload_worker, 'uploader')
+        self.start_worker(self._connectivity_worker, 'connectivity')
+        if self.config.alert_url:
+            self.start_worker(self._alert_worker, 'alerts')
+        
+        if self.exporter is not None and self.metrics_server is None:
+            try:
+                self.metrics_server = MetricsServer(
+                    self.exporter, self.config.exporter_host, self.config.exporter_port
+                )
+                self.metrics_server.start()
+                self.logger.info(
+                    f"Metriche OpenMetrics su http://{self.config.exporter_host}:{self.metrics_server.port}/metrics"
+                )
+            except OSError as e:
+                self.metrics_server = None
+                self.logger.error(f"Impossibile avviare l'endpoint delle metriche: {e}")
+        
+        # Invia subito eventuali dati rimasti da un'esecuzione precedente
+        self.request_drain()
+    
+    def start_worker(self, target, name: str):
+        """Avvia un thread secondario, fermato da stop_workers"""
+        worker = threading.Thread(target=target, name=name, daemon=True)
+        worker.start()
+        self._workers.append(worker)
+    
+    def stop_workers(self):
+        """Ferma i thread secondari e chiude database e socket"""
+        self._stop_event.set()
+        self.request_drain()
+        for worker in self._workers:
+            worker.join(timeout=5)
+        busy = [worker.name for worker in self._workers if worker.is_alive()]
+        self._workers = []
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        for collector in self.collectors:
+            collector.close()
+        self.interfaces.close()
+        self.wireless.close()
+        
+        if busy:
+            # Un thread ancora attivo userebbe un database chiuso: si
+            # scrivono solo i dati in attesa
+            self.logger.warning(f"Thread non terminati ({', '.join(busy)}): database lasciati aperti")
+            self.flush_tsdb()
+            return
+        # La chiusura dell'ultima connessione riporta il WAL nel database
+        try:
+            self.outbox.close()
+        except Exception as e:
+            self.logger.error(f"Errore nella chiusura della coda di invio: {e}")
+        if self.tsdb is not None:
+            try:
+                self.tsdb.close()
+            except Exception as e:
+                self.logger.error(f"Errore nella chiusura dell'archivio metriche: {e}")
+    
     def save_to_log(self, data: Dict):
         """Salva i dati aggregati nel log locale"""
         log_line = json.dumps(data, ensure_ascii=False)
@@ -307,6 +1039,9 @@ class SystemMonitor:
             if self.internet_down_since:
                 self.logger.info("Connessione Internet ripristinata")
                 self.internet_down_since = None
+                self.recovery.reset()
+                # Invia subito i dati accumulati durante l'interruzione
+                self.request_drain()
         else:
             # Nessuna connessione
             if self.internet_down_since is None:
@@ -323,19 +1058,63 @@ class SystemMonitor:
                     f"(limite: {self.config.reboot_timeout_minutes} minuti)"
                 )
                 
-                if outage_minutes >= self.config.reboot_timeout_minutes:
+                # Un'azione di recupero alla volta, dalla più economica al riavvio
+                action = self.recovery.due(outage_duration)
+                if action == 'reboot':
                     self.logger.critical(
                         f"Connessione Internet assente per {outage_minutes:.1f} minuti. "
                         f"RIAVVIO DEL SISTEMA!"
                     )
-                    self.reboot_system()
+                elif action is not None:
+                    self.logger.warning(f"Tentativo di recupero della connessione: {action}")
+                attempt = self.recovery.attempt(outage_duration)
+                if attempt is None:
+                    return
+                if attempt['result'] == 'recovered':
+                    self.logger.info(
+                        f"Connessione ripristinata da {attempt['action']} in {attempt['duration_ms']:.0f} ms"
+                    )
+                    self.internet_down_since = None
+                    self.recovery.reset()
+                    self.request_drain()
+                elif attempt['result'] != 'rebooting':
+                    self.logger.warning(
+                        f"Recupero con {attempt['action']}: {attempt['result']}"
+                        + (f" ({attempt['error']})" if attempt['error'] else '')
+                    )
     
-    def reboot_system(self):
-        """Riavvia il sistema"""
-        try:
-            subprocess.run(['sudo', 'reboot'], check=True)
-        except Exception as e:
-            self.logger.error(f"Errore nel riavvio del sistema: {e}")
+    def sampling_settings(self, config: Optional[Config] = None) -> tuple:
+        """
+        Intervallo, durata del periodo, campioni attesi e campionamento
+        adattivo (None se disabilitato) dalla configurazione indicata
+        (quella corrente se None)
+        
+        Raises:
+            ValueError: Se le soglie del campionamento adattivo non sono valide
+        """
+        config = config or self.config
+        sample_interval = config.sample_interval_seconds
+        check_period = config.check_period_minutes * 60
+        expected_samples = max(1, int(round(check_period / sample_interval)))
+        
+        # Campionamento adattivo: intervallo più lungo con metriche stabili,
+        # più breve con variazioni rapide o soglie superate
+        adaptive: Optional[AdaptiveInterval] = None
+        if config.adaptive_sampling:
+            adaptive = AdaptiveInterval(
+                sample_interval,
+                config.sample_interval_min_seconds,
+                min(config.sample_interval_max_seconds, check_period),
+                config.adaptive_triggers
+            )
+        return sample_interval, check_period, expected_samples, adaptive
+    
+    def log_sampling(self, adaptive: Optional[AdaptiveInterval]):
+        """Scrive nel log i limiti del campionamento adattivo"""
+        if adaptive is not None:
+            self.logger.info(
+                f"Campionamento adattivo tra {adaptive.min_interval} e {adaptive.max_interval} secondi"
+            )
     
     def run(self):
         """Loop principale del monitoraggio"""
@@ -344,48 +1123,93 @@ class SystemMonitor:
         self.logger.info(f"Intervallo campionamento: {self.config.sample_interval_seconds} secondi")
         self.logger.info(f"Timeout riavvio: {self.config.reboot_timeout_minutes} minuti")
         
-        sample_interval = self.config.sample_interval_seconds
-        check_period = self.config.check_period_minutes * 60
+        self._sampling = self.sampling_settings()
+        sample_interval, check_period, expected_samples, adaptive = self._sampling
+        self.log_sampling(adaptive)
         
-        last_check_time = time.time()
-        last_internet_check_time = time.time()
+        # I campioni partono su scadenze assolute dell'orologio monotono,
+        # così il tempo di raccolta non fa slittare l'intervallo
+        scheduler = FixedRateScheduler(adaptive.interval if adaptive is not None else sample_interval)
+        period_started = scheduler.start()
+        period_end = period_started + check_period
+        
+        # Invio e controllo connettività girano su thread separati, così
+        # il campionamento non si blocca durante timeout di rete
+        self.start_workers()
+        
+        # Esportazione su richiesta dello storico: kill -USR2 <pid>
+        # (i segnali si possono registrare solo dal thread principale)
+        if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR2, self._handle_export_signal)
+            
+            # Statistiche del monitor su richiesta: kill -USR1 <pid>; sempre
+            # gestito, altrimenti il segnale terminerebbe il processo
+            signal.signal(signal.SIGUSR1, self._handle_dump_signal)
+            
+            # Ricarica della configurazione: kill -HUP <pid>
+            signal.signal(signal.SIGHUP, self._handle_reload_signal)
         
         try:
             while True:
-                current_time = time.time()
+                # Attendi la scadenza del prossimo campione
+                if scheduler.wait(self._stop_event) is None:
+                    break
                 
                 # Raccogli campione
-                self.collect_sample()
+                values = self.collect_sample()
                 
-                # Controlla connessione Internet ogni minuto
-                if current_time - last_internet_check_time >= 60:
-                    self.handle_internet_outage()
-                    last_internet_check_time = current_time
+                # Il prossimo campione non supera la fine del periodo, così
+                # i periodi restano allineati anche con intervalli lunghi
+                if adaptive is not None:
+                    scheduler.set_interval(adaptive.update(values), limit=period_end)
                 
-                # Verifica se è il momento di inviare i dati
-                if current_time - last_check_time >= check_period:
-                    # Aggrega i dati raccolti
-                    aggregated_data = self.aggregate_samples()
+                # Il periodo si chiude dopo il suo ultimo campione (mezzo
+                # intervallo di tolleranza per gli arrotondamenti in virgola mobile)
+                if scheduler.next_deadline >= period_end - scheduler.interval / 2:
+                    now = time.monotonic()
+                    period = {
+                        'period_seconds': int(round(now - period_started)),
+                        'sampling': {
+                            'interval_seconds': sample_interval,
+                            'expected_samples': expected_samples if adaptive is None else None,
+                            **scheduler.stats()
+                        }
+                    }
+                    if adaptive is not None:
+                        period['sampling']['adaptive'] = adaptive.stats()
+                        adaptive.reset_stats()
                     
-                    # Salva nel log locale
-                    self.save_to_log(aggregated_data)
+                    # Passa i campioni al thread di invio e riparti da zero
+                    samples, self.samples = self.samples, self.new_sample_set()
+                    self.submit_period(samples, period)
+                    scheduler.reset_stats()
+                    period_started = now
                     
-                    # Invia all'API
-                    self.send_to_api(aggregated_data)
+                    # Configurazione cambiata: applicata tra due periodi, così
+                    # ogni payload è raccolto con una sola configurazione
+                    if self.reload_due() and self.reload_config():
+                        sample_interval, check_period, expected_samples, adaptive = self._sampling
+                        self.log_sampling(adaptive)
+                        # Il nuovo periodo parte dal prossimo tick (mai più tardi)
+                        scheduler.set_interval(
+                            adaptive.interval if adaptive is not None else sample_interval,
+                            limit=scheduler.next_deadline
+                        )
+                        period_end = scheduler.next_deadline + check_period
                     
-                    # Reset dei campioni e del timer
-                    self.samples = []
-                    last_check_time = current_time
-                
-                # Attendi prima del prossimo campione
-                time.sleep(sample_interval)
+                    # Dopo un blocco lungo i periodi interamente saltati
+                    # non generano payload vuoti
+                    while period_end - scheduler.interval / 2 <= scheduler.next_deadline:
+                        period_end += check_period
                 
         except KeyboardInterrupt:
             self.logger.info("Monitoraggio interrotto dall'utente")
         except Exception as e:
             self.logger.critical(f"Errore critico nel loop principale: {e}", exc_info=True)
             raise
-
+        finally:
+            self.stop_workers()
+            self.session.close()
 
 def main():
     """Entry point principale"""
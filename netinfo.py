@@ -0,0 +1,228 @@
+"""
+Inventario delle interfacce di rete con cache e rilevamento delle modifiche
+"""
+
+import os
+import socket
+import threading
+import time
+import psutil
+from typing import Dict, List, Optional
+
+
+# Gruppi multicast rtnetlink: link, indirizzi IPv4 e IPv6
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+# Tipi ARPHRD_* letti da /sys/class/net/<iface>/type
+ARPHRD_ETHER = 1
+ARPHRD_PPP = 512
+ARPHRD_LOOPBACK = 772
+ARPHRD_NONE = 65534
+
+# Flag RTF_UP delle righe di /proc/net/route
+RTF_UP = 0x1
+
+
+def default_route_interface(route_path: str = '/proc/net/route') -> Optional[str]:
+    """Interfaccia della rotta predefinita IPv4 con la metrica più bassa (None se assente)"""
+    try:
+        with open(route_path) as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return None
+    best = None
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 8 or fields[1] != '00000000' or fields[7] != '00000000':
+            continue
+        try:
+            flags = int(fields[3], 16)
+            metric = int(fields[6])
+        except ValueError:
+            continue
+        if flags & RTF_UP and (best is None or metric < best[0]):
+            best = (metric, fields[0])
+    return best[1] if best else None
+
+
+class InterfaceInventory:
+    """
+    Tabella delle interfacce di rete aggiornata solo quando cambia
+
+    Le modifiche sono rilevate tramite un socket netlink (notifiche del
+    kernel su link e indirizzi); se netlink non è disponibile la tabella
+    viene ricostruita al più ogni poll_interval secondi. Il tipo di ogni
+    interfaccia è ricavato da sysfs, quindi nomi come end0, usb0 o br0 sono
+    classificati correttamente senza basarsi sul prefisso.
+    """
+
+    # Tipi riportati nel payload (esclusi loopback e interfacce virtuali)
+    RELEVANT_TYPES = ('ethernet', 'wifi', 'usb', 'bridge', 'bond', 'tun', 'ppp')
+
+    # Ricostruzione di sicurezza anche con netlink attivo
+    MAX_AGE = 600
+
+    def __init__(self, sysfs_root: str = '/sys/class/net', poll_interval: float = 60,
+                 use_netlink: bool = True):
+        """
+        Args:
+            sysfs_root: Directory delle interfacce in sysfs
+            poll_interval: Secondi tra le ricostruzioni senza netlink
+            use_netlink: Usa le notifiche netlink per rilevare le modifiche
+        """
+        self.sysfs_root = sysfs_root
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._table: Dict[str, Dict] = {}
+        self._built_at: Optional[float] = None
+        self._netlink: Optional[socket.socket] = None
+        if use_netlink:
+            self._netlink = self._open_netlink()
+
+    def _open_netlink(self) -> Optional[socket.socket]:
+        """Apre un socket rtnetlink iscritto alle modifiche di link e indirizzi"""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+            sock.setblocking(False)
+            return sock
+        except (AttributeError, OSError):
+            # Non Linux o permessi insufficienti: si ripiega sul polling
+            return None
+
+    def _netlink_changed(self) -> bool:
+        """Svuota le notifiche netlink e ritorna True se ce n'erano"""
+        changed = False
+        while True:
+            try:
+                if not self._netlink.recv(65536):
+                    break
+                changed = True
+            except BlockingIOError:
+                break
+            except OSError:
+                # Buffer del socket saturo (ENOBUFS): eventi persi
+                changed = True
+                break
+        return changed
+
+    def _is_stale(self, now: float) -> bool:
+        """La tabella va ricostruita?"""
+        if self._built_at is None or now - self._built_at >= self.MAX_AGE:
+            return True
+        if self._netlink is not None:
+            return self._netlink_changed()
+        return now - self._built_at >= self.poll_interval
+
+    def _read_sysfs(self, iface: str, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.sysfs_root, iface, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def classify(self, iface: str) -> str:
+        """Tipo dell'interfaccia ricavato da sysfs"""
+        path = os.path.join(self.sysfs_root, iface)
+        arp_type = self._read_sysfs(iface, 'type')
+        arp_type = int(arp_type) if arp_type and arp_type.isdigit() else None
+
+        if arp_type == ARPHRD_LOOPBACK:
+            return 'loopback'
+        if arp_type == ARPHRD_PPP:
+            return 'ppp'
+        if os.path.isdir(os.path.join(path, 'wireless')) or os.path.exists(os.path.join(path, 'phy80211')):
+            return 'wifi'
+        if os.path.isdir(os.path.join(path, 'bridge')):
+            return 'bridge'
+        if os.path.isdir(os.path.join(path, 'bonding')):
+            return 'bond'
+        if os.path.exists(os.path.join(path, 'tun_flags')) or arp_type == ARPHRD_NONE:
+            return 'tun'
+
+        device = os.path.join(path, 'device')
+        if not os.path.exists(device):
+            # Nessun dispositivo fisico: veth, docker, dummy...
+            return 'virtual'
+        if '/usb' in os.path.realpath(device):
+            return 'usb'
+        return 'ethernet' if arp_type == ARPHRD_ETHER else 'other'
+
+    def _build(self) -> Dict[str, Dict]:
+        """Ricostruisce la tabella con una sola lettura di stats e indirizzi"""
+        stats = psutil.net_if_stats()
+        addrs = psutil.net_if_addrs()
+        table = {}
+        for name in sorted(stats):
+            ip_address = None
+            mac_address = None
+            for addr in addrs.get(name, ()):
+                if addr.family == socket.AF_INET and ip_address is None:
+                    ip_address = addr.address
+                elif addr.family == psutil.AF_LINK and mac_address is None:
+                    mac_address = addr.address
+            table[name] = {
+                'interface': name,
+                'type': self.classify(name),
+                'is_up': stats[name].isup,
+                'ip_address': ip_address,
+                'mac_address': mac_address,
+                'speed_mbps': stats[name].speed or None,
+                'mtu': stats[name].mtu
+            }
+        return table
+
+    def table(self) -> Dict[str, Dict]:
+        """Tabella delle interfacce (ricostruita solo se qualcosa è cambiato)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._is_stale(now):
+                self._table = self._build()
+                self._built_at = now
+            return self._table
+
+    def invalidate(self):
+        """Forza la ricostruzione alla prossima lettura"""
+        with self._lock:
+            self._built_at = None
+
+    def interfaces(self) -> List[Dict]:
+        """Interfacce rilevanti per il payload (escluse loopback e virtuali)"""
+        return [
+            dict(entry) for entry in self.table().values()
+            if entry['type'] in self.RELEVANT_TYPES
+        ]
+
+    def relevant_names(self) -> List[str]:
+        """Nomi delle interfacce rilevanti (senza copiare la tabella)"""
+        return [
+            name for name, entry in self.table().items()
+            if entry['type'] in self.RELEVANT_TYPES
+        ]
+
+    def primary(self, iface_type: str) -> Optional[Dict]:
+        """
+        Interfaccia principale di un tipo: la prima attiva con un IP,
+        altrimenti la prima attiva, altrimenti la prima trovata
+        """
+        candidates = [e for e in self.table().values() if e['type'] == iface_type]
+        for check in (lambda e: e['is_up'] and e['ip_address'], lambda e: e['is_up'], lambda e: True):
+            for entry in candidates:
+                if check(entry):
+                    return entry
+        return None
+
+    def connected(self, iface_types: tuple = ('wifi', 'ethernet')) -> Optional[Dict]:
+        """Prima interfaccia attiva con un IP tra i tipi indicati, nell'ordine"""
+        for entry in self.table().values():
+            if entry['type'] in iface_types and entry['is_up'] and entry['ip_address']:
+                return entry
+        return None
+
+    def close(self):
+        """Chiude il socket netlink"""
+        if self._netlink is not None:
+            self._netlink.close()
+            self._netlink = None
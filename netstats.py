@@ -0,0 +1,104 @@
+"""
+Traffico di rete per interfaccia dalle differenze dei contatori del kernel
+"""
+
+import time
+import psutil
+from typing import Callable, Dict, Iterable, Optional
+
+
+# I contatori di alcuni driver a 32 bit ripartono da zero dopo 4 GiB
+COUNTER_32_BIT = 2 ** 32
+
+COUNTERS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+            'errin', 'errout', 'dropin', 'dropout')
+
+
+def counter_delta(current: int, previous: int) -> int:
+    """
+    Differenza tra due letture di un contatore cumulativo
+
+    Se il contatore è tornato indietro si distingue tra overflow a 32 bit
+    (il valore precedente era vicino al limite) e azzeramento
+    dell'interfaccia (driver ricaricato, interfaccia ricreata).
+    """
+    if current >= previous:
+        return current - previous
+    if previous < COUNTER_32_BIT and previous > COUNTER_32_BIT // 2:
+        return current + COUNTER_32_BIT - previous
+    return current
+
+
+class NetworkCounterCollector:
+    """
+    Byte/s, pacchetti/s, errori e scarti per interfaccia tra due campioni
+
+    La prima chiamata a sample() legge solo i contatori di riferimento (una
+    lettura alla creazione coprirebbe pochi millisecondi prima del primo
+    campione); un'interfaccia nuova produce valori dal campione successivo
+    a quello in cui compare.
+    """
+
+    def __init__(self, io_counters: Callable = psutil.net_io_counters,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            io_counters: Funzione di lettura dei contatori (sostituibile nei test)
+            clock: Orologio monotono
+        """
+        self.io_counters = io_counters
+        self.clock = clock
+        self._last_time: Optional[float] = None
+        self._last: Dict = {}
+
+    def _read(self) -> Dict:
+        try:
+            return self.io_counters(pernic=True)
+        except OSError:
+            return {}
+
+    def sample(self, interfaces: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        Traffico dall'ultima chiamata
+
+        Args:
+            interfaces: Interfacce da riportare (None = tutte)
+
+        Returns:
+            Interfaccia -> rx/tx byte e pacchetti al secondo, byte, errori e
+            pacchetti scartati nell'intervallo (vuoto alla prima chiamata)
+        """
+        now = self.clock()
+        current = self._read()
+        if self._last_time is None:
+            self._last, self._last_time = current, now
+            return {}
+        elapsed = now - self._last_time
+        wanted = set(interfaces) if interfaces is not None else None
+
+        result = {}
+        for name, counters in current.items():
+            previous = self._last.get(name)
+            if previous is None or elapsed <= 0 or (wanted is not None and name not in wanted):
+                continue
+            delta = {
+                field: counter_delta(getattr(counters, field), getattr(previous, field))
+                for field in COUNTERS
+            }
+            result[name] = {
+                'rx_bytes_per_s': delta['bytes_recv'] / elapsed,
+                'tx_bytes_per_s': delta['bytes_sent'] / elapsed,
+                'rx_packets_per_s': delta['packets_recv'] / elapsed,
+                'tx_packets_per_s': delta['packets_sent'] / elapsed,
+                'rx_bytes': delta['bytes_recv'],
+                'tx_bytes': delta['bytes_sent'],
+                'rx_errors': delta['errin'],
+                'tx_errors': delta['errout'],
+                'rx_drops': delta['dropin'],
+                'tx_drops': delta['dropout']
+            }
+
+        # Le interfacce sparite vengono dimenticate
+        self._last = current
+        self._last_time = now
+        return result
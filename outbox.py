@@ -0,0 +1,120 @@
+"""
+Coda persistente (outbox) per i dati aggregati non ancora inviati all'API
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class Outbox:
+    """
+    Coda FIFO su SQLite per i payload in attesa di invio
+
+    Ogni aggregato viene accodato prima del tentativo di invio e rimosso solo
+    dopo la conferma dell'API, così un'interruzione della rete non fa perdere
+    i periodi. La dimensione è limitata in byte ed età: quando si supera un
+    limite vengono eliminati per primi i payload più vecchi.
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_age_seconds: float):
+        """
+        Args:
+            path: Path del database SQLite
+            max_bytes: Dimensione massima complessiva dei payload in coda
+            max_age_seconds: Età massima di un payload prima dell'eliminazione
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' created REAL NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' payload TEXT NOT NULL)'
+        )
+        self._conn.commit()
+
+    def enqueue(self, data: Dict) -> int:
+        """Accoda un payload e applica i limiti; ritorna i payload eliminati"""
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO outbox (created, size, payload) VALUES (?, ?, ?)',
+                (time.time(), len(payload.encode('utf-8')), payload)
+            )
+            evicted = self._evict()
+            self._conn.commit()
+        return evicted
+
+    def peek_batch(self, limit: int) -> List[Tuple[int, Dict]]:
+        """Ritorna i payload più vecchi (id, dati) senza rimuoverli"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, payload FROM outbox ORDER BY id LIMIT ?',
+                (limit,)
+            ).fetchall()
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def ack(self, ids: List[int]):
+        """Rimuove dalla coda i payload confermati dall'API"""
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'DELETE FROM outbox WHERE id = ?',
+                [(row_id,) for row_id in ids]
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Numero di payload e byte attualmente in coda"""
+        with self._lock:
+            count, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outbox'
+            ).fetchone()
+        return {'pending': count, 'bytes': size}
+
+    def close(self):
+        """Chiude il database"""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> int:
+        """Elimina i payload scaduti e poi i più vecchi oltre il limite in byte"""
+        cursor = self._conn.execute(
+            'DELETE FROM outbox WHERE created < ?',
+            (time.time() - self.max_age_seconds,)
+        )
+        evicted = max(cursor.rowcount, 0)
+
+        total = self._conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM outbox'
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return evicted
+
+        # Elimina dal più vecchio finché non si rientra nel limite
+        last_id: Optional[int] = None
+        for row_id, size in self._conn.execute(
+            'SELECT id, size FROM outbox ORDER BY id'
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            total -= size
+            last_id = row_id
+            evicted += 1
+
+        if last_id is not None:
+            self._conn.execute('DELETE FROM outbox WHERE id <= ?', (last_id,))
+        return evicted
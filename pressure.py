@@ -0,0 +1,128 @@
+"""
+Pressure Stall Information (PSI) del kernel da /proc/pressure
+"""
+
+import os
+import time
+from typing import Callable, Dict, Optional
+
+
+def parse_pressure(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Interpreta un file /proc/pressure/*
+
+    Returns:
+        'some'/'full' -> avg10, avg60, avg300 (percentuali) e total (µs)
+    """
+    result = {}
+    for line in text.splitlines():
+        kind, _, fields = line.partition(' ')
+        values = {}
+        for field in fields.split():
+            key, _, value = field.partition('=')
+            values[key] = float(value)
+        if values:
+            result[kind] = values
+    return result
+
+
+class PressureReader:
+    """
+    Percentuale di tempo in stallo tra due letture di un file PSI
+
+    Il tempo in stallo è calcolato dalla differenza del contatore total,
+    quindi copre esattamente l'intervallo tra due campioni (le medie avg10
+    del kernel coprono sempre gli ultimi 10 secondi). Se il kernel non
+    espone PSI il lettore si disattiva già alla creazione; la prima chiamata
+    a sample() legge solo il contatore di riferimento.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            path: File PSI (es: /proc/pressure/io)
+            clock: Orologio monotono
+        """
+        self.path = path
+        self.clock = clock
+        self.available = True
+        self._read()  # Solo per rilevare se PSI è disponibile
+        self._last_time = clock()
+        self._last: Optional[Dict[str, Dict[str, float]]] = None
+
+    def _read(self) -> Optional[Dict[str, Dict[str, float]]]:
+        if not self.available:
+            return None
+        try:
+            with open(self.path) as f:
+                return parse_pressure(f.read())
+        except OSError:
+            # Kernel senza CONFIG_PSI o con psi=0
+            self.available = False
+            return None
+
+    def sample(self) -> Optional[Dict[str, float]]:
+        """
+        Stallo dall'ultima chiamata
+
+        Returns:
+            '<some|full>_percent', '<some|full>_stall_ms' e le medie del
+            kernel '<some|full>_avg10' e '<some|full>_avg60', oppure None se
+            PSI non è disponibile
+        """
+        now = self.clock()
+        current = self._read()
+        previous, elapsed = self._last, now - self._last_time
+        self._last, self._last_time = current, now
+        if current is None or previous is None or elapsed <= 0:
+            return None
+
+        result = {}
+        for kind, values in current.items():
+            if 'total' not in values or 'total' not in previous.get(kind, {}):
+                continue
+            stall_us = max(0.0, values['total'] - previous[kind]['total'])
+            result[f'{kind}_stall_ms'] = stall_us / 1000
+            result[f'{kind}_percent'] = min(100.0, stall_us / (elapsed * 1e6) * 100)
+            for window in ('avg10', 'avg60'):
+                if window in values:
+                    result[f'{kind}_{window}'] = values[window]
+        return result
+
+
+class PressureCollector:
+    """
+    Pressione di più risorse (cpu, memory, io)
+
+    Le risorse che il kernel non espone vengono ignorate; senza PSI il
+    collettore non produce valori ma non solleva eccezioni.
+    """
+
+    RESOURCES = ('cpu', 'memory', 'io')
+
+    def __init__(self, root: str = '/proc/pressure', resources=RESOURCES,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            root: Directory dei file PSI
+            resources: Risorse da leggere
+            clock: Orologio monotono
+        """
+        self.readers = {
+            resource: PressureReader(os.path.join(root, resource), clock)
+            for resource in resources
+        }
+
+    @property
+    def available(self) -> bool:
+        """Almeno una risorsa è leggibile"""
+        return any(reader.available for reader in self.readers.values())
+
+    def sample(self) -> Dict[str, Dict[str, float]]:
+        """Risorsa -> stallo dall'ultima chiamata (vedi PressureReader.sample)"""
+        result = {}
+        for resource, reader in self.readers.items():
+            values = reader.sample()
+            if values:
+                result[resource] = values
+        return result
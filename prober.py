@@ -0,0 +1,224 @@
+"""
+Verifica concorrente della connettività Internet con metriche di latenza
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class ProbeTarget:
+    """Un singolo controllo (TCP, DNS o HTTP HEAD) con la sua finestra di risultati"""
+
+    TYPES = ('tcp', 'dns', 'http_head')
+
+    def __init__(self, spec: Dict, window: int):
+        """
+        Args:
+            spec: Definizione del controllo, es:
+                  {"type": "tcp", "host": "1.1.1.1", "port": 53}
+                  {"type": "dns", "host": "www.google.com"}
+                  {"type": "http_head", "url": "https://api.example.com/"}
+            window: Numero di risultati usati per la perdita percentuale
+
+        Raises:
+            ValueError: Se tipo, host o URL non sono validi
+        """
+        self.type = spec.get('type')
+        if self.type not in self.TYPES:
+            raise ValueError(f"Tipo di controllo non valido: {self.type}")
+
+        self.url = spec.get('url')
+        if self.type == 'http_head':
+            parts = urlsplit(self.url if isinstance(self.url, str) else '')
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise ValueError(f"URL non valido: {self.url!r}")
+            self.host = parts.hostname
+            self.tls = parts.scheme == 'https'
+            self.port = parts.port or (443 if self.tls else 80)
+            self.path = parts.path or '/'
+        else:
+            self.host = spec.get('host')
+            if not isinstance(self.host, str) or not self.host:
+                raise ValueError("Host mancante")
+            self.port = int(spec.get('port', 53))
+            self.tls = False
+            self.path = '/'
+
+        default_name = self.url if self.type == 'http_head' else (
+            f"{self.host}:{self.port}" if self.type == 'tcp' else self.host
+        )
+        self.name = spec.get('name', default_name)
+        self.results: Deque[Tuple[bool, Optional[float]]] = deque(maxlen=window)
+        self.last_rtt_ms: Optional[float] = None
+        self.last_ok: Optional[bool] = None
+
+    def record(self, ok: bool, rtt_ms: Optional[float]):
+        """Registra l'esito di un controllo completato"""
+        self.results.append((ok, rtt_ms))
+        self.last_ok = ok
+        self.last_rtt_ms = rtt_ms if ok else None
+
+    def status(self) -> Dict:
+        """Esito dell'ultimo controllo e statistiche sulla finestra"""
+        rtts = [rtt for ok, rtt in self.results if ok]
+        failures = sum(1 for ok, _ in self.results if not ok)
+        return {
+            'name': self.name,
+            'type': self.type,
+            'ok': self.last_ok,
+            'rtt_ms': self.last_rtt_ms,
+            'avg_rtt_ms': round(sum(rtts) / len(rtts), 1) if rtts else None,
+            'loss_percent': round(failures / len(self.results) * 100, 1) if self.results else None,
+            'window': len(self.results)
+        }
+
+
+class ConnectivityProber:
+    """
+    Esegue in parallelo controlli economici e decide al primo successo
+
+    Al posto di richieste HTTP GET sequenziali con timeout di 5 secondi, i
+    controlli (connessione TCP, risoluzione DNS, HTTP HEAD) partono insieme e
+    l'esito positivo arriva con la latenza del più veloce. Dopo il primo
+    successo gli altri hanno SETTLE_SECONDS per completare, così la latenza
+    viene misurata anche per loro; quelli ancora in corso vengono annullati e
+    non contano come persi.
+    """
+
+    SETTLE_SECONDS = 0.2
+
+    def __init__(self, targets: List[Dict], timeout: float = 3.0, window: int = 20,
+                 api_url: Optional[str] = None):
+        """
+        Args:
+            targets: Definizioni dei controlli (vedi ProbeTarget)
+            timeout: Timeout di ogni controllo in secondi
+            window: Numero di risultati per target usati per la perdita
+            api_url: URL dell'API per i controlli predefiniti
+
+        I controlli non validi vengono scartati e descritti in errors; se non
+        ne resta nessuno si usano quelli predefiniti (default_targets).
+        """
+        self.targets: List[ProbeTarget] = []
+        self.errors: List[str] = []
+        for spec in targets:
+            try:
+                self.targets.append(ProbeTarget(spec, window))
+            except (ValueError, TypeError, AttributeError) as e:
+                self.errors.append(f"Controllo di connettività {spec!r} scartato: {e}")
+        if not self.targets:
+            self.targets = [ProbeTarget(spec, window) for spec in self.default_targets(api_url)]
+        self.timeout = timeout
+        self.last_result: Optional[Dict] = None
+
+    @staticmethod
+    def default_targets(api_url: Optional[str] = None) -> List[Dict]:
+        """Controlli predefiniti: DNS pubblici via TCP, risoluzione DNS e API"""
+        targets = [
+            {'type': 'tcp', 'host': '1.1.1.1', 'port': 53},
+            {'type': 'tcp', 'host': '8.8.8.8', 'port': 53},
+            {'type': 'dns', 'host': 'www.google.com'}
+        ]
+        if api_url:
+            parts = urlsplit(api_url)
+            if parts.hostname:
+                targets.append({'type': 'http_head', 'url': f"{parts.scheme}://{parts.netloc}/"})
+        return targets
+
+    def probe(self) -> bool:
+        """
+        Esegue i controlli e ritorna True se almeno uno ha successo
+
+        Le risoluzioni dei nomi (getaddrinfo) girano in un executor dedicato
+        chiuso senza attendere i thread: un resolver bloccato non trattiene
+        il ritorno oltre il primo successo o il timeout, come invece farebbe
+        asyncio.run attendendo l'executor predefinito.
+        """
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=len(self.targets) or 1,
+                                      thread_name_prefix='probe-resolver')
+        loop.set_default_executor(executor)
+        try:
+            return loop.run_until_complete(self._probe_all())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def status(self) -> Dict:
+        """Ultimo esito complessivo con il dettaglio di ogni target"""
+        return self.last_result or {}
+
+    async def _probe_all(self) -> bool:
+        start = time.monotonic()
+        tasks = {
+            asyncio.ensure_future(self._run(target)): target for target in self.targets
+        }
+        pending = set(tasks)
+        connected = False
+        decided_ms: Optional[float] = None
+
+        while pending and not connected:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                ok, rtt_ms = task.result()
+                tasks[task].record(ok, rtt_ms)
+                connected = connected or ok
+        decided_ms = (time.monotonic() - start) * 1000
+
+        if pending:
+            # Breve attesa per misurare anche gli altri target
+            done, pending = await asyncio.wait(pending, timeout=self.SETTLE_SECONDS)
+            for task in done:
+                tasks[task].record(*task.result())
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        dns = [t for t in self.targets if t.type == 'dns' and t.last_ok]
+        self.last_result = {
+            'connected': connected,
+            'decision_ms': round(decided_ms, 1),
+            'dns_ms': dns[0].last_rtt_ms if dns else None,
+            'targets': [target.status() for target in self.targets]
+        }
+        return connected
+
+    async def _run(self, target: ProbeTarget) -> Tuple[bool, Optional[float]]:
+        """Esegue un controllo e ritorna (successo, latenza in ms)"""
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._check(target), timeout=self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False, None
+        return True, round((time.monotonic() - start) * 1000, 1)
+
+    async def _check(self, target: ProbeTarget):
+        """Esegue il controllo; solleva un'eccezione se fallisce"""
+        if target.type == 'dns':
+            loop = asyncio.get_running_loop()
+            await loop.getaddrinfo(target.host, None)
+            return
+
+        reader, writer = await asyncio.open_connection(
+            target.host, target.port, ssl=True if target.tls else None
+        )
+        try:
+            if target.type == 'http_head':
+                writer.write(
+                    f"HEAD {target.path} HTTP/1.1\r\nHost: {target.host}\r\n"
+                    f"Connection: close\r\n\r\n".encode('ascii')
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                # Qualsiasi risposta HTTP indica che il server è raggiungibile
+                if not status_line.startswith(b'HTTP/'):
+                    raise ConnectionError("Risposta HTTP non valida")
+        finally:
+            writer.close()
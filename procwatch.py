@@ -0,0 +1,171 @@
+"""
+Controllo dei processi della pipeline della webcam con cache dei PID
+"""
+
+import re
+import threading
+import time
+import psutil
+from typing import Callable, Dict, List, Optional
+
+
+class ProcessWatch:
+    """Un processo (o gruppo di processi) da controllare"""
+
+    def __init__(self, spec: Dict):
+        """
+        Args:
+            spec: Definizione, con 'name' e uno tra:
+                  {"name": "camera", "process_name": "libcamera-vid"}
+                  {"name": "stream", "cmdline": "ffmpeg .*rtsp://"}
+                  {"name": "mediamtx", "pidfile": "/run/mediamtx.pid"}
+        """
+        self.name = spec['name']
+        self.process_name = spec.get('process_name')
+        self.cmdline = re.compile(spec['cmdline']) if spec.get('cmdline') else None
+        self.pidfile = spec.get('pidfile')
+        if not (self.process_name or self.cmdline or self.pidfile):
+            raise ValueError(f"Processo {self.name}: indicare process_name, cmdline o pidfile")
+
+        self.processes: Dict[int, psutil.Process] = {}
+        # PID controllati terminati e non ancora sostituiti: solo un nuovo
+        # PID che ne sostituisce uno conta come riavvio, non le istanze in più
+        self.lost = 0
+
+    def add(self, pid: int, proc: psutil.Process) -> bool:
+        """Aggiunge un PID trovato; ritorna True se sostituisce un processo terminato"""
+        self.processes[pid] = proc
+        if self.lost:
+            self.lost -= 1
+            return True
+        return False
+
+    def forget(self, pid: int):
+        """Rimuove un PID terminato"""
+        del self.processes[pid]
+        self.lost += 1
+
+    def matches(self, info: Dict) -> bool:
+        """Il processo (nome e cmdline da process_iter) corrisponde?"""
+        if self.process_name and info.get('name') != self.process_name:
+            return False
+        if self.cmdline and not self.cmdline.search(' '.join(info.get('cmdline') or ())):
+            return False
+        return True
+
+    def read_pidfile(self) -> Optional[int]:
+        try:
+            with open(self.pidfile) as f:
+                return int(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+
+
+class ProcessWatcher:
+    """
+    Stato e risorse dei processi da controllare
+
+    I processi trovati sono tenuti in cache come oggetti psutil.Process:
+    a ogni campione si verifica solo che siano ancora vivi (is_running
+    confronta anche l'ora di avvio, quindi un PID riutilizzato viene
+    riconosciuto). La scansione completa di process_iter, condivisa tra
+    tutti i processi da cercare, avviene solo se un processo manca (al più
+    ogni rescan_interval secondi) e comunque ogni full_scan_interval
+    secondi per trovare istanze aggiuntive. Un riavvio è un nuovo PID che
+    sostituisce uno controllato e terminato: i processi già attivi alla
+    prima ricerca e le istanze aggiuntive non contano.
+    """
+
+    def __init__(self, specs: List[Dict], rescan_interval: float = 10,
+                 full_scan_interval: float = 300, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            specs: Definizioni dei processi (vedi ProcessWatch)
+            rescan_interval: Secondi minimi tra due scansioni se un processo manca
+            full_scan_interval: Secondi tra due scansioni complete
+            clock: Orologio monotono
+        """
+        self.watches = [ProcessWatch(spec) for spec in specs]
+        self.rescan_interval = rescan_interval
+        self.full_scan_interval = full_scan_interval
+        self.clock = clock
+        self._last_scan: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.watches)
+
+    def _scan(self, watches: List[ProcessWatch]) -> Dict[str, int]:
+        """Cerca nuovi processi; ritorna i riavvii trovati per nome"""
+        restarts = {}
+        by_cmdline = [w for w in watches if not w.pidfile]
+        if by_cmdline:
+            attrs = ['name', 'cmdline'] if any(w.cmdline for w in by_cmdline) else ['name']
+            for proc in psutil.process_iter(attrs):
+                for watch in by_cmdline:
+                    if proc.pid not in watch.processes and watch.matches(proc.info):
+                        if watch.add(proc.pid, proc):
+                            restarts[watch.name] = restarts.get(watch.name, 0) + 1
+
+        for watch in watches:
+            if watch.pidfile:
+                pid = watch.read_pidfile()
+                if pid is not None and pid not in watch.processes:
+                    try:
+                        if watch.add(pid, psutil.Process(pid)):
+                            restarts[watch.name] = restarts.get(watch.name, 0) + 1
+                    except psutil.Error:
+                        pass
+        return restarts
+
+    def sample(self) -> Dict[str, Dict]:
+        """
+        Stato dei processi
+
+        Returns:
+            Nome -> running, pids, rss_bytes, cpu_percent (somma sui
+            processi, 100 = un core), threads, fds e restarts (processi
+            terminati sostituiti da un nuovo PID in questa lettura)
+        """
+        now = self.clock()
+        with self._lock:
+            for watch in self.watches:
+                for pid, proc in list(watch.processes.items()):
+                    if not proc.is_running():
+                        watch.forget(pid)
+
+            full_scan = self._last_scan is None or now - self._last_scan >= self.full_scan_interval
+            missing = [w for w in self.watches if not w.processes]
+            if full_scan or (missing and now - self._last_scan >= self.rescan_interval):
+                restarts = self._scan(self.watches if full_scan else missing)
+                self._last_scan = now
+            else:
+                restarts = {}
+
+            return {watch.name: self._measure(watch, restarts.get(watch.name, 0))
+                    for watch in self.watches}
+
+    def _measure(self, watch: ProcessWatch, restarts: int) -> Dict:
+        result = {'rss_bytes': 0, 'cpu_percent': 0.0, 'threads': 0, 'fds': 0}
+        for pid, proc in list(watch.processes.items()):
+            try:
+                with proc.oneshot():
+                    if proc.status() == psutil.STATUS_ZOMBIE:
+                        # Terminato ma non ancora raccolto dal processo padre
+                        raise psutil.NoSuchProcess(pid)
+                    # La prima chiamata su un processo appena trovato vale 0
+                    values = (proc.memory_info().rss, proc.cpu_percent(None),
+                              proc.num_threads(), proc.num_fds())
+            except psutil.NoSuchProcess:
+                watch.forget(pid)
+                continue
+            except psutil.AccessDenied:
+                # Processo di un altro utente: fds non leggibili senza root
+                continue
+            for key, value in zip(('rss_bytes', 'cpu_percent', 'threads', 'fds'), values):
+                result[key] += value
+
+        result['running'] = bool(watch.processes)
+        result['pids'] = sorted(watch.processes)
+        result['restarts'] = restarts
+        return result
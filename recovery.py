@@ -0,0 +1,339 @@
+"""
+Recupero della connettività a gradini prima del riavvio
+
+Durante un'interruzione le azioni vengono eseguite una alla volta, dalla
+più economica (nuovo controllo, rinnovo DHCP) alla più drastica (riavvio),
+ognuna quando l'interruzione raggiunge la sua durata. Ogni tentativo è
+cronometrato, verificato con un nuovo controllo di connettività e salvato
+su disco, così lo storico resta disponibile anche dopo un riavvio.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Comandi di ogni azione; i segnaposto sono risolti al momento del tentativo
+# ({interface}, {module}, {service}) e le azioni senza comandi si limitano
+# a ricontrollare la connettività
+DEFAULT_COMMANDS = {
+    'reprobe': [],
+    'dhcp': [['sudo', 'dhcpcd', '--rebind', '{interface}']],
+    'interface': [
+        ['sudo', 'ip', 'link', 'set', '{interface}', 'down'],
+        ['sudo', 'ip', 'link', 'set', '{interface}', 'up']
+    ],
+    'wifi_driver': [
+        ['sudo', 'modprobe', '-r', '{module}'],
+        ['sudo', 'modprobe', '{module}']
+    ],
+    'service': [['sudo', 'systemctl', 'restart', '{service}']],
+    'reboot': [['sudo', 'reboot']]
+}
+
+
+def run_command(argv: List[str], timeout: float) -> Tuple[bool, str]:
+    """
+    Esegue un comando di sistema
+
+    Returns:
+        (riuscito, messaggio di errore)
+    """
+    try:
+        result = subprocess.run(argv, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        return False, str(e)
+    if result.returncode != 0:
+        return False, (result.stderr.strip() or f'codice di uscita {result.returncode}')[-200:]
+    return True, ''
+
+
+def wifi_driver_module(interface: str, sysfs_root: str = '/sys/class/net') -> Optional[str]:
+    """Modulo del kernel del driver di un'interfaccia WiFi (None se non WiFi o non trovato)"""
+    device = Path(sysfs_root) / interface
+    if not (device / 'wireless').exists() and not (device / 'phy80211').exists():
+        return None
+    try:
+        return os.path.basename(os.readlink(device / 'device' / 'driver' / 'module'))
+    except OSError:
+        return None
+
+
+class RecoveryStep:
+    """Azione della scala con la durata di interruzione che la fa partire"""
+
+    __slots__ = ('action', 'after_seconds', 'commands')
+
+    def __init__(self, action: str, after_minutes: float, commands: List[List[str]]):
+        self.action = action
+        self.after_seconds = after_minutes * 60
+        self.commands = commands
+
+
+class RecoveryLadder:
+    """
+    Scala di azioni di recupero durante un'interruzione di Internet
+
+    attempt() viene chiamato a ogni controllo fallito ed esegue al più
+    un'azione: la prima non ancora tentata in questa interruzione la cui
+    durata è stata raggiunta. reset() alla riconnessione fa ripartire la
+    scala dal primo gradino. Il riavvio è sempre l'ultimo gradino e viene
+    ritentato a ogni controllo finché la connessione manca.
+    """
+
+    def __init__(self, steps: List[Dict], reboot_after_minutes: float,
+                 probe: Callable[[], bool], history_path: str,
+                 context: Callable[[], Dict] = dict, services: Optional[List[str]] = None,
+                 commands: Optional[Dict[str, List[List[str]]]] = None,
+                 settle_seconds: float = 20, command_timeout: float = 60, history_size: int = 100,
+                 runner: Callable[[List[str], float], Tuple[bool, str]] = run_command,
+                 wait: Callable[[float], bool] = lambda seconds: time.sleep(seconds) or False,
+                 clock: Callable[[], float] = time.monotonic,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            steps: Gradini da config.json: action e after_minutes
+            reboot_after_minutes: Durata dell'interruzione che fa riavviare
+            probe: Controllo di connettività eseguito dopo ogni azione
+            history_path: File JSON dello storico dei tentativi
+            context: Valori dei segnaposto (interface, module) al momento del tentativo
+            services: Servizi riavviati dall'azione service
+            commands: Comandi che sostituiscono quelli predefiniti, per azione
+            settle_seconds: Attesa tra l'azione e il controllo di connettività
+            command_timeout: Timeout di ogni comando
+            history_size: Tentativi conservati nello storico
+            runner: Esegue un comando, ritorna (riuscito, errore)
+            wait: Attende i secondi indicati, ritorna True se il monitor si ferma
+            clock: Orologio monotono usato per le durate
+            logger: Logger degli errori di scrittura dello storico
+
+        I gradini con azioni sconosciute vengono scartati e descritti in errors.
+        """
+        self._next = 0  # Primo gradino non ancora tentato in questa interruzione
+        self.steps: List[RecoveryStep] = []
+        # attempt gira nel thread di connettività, report e configure in
+        # quelli di invio e di campionamento
+        self._lock = threading.Lock()
+        self.errors = self.configure(steps, reboot_after_minutes, services, commands, settle_seconds)
+
+        self.probe = probe
+        self.context = context
+        self.command_timeout = command_timeout
+        self.history_size = history_size
+        self.runner = runner
+        self.wait = wait
+        self.clock = clock
+        self.logger = logger or logging.getLogger(__name__)
+        self.history_path = Path(history_path)
+
+        self._period: List[Dict] = []  # Tentativi non ancora riportati nel payload
+        self.history: List[Dict] = []
+        self.totals: Dict[str, Dict[str, int]] = {}
+        self._load()
+
+    @staticmethod
+    def parse_steps(steps: List[Dict], reboot_after_minutes: float,
+                    commands: Optional[Dict[str, List[List[str]]]] = None) -> Tuple[List[RecoveryStep], List[str]]:
+        """
+        Gradini ordinati, riavvio compreso, e descrizione di quelli scartati
+
+        Args:
+            steps: Gradini da config.json: action e after_minutes
+            reboot_after_minutes: Durata dell'interruzione che fa riavviare
+            commands: Comandi che sostituiscono quelli predefiniti, per azione
+        """
+        commands = {**DEFAULT_COMMANDS, **(commands or {})}
+        parsed: List[RecoveryStep] = []
+        errors: List[str] = []
+        for spec in steps:
+            action = spec.get('action') if isinstance(spec, dict) else None
+            if action not in commands or action == 'reboot':
+                errors.append(f"Gradino di recupero {spec!r} scartato: azione sconosciuta")
+                continue
+            try:
+                after_minutes = float(spec.get('after_minutes', 0))
+            except (TypeError, ValueError) as e:
+                errors.append(f"Gradino di recupero {spec!r} scartato: {e}")
+                continue
+            if after_minutes >= reboot_after_minutes:
+                errors.append(f"Gradino di recupero {spec!r} scartato: non precede il riavvio")
+                continue
+            parsed.append(RecoveryStep(action, after_minutes, commands[action]))
+        parsed.sort(key=lambda step: step.after_seconds)
+        parsed.append(RecoveryStep('reboot', reboot_after_minutes, commands['reboot']))
+        return parsed, errors
+
+    def configure(self, steps: List[Dict], reboot_after_minutes: float,
+                  services: Optional[List[str]] = None,
+                  commands: Optional[Dict[str, List[List[str]]]] = None,
+                  settle_seconds: float = 20) -> List[str]:
+        """
+        Sostituisce gradini e parametri mantenendo storico e totali
+
+        Durante un'interruzione la scala prosegue dal primo gradino nuovo
+        non ancora dovuto all'ultimo tentativo.
+
+        Returns:
+            Descrizione dei gradini scartati
+        """
+        parsed, errors = self.parse_steps(steps, reboot_after_minutes, commands)
+        with self._lock:
+            reached = self.steps[self._next - 1].after_seconds if self._next > 0 else None
+            self.steps = parsed
+            self._next = 0 if reached is None else next(
+                index for index, step in enumerate(parsed)
+                if step.after_seconds > reached or step.action == 'reboot'
+            )
+            self.services = list(services or [])
+            self.settle_seconds = settle_seconds
+        return errors
+
+    def _load(self):
+        """Carica lo storico; un riavvio in corso al salvataggio risulta eseguito"""
+        try:
+            data = json.loads(self.history_path.read_text())
+            self.history = list(data.get('attempts', []))
+            self.totals = dict(data.get('totals', {}))
+        except (OSError, ValueError, AttributeError):
+            return
+        if self.history and self.history[-1].get('result') == 'rebooting':
+            self.history[-1]['result'] = 'rebooted'
+            self._period.append(self.history[-1])
+            self._save()
+
+    def _save(self):
+        """
+        Scrive lo storico in modo atomico
+
+        Un errore di scrittura (scheda SD piena o in sola lettura) viene solo
+        registrato: non deve impedire le azioni, riavvio compreso.
+        """
+        self.history = self.history[-self.history_size:]
+        try:
+            self.history_path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.history_path.with_suffix('.tmp')
+            temp.write_text(json.dumps({'attempts': self.history, 'totals': self.totals}, ensure_ascii=False))
+            os.replace(temp, self.history_path)
+        except OSError as e:
+            self.logger.error(f"Errore nel salvataggio dello storico di recupero {self.history_path}: {e}")
+
+    def reset(self):
+        """Connessione ripristinata: la prossima interruzione riparte dal primo gradino"""
+        with self._lock:
+            self._next = 0
+
+    def attempt(self, outage_seconds: float) -> Optional[Dict]:
+        """
+        Esegue il prossimo gradino se l'interruzione ha raggiunto la sua durata
+
+        Returns:
+            Il tentativo registrato, o None se nessun gradino era dovuto
+        """
+        with self._lock:
+            step = self.steps[self._next]
+            if outage_seconds < step.after_seconds:
+                return None
+            # Il riavvio resta il gradino successivo: se fallisce viene ritentato
+            if step.action != 'reboot':
+                self._next += 1
+        return self._run(step, outage_seconds)
+
+    def due(self, outage_seconds: float) -> Optional[str]:
+        """Azione che attempt() eseguirebbe ora (None se nessuna)"""
+        with self._lock:
+            step = self.steps[self._next]
+        return step.action if outage_seconds >= step.after_seconds else None
+
+    def _argvs(self, step: RecoveryStep) -> List[List[str]]:
+        """Comandi del gradino con i segnaposto risolti (KeyError se un valore manca)"""
+        values = {key: value for key, value in self.context().items() if value}
+        if step.action == 'service':
+            if not self.services:
+                raise KeyError('service')
+            return [[part.format(**values, service=service) for part in argv]
+                    for service in self.services for argv in step.commands]
+        return [[part.format(**values) for part in argv] for argv in step.commands]
+
+    def _run(self, step: RecoveryStep, outage_seconds: float) -> Dict:
+        record = {
+            'action': step.action,
+            'timestamp': datetime.now().isoformat(),
+            'outage_seconds': round(outage_seconds),
+            'commands': [],
+            'error': None
+        }
+        started = self.clock()
+        try:
+            argvs = self._argvs(step)
+        except KeyError as e:
+            record['result'] = 'skipped'
+            record['error'] = f'{e.args[0]} non disponibile'
+            record['duration_ms'] = 0.0
+            return self._record(record)
+
+        record['commands'] = [' '.join(argv) for argv in argvs]
+        if step.action == 'reboot':
+            # Il riavvio interrompe il processo: lo storico va salvato prima
+            record['result'] = 'rebooting'
+            record['duration_ms'] = 0.0
+            self._record(record)
+
+        for argv in argvs:
+            ok, error = self.runner(argv, self.command_timeout)
+            if not ok:
+                record['error'] = error
+                break
+
+        if step.action == 'reboot':
+            if record['error'] is not None:
+                with self._lock:
+                    record['result'] = 'error'
+                    record['duration_ms'] = round((self.clock() - started) * 1000, 1)
+                    self._save()
+            return record
+
+        if record['error'] is not None:
+            record['result'] = 'error'
+        elif not self.wait(self.settle_seconds) and self.probe():
+            record['result'] = 'recovered'
+        else:
+            record['result'] = 'failed'
+        record['duration_ms'] = round((self.clock() - started) * 1000, 1)
+        return self._record(record)
+
+    def _record(self, record: Dict) -> Dict:
+        """Aggiunge il tentativo allo storico e ai totali per azione"""
+        with self._lock:
+            totals = self.totals.setdefault(record['action'], {'attempts': 0, 'recovered': 0})
+            if record['result'] != 'skipped':
+                totals['attempts'] += 1
+            if record['result'] == 'recovered':
+                totals['recovered'] += 1
+            self.history.append(record)
+            self._period.append(record)
+            self._save()
+        return record
+
+    def report(self, reset: bool = False) -> Dict:
+        """
+        Tentativi dall'ultimo rapporto e totali per azione (vuoto se nessun tentativo)
+
+        Args:
+            reset: Svuota i tentativi riportati (fine periodo)
+        """
+        with self._lock:
+            if not self._period:
+                return {}
+            result = {
+                'attempts': [dict(record) for record in self._period],
+                'totals': {action: dict(totals) for action, totals in self.totals.items()}
+            }
+            if reset:
+                self._period = []
+        return result
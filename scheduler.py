@@ -0,0 +1,195 @@
+"""
+Scheduler a frequenza fissa per il campionamento
+"""
+
+import time
+import threading
+from typing import Callable, Dict, Optional
+
+
+class FixedRateScheduler:
+    """
+    Genera tick su scadenze assolute dell'orologio monotono
+
+    Le scadenze sono start + k * intervallo, quindi il tempo speso nella
+    raccolta del campione non si accumula come deriva. Se un tick arriva in
+    ritardo di un intervallo o più, i tick persi vengono saltati e il
+    campione successivo parte subito (un solo tick al posto di una raffica).
+    """
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            interval: Intervallo tra i tick in secondi
+            clock: Orologio monotono (sostituibile nei test)
+        """
+        self.interval = interval
+        self.clock = clock
+        self.next_deadline: Optional[float] = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Azzera le statistiche di temporizzazione del periodo"""
+        self.ticks = 0
+        self.skipped_ticks = 0
+        self.overruns = 0
+        self.jitter_sum = 0.0
+        self.jitter_max = 0.0
+
+    def start(self, now: Optional[float] = None) -> float:
+        """Fissa la prima scadenza all'istante corrente"""
+        self.next_deadline = self.clock() if now is None else now
+        return self.next_deadline
+
+    def wait(self, stop_event: threading.Event) -> Optional[float]:
+        """
+        Attende la prossima scadenza
+
+        Returns:
+            La scadenza (teorica) del tick, oppure None se stop_event è stato
+            impostato durante l'attesa
+        """
+        if self.next_deadline is None:
+            self.start()
+
+        delay = self.next_deadline - self.clock()
+        if delay > 0 and stop_event.wait(timeout=delay):
+            return None
+        if stop_event.is_set():
+            return None
+
+        now = self.clock()
+        deadline = self.next_deadline
+        lateness = now - deadline
+
+        if lateness >= self.interval:
+            # Tick persi: li salta e riallinea alla griglia delle scadenze
+            missed = int(lateness // self.interval)
+            self.skipped_ticks += missed
+            self.overruns += 1
+            deadline += missed * self.interval
+            lateness = now - deadline
+
+        self.ticks += 1
+        self.jitter_sum += lateness
+        self.jitter_max = max(self.jitter_max, lateness)
+        self.next_deadline = deadline + self.interval
+        return deadline
+
+    def set_interval(self, interval: float, limit: Optional[float] = None):
+        """
+        Cambia l'intervallo a partire dal prossimo tick
+
+        Args:
+            interval: Nuovo intervallo in secondi
+            limit: Scadenza massima del prossimo tick (es. fine del periodo)
+        """
+        if self.next_deadline is not None:
+            self.next_deadline += interval - self.interval
+            if limit is not None and self.next_deadline > limit:
+                self.next_deadline = limit
+        self.interval = interval
+
+    def stats(self) -> Dict:
+        """Statistiche di temporizzazione dall'ultimo reset"""
+        return {
+            'ticks': self.ticks,
+            'skipped_ticks': self.skipped_ticks,
+            'overruns': self.overruns,
+            'jitter_avg_ms': round(self.jitter_sum / self.ticks * 1000, 2) if self.ticks else 0.0,
+            'jitter_max_ms': round(self.jitter_max * 1000, 2)
+        }
+
+
+class AdaptiveInterval:
+    """
+    Intervallo di campionamento che segue l'andamento delle metriche
+
+    Dopo ogni campione:
+
+    - una metrica oltre la sua soglia (above) porta l'intervallo al minimo
+    - una variazione rapida (change, differenza rispetto al campione
+      precedente) dimezza l'intervallo
+    - altrimenti l'intervallo cresce del fattore growth fino al massimo
+
+    La riduzione è immediata e la crescita graduale, così un picco viene
+    seguito subito mentre il ritorno alla cadenza lenta richiede una serie
+    di campioni stabili.
+    """
+
+    def __init__(self, initial: float, min_interval: float, max_interval: float,
+                 triggers: Dict[str, Dict[str, float]], growth: float = 1.25):
+        """
+        Args:
+            initial: Intervallo di partenza
+            min_interval, max_interval: Limiti dell'intervallo in secondi
+            triggers: Per nome del valore (es. 'cpu', 'temperature') le
+                      chiavi opzionali 'above' (soglia) e 'change'
+                      (differenza tra due campioni consecutivi)
+            growth: Fattore di crescita con metriche stabili
+
+        Raises:
+            ValueError: Se una soglia non è un oggetto con valori numerici
+        """
+        for name, trigger in triggers.items():
+            if not isinstance(trigger, dict) or not all(
+                    isinstance(trigger.get(field, 0), (int, float)) for field in ('above', 'change')):
+                raise ValueError(f"Soglia di campionamento adattivo non valida per {name}: {trigger!r}")
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.triggers = triggers
+        self.growth = growth
+        self.interval = min(self.max_interval, max(self.min_interval, initial))
+        self._previous: Dict[str, float] = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Azzera le statistiche del periodo"""
+        self.used_min = self.interval
+        self.used_max = self.interval
+        self.shortened = 0
+
+    def update(self, values: Dict[str, Optional[float]]) -> float:
+        """
+        Calcola l'intervallo fino al prossimo campione
+
+        Args:
+            values: Valori istantanei dell'ultimo campione
+
+        Returns:
+            Nuovo intervallo in secondi
+        """
+        above = False
+        fast = False
+        for name, trigger in self.triggers.items():
+            value = values.get(name)
+            if value is None:
+                continue
+            if 'above' in trigger and value >= trigger['above']:
+                above = True
+            previous = self._previous.get(name)
+            if previous is not None and 'change' in trigger and abs(value - previous) >= trigger['change']:
+                fast = True
+            self._previous[name] = value
+
+        if above:
+            interval = self.min_interval
+        elif fast:
+            interval = max(self.min_interval, self.interval / 2)
+        else:
+            interval = min(self.max_interval, self.interval * self.growth)
+
+        if interval < self.interval:
+            self.shortened += 1
+        self.interval = interval
+        self.used_min = min(self.used_min, interval)
+        self.used_max = max(self.used_max, interval)
+        return interval
+
+    def stats(self) -> Dict:
+        """Intervalli usati dall'ultimo reset"""
+        return {
+            'min_interval_seconds': round(self.used_min, 2),
+            'max_interval_seconds': round(self.used_max, 2),
+            'shortened': self.shortened
+        }
@@ -0,0 +1,142 @@
+"""
+Strumentazione del monitor: tempi delle funzioni e risorse usate dal processo
+"""
+
+import bisect
+import functools
+import resource
+import threading
+import time
+import psutil
+from typing import Callable, Dict, List
+
+
+# Limiti superiori dei bucket degli istogrammi in millisecondi
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Istogramma a bucket fissi (scala logaritmica) con conteggio, somma e massimo"""
+
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        # Un bucket in più per i valori oltre l'ultimo limite
+        self.buckets: List[int] = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Limite superiore del bucket che contiene il quantile q"""
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict:
+        """Conteggio, media, p95, massimo e bucket non vuoti ('<=limite' -> conteggio)"""
+        histogram = {}
+        for index, count in enumerate(self.buckets):
+            if count:
+                bound = BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else None
+                histogram[f'le_{bound:g}' if bound is not None else 'inf'] = count
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else None,
+            'p95_ms': self.quantile(0.95) if self.count else None,
+            'max_ms': round(self.max_ms, 3),
+            'histogram_ms': histogram
+        }
+
+
+class Instrumentation:
+    """
+    Tempi di esecuzione per nome e risorse del processo del monitor
+
+    Le funzioni da misurare vengono sostituite da wrap() solo quando la
+    strumentazione è abilitata: da disabilitata non c'è nessun wrapper e
+    quindi nessun costo sulle chiamate.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.process = psutil.Process()
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._last_cpu = self._cpu_seconds()
+        self._last_time = clock()
+
+    def _cpu_seconds(self) -> float:
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def record(self, name: str, ms: float):
+        """Registra una durata in millisecondi"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(ms)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Ritorna func con la misura del tempo di ogni chiamata"""
+        record = self.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, (perf_counter() - start) * 1000)
+        return timed
+
+    def instrument(self, obj, names: List[str], prefix: str = ''):
+        """Sostituisce i metodi indicati dell'oggetto con la versione misurata"""
+        for name in names:
+            setattr(obj, name, self.wrap(prefix + name, getattr(obj, name)))
+
+    def report(self, reset: bool = False) -> Dict:
+        """
+        Tempi per funzione e risorse del processo
+
+        Args:
+            reset: Azzera istogrammi e riferimento della CPU (fine periodo)
+
+        Returns:
+            cpu_percent e cpu_seconds (dall'ultimo azzeramento, 100 = un
+            core), rss_mb, peak_rss_mb, threads e timings per nome
+        """
+        now = self.clock()
+        cpu = self._cpu_seconds()
+        with self._lock:
+            timings = {name: self._histograms[name].summary() for name in sorted(self._histograms)}
+            elapsed = now - self._last_time
+            cpu_seconds = cpu - self._last_cpu
+            if reset:
+                self._histograms = {}
+                self._last_cpu, self._last_time = cpu, now
+
+        rss = self.process.memory_info().rss
+        # ru_maxrss è in KiB su Linux e si aggiorna in ritardo rispetto a rss
+        peak_rss = max(rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        return {
+            'cpu_percent': round(cpu_seconds / elapsed * 100, 3) if elapsed > 0 else None,
+            'cpu_seconds': round(cpu_seconds, 3),
+            'rss_mb': round(rss / (1024**2), 2),
+            'peak_rss_mb': round(peak_rss / (1024**2), 2),
+            'threads': self.process.num_threads(),
+            'timings': timings
+        }
@@ -0,0 +1,252 @@
+"""
+Statistiche in streaming a memoria costante per l'aggregazione dei campioni
+"""
+
+import math
+from typing import Dict, List, Optional
+
+
+class P2Quantile:
+    """
+    Stima di un quantile con l'algoritmo P² (Jain & Chlamtac, 1985)
+
+    Mantiene solo 5 marcatori indipendentemente dal numero di valori, quindi
+    memoria e costo per campione sono costanti. Finché i valori sono pochi
+    (fino a EXACT_LIMIT) il quantile viene calcolato esattamente: con un
+    periodo tipico di 12 campioni la stima P² sarebbe troppo grossolana.
+
+    I pesi (durata rappresentata da ogni valore, vedi RunningStats) sono
+    considerati solo nel calcolo esatto; la stima P² li ignora.
+    """
+
+    EXACT_LIMIT = 64
+
+    __slots__ = ('p', '_initial', '_weights', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float):
+        """
+        Args:
+            p: Quantile da stimare (es: 0.95)
+        """
+        self.p = p
+        self._initial: List[float] = []
+        # Pesi dei valori iniziali, None finché sono tutti 1
+        self._weights: Optional[List[float]] = None
+        self._heights: Optional[List[float]] = None
+        self._positions: List[int] = []
+        self._desired: List[float] = []
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def _start_markers(self):
+        """Inizializza i 5 marcatori dai valori raccolti finora"""
+        ordered = sorted(self._initial)
+        last = len(ordered) - 1
+        self._desired = [1 + last * inc for inc in self._increments]
+
+        # Posizioni intere strettamente crescenti, con gli estremi fissi
+        positions = [int(round(d)) for d in self._desired]
+        for i in range(1, 5):
+            positions[i] = max(positions[i], positions[i - 1] + 1)
+        for i in range(3, -1, -1):
+            positions[i] = min(positions[i], positions[i + 1] - 1)
+
+        self._positions = positions
+        self._heights = [ordered[n - 1] for n in positions]
+        self._initial = []
+        self._weights = None
+
+    def add(self, x: float, weight: float = 1.0):
+        """Aggiunge un valore con il suo peso"""
+        if self._heights is None:
+            if weight != 1.0 and self._weights is None:
+                self._weights = [1.0] * len(self._initial)
+            if self._weights is not None:
+                self._weights.append(weight)
+            self._initial.append(x)
+            if len(self._initial) > self.EXACT_LIMIT:
+                self._start_markers()
+            return
+
+        q = self._heights
+        n = self._positions
+
+        # Cella in cui cade il valore (estendendo gli estremi se serve)
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Aggiusta i marcatori centrali verso le posizioni desiderate
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        """Interpolazione parabolica (P²) dell'altezza del marcatore i"""
+        q = self._heights
+        n = self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        """Stima corrente del quantile (None se non ci sono valori)"""
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return None
+        if self._weights is not None:
+            return self._weighted_value()
+        ordered = sorted(self._initial)
+        return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+
+    def _weighted_value(self) -> float:
+        """
+        Quantile pesato dei valori iniziali
+
+        Primo valore (in ordine crescente) in cui il peso cumulato raggiunge
+        la frazione p del totale: con pesi pari alle durate è il valore non
+        superato per la frazione p del tempo. Con pesi tutti uguali si usa
+        il calcolo non pesato.
+        """
+        if min(self._weights) == max(self._weights):
+            ordered = sorted(self._initial)
+            return ordered[min(len(ordered) - 1, int(round(self.p * (len(ordered) - 1))))]
+        pairs = sorted(zip(self._initial, self._weights))
+        target = self.p * sum(weight for _, weight in pairs)
+        cumulative = 0.0
+        for x, weight in pairs:
+            cumulative += weight
+            if cumulative >= target:
+                return x
+        return pairs[-1][0]
+
+
+class RunningStats:
+    """
+    Conteggio, somma, minimo, massimo e somma dei quadrati aggiornati in O(1)
+
+    Ogni valore può avere un peso, la durata che rappresenta: media,
+    deviazione standard e quantile sono pesati (media nel tempo con
+    campionamento a intervallo variabile), mentre total resta la somma
+    semplice dei valori (usata per sommare i contatori).
+    """
+
+    __slots__ = ('count', 'total', 'weight', 'weighted_total', 'total_sq', 'min', 'max', 'quantile')
+
+    def __init__(self, quantile: Optional[float] = None):
+        """
+        Args:
+            quantile: Quantile da stimare in streaming (es: 0.95), o None
+        """
+        self.count = 0
+        self.total = 0.0
+        self.weight = 0.0
+        self.weighted_total = 0.0
+        self.total_sq = 0.0  # Somma pesata dei quadrati
+        self.min = math.inf
+        self.max = -math.inf
+        self.quantile = P2Quantile(quantile) if quantile is not None else None
+
+    def add(self, x: float, weight: float = 1.0):
+        """Aggiunge un valore con il suo peso"""
+        self.count += 1
+        self.total += x
+        self.weight += weight
+        self.weighted_total += weight * x
+        self.total_sq += weight * x * x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if self.quantile is not None:
+            self.quantile.add(x, weight)
+
+    @property
+    def mean(self) -> float:
+        """Media pesata dei valori"""
+        return self.weighted_total / self.weight if self.weight > 0 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        """Deviazione standard pesata (di popolazione)"""
+        if self.weight <= 0:
+            return 0.0
+        variance = self.total_sq / self.weight - self.mean ** 2
+        return math.sqrt(max(0.0, variance))
+
+    def summary(self, suffix: str = '', digits: int = 2) -> Dict:
+        """
+        Riepilogo nel formato del payload
+
+        Args:
+            suffix: Suffisso dei nomi dei campi (es: '_percent')
+            digits: Cifre decimali
+        """
+        if not self.count:
+            return {}
+        result = {
+            f'max{suffix}': round(self.max, digits),
+            f'avg{suffix}': round(self.mean, digits),
+        }
+        if self.quantile is not None:
+            result[f'p{int(round(self.quantile.p * 100))}{suffix}'] = round(self.quantile.value(), digits)
+        result[f'stddev{suffix}'] = round(self.stddev, digits)
+        return result
+
+
+class MetricSet:
+    """Insieme di RunningStats per nome, create al primo valore ricevuto"""
+
+    def __init__(self, quantile: Optional[float] = None):
+        """
+        Args:
+            quantile: Quantile stimato per ogni metrica, o None
+        """
+        self.quantile = quantile
+        self.samples = 0
+        self.metrics: Dict[str, RunningStats] = {}
+        # Peso dei valori aggiunti da ora in poi (secondi rappresentati da
+        # ogni lettura con il campionamento adattivo, altrimenti 1)
+        self.weight = 1.0
+
+    def __len__(self) -> int:
+        return self.samples
+
+    def tick(self):
+        """Conta un campione completo"""
+        self.samples += 1
+
+    def add(self, name: str, value: float, quantile: bool = True):
+        """
+        Aggiunge un valore alla metrica indicata
+
+        Args:
+            quantile: Stima anche il quantile (solo alla creazione della metrica)
+        """
+        stats = self.metrics.get(name)
+        if stats is None:
+            stats = self.metrics[name] = RunningStats(self.quantile if quantile else None)
+        stats.add(value, self.weight)
+
+    def get(self, name: str) -> Optional[RunningStats]:
+        """Statistiche della metrica, o None se non ha ricevuto valori"""
+        return self.metrics.get(name)
@@ -6,6 +6,7 @@ Esegui questo script prima di installare il servizio
 
 import sys
 import json
+import time
 from pathlib import Path
 
 # Aggiungi la directory corrente al path
@@ -75,7 +76,7 @@ def test_system_info():
             if wifi['signal_strength_dbm']:
                 print(f"   ✓ Segnale: {wifi['signal_strength_dbm']} dBm")
             else:
-                print(f"   ⚠  Segnale non disponibile (iwconfig non disponibile?)")
+                print(f"   ⚠  Segnale non disponibile (interfaccia non associata?)")
         else:
             print(f"   ⚠  Non connesso o non disponibile")
         
@@ -88,6 +89,10 @@ def test_system_info():
         
         # Test CPU
         print("\n5. CPU:")
+        # La prima lettura fa solo da riferimento per la successiva
+        monitor.cpu_collector.sample()
+        time.sleep(0.5)
+        monitor.cpu_collector.sample()
         cpu = monitor.get_cpu_usage()
         print(f"   ✓ Utilizzo: {cpu}%")
         
@@ -6,13 +6,23 @@ Utile per testare il sistema senza avere un'API vera
 
 from flask import Flask, request, jsonify
 from datetime import datetime
+import gzip
 import json
+from wire import CONTENT_TYPE_CBOR, DecodeError, apply_delta, decode_cbor, expand_keys
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 app = Flask(__name__)
 
 # Token di esempio (usa lo stesso nel config.json)
 VALID_TOKEN = "test-bearer-token-123456"
 
+# Ultimo payload ricevuto per dispositivo, base dei payload differenziali (api_delta)
+last_payloads = {}
+
 
 @app.route('/monitoring', methods=['POST'])
 def receive_monitoring_data():
@@ -29,15 +39,40 @@ def receive_monitoring_data():
     if token != VALID_TOKEN:
         return jsonify({'error': 'Invalid token'}), 401
     
-    # Ottieni i dati JSON
+    # Ottieni i dati JSON o CBOR (eventualmente compressi, vedi api_compression e api_format)
+    try:
+        body = request.get_data()
+        encoding = request.headers.get('Content-Encoding', '')
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'zstd':
+            if zstandard is None:
+                return jsonify({'error': 'zstd not supported'}), 415
+            body = zstandard.ZstdDecompressor().decompress(body)
+        if request.mimetype == CONTENT_TYPE_CBOR:
+            data = expand_keys(decode_cbor(body))
+        else:
+            data = json.loads(body)
+    except (DecodeError, ValueError) as e:
+        return jsonify({'error': f'Invalid body: {str(e)}'}), 400
+    
+    # Dopo un'interruzione il monitor invia una lista di payload arretrati
+    items = data if isinstance(data, list) else [data]
+    
+    # Ricostruisce i payload differenziali a partire dal precedente dello
+    # stesso dispositivo; se manca (es. server riavviato) il monitor, con
+    # la risposta 409, reinvia il payload completo
     try:
-        data = request.get_json()
-    except Exception as e:
-        return jsonify({'error': f'Invalid JSON: {str(e)}'}), 400
+        for index, item in enumerate(items):
+            item = items[index] = apply_delta(item, last_payloads.get(item.get('device_id')))
+            last_payloads[item.get('device_id')] = item
+    except KeyError:
+        return jsonify({'error': 'Unknown delta base'}), 409
+    data = items if isinstance(data, list) else items[0]
     
     # Stampa i dati ricevuti
     print("\n" + "=" * 80)
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] DATI RICEVUTI DAL RASPBERRY PI")
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] DATI RICEVUTI DAL RASPBERRY PI ({len(items)} payload)")
     print("=" * 80)
     print(json.dumps(data, indent=2, ensure_ascii=False))
     print("=" * 80)
@@ -45,7 +80,8 @@ def receive_monitoring_data():
     
     # Salva in un file (opzionale)
     with open('received_data.jsonl', 'a') as f:
-        f.write(json.dumps(data) + '\n')
+        for item in items:
+            f.write(json.dumps(item) + '\n')
     
     # Risposta di successo
     return jsonify({
@@ -55,6 +91,21 @@ def receive_monitoring_data():
     }), 200
 
 
+@app.route('/alerts', methods=['POST'])
+def receive_alert():
+    """Endpoint che riceve gli allarmi (alert_url)"""
+    if request.headers.get('Authorization', '') != f'Bearer {VALID_TOKEN}':
+        return jsonify({'error': 'Invalid token'}), 401
+    
+    alert = request.get_json(silent=True)
+    if not isinstance(alert, dict):
+        return jsonify({'error': 'Invalid body'}), 400
+    
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ALLARME {alert.get('state', '').upper()} "
+          f"{alert.get('device_id')}: {alert.get('rule')} ({alert.get('condition')}, valore {alert.get('value')})")
+    return jsonify({'status': 'success'}), 200
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -80,6 +131,7 @@ if __name__ == '__main__':
     print()
     print("Endpoints disponibili:")
     print("  POST /monitoring  - Riceve i dati di monitoraggio")
+    print("  POST /alerts      - Riceve gli allarmi (alert_url)")
     print("  GET  /health      - Health check")
     print()
     print("I dati ricevuti verranno salvati in: received_data.jsonl")
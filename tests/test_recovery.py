@@ -0,0 +1,134 @@
+"""
+Test della scala di recupero con un esecutore di comandi finto
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from recovery import RecoveryLadder
+
+
+STEPS = [
+    {'action': 'dhcp', 'after_minutes': 2},
+    {'action': 'reprobe', 'after_minutes': 1},
+    {'action': 'interface', 'after_minutes': 5}
+]
+
+
+class RecoveryLadderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.root, 'recovery.json')
+        self.commands = []
+        self.failing = set()
+        self.online = False
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def runner(self, argv, timeout):
+        self.commands.append(argv)
+        if argv[1] in self.failing:
+            return False, 'comando fallito'
+        return True, ''
+
+    def ladder(self, steps=STEPS, history_path=None) -> RecoveryLadder:
+        return RecoveryLadder(
+            steps, 10, probe=lambda: self.online,
+            history_path=history_path or self.history_path,
+            context=lambda: {'interface': 'eth0', 'module': None},
+            runner=self.runner, wait=lambda seconds: False
+        )
+
+    def test_steps_in_order_of_duration(self):
+        ladder = self.ladder()
+        self.assertEqual([step.action for step in ladder.steps], ['reprobe', 'dhcp', 'interface', 'reboot'])
+        self.assertEqual(ladder.errors, [])
+
+    def test_invalid_steps_are_dropped(self):
+        ladder = RecoveryLadder(
+            [{'action': 'format'}, {'action': 'dhcp', 'after_minutes': 'x'}, {'action': 'reprobe', 'after_minutes': 20}],
+            10, probe=lambda: False, history_path=self.history_path
+        )
+        self.assertEqual([step.action for step in ladder.steps], ['reboot'])
+        self.assertEqual(len(ladder.errors), 3)
+
+    def test_progression(self):
+        ladder = self.ladder()
+        self.assertIsNone(ladder.attempt(30))
+        self.assertEqual(ladder.attempt(60)['action'], 'reprobe')
+        # Un gradino alla volta, ognuno una sola volta per interruzione
+        self.assertIsNone(ladder.attempt(90))
+        record = ladder.attempt(400)
+        self.assertEqual(record['action'], 'dhcp')
+        self.assertEqual(record['result'], 'failed')
+        self.assertEqual(record['commands'], ['sudo dhcpcd --rebind eth0'])
+        self.assertEqual(ladder.attempt(400)['action'], 'interface')
+        self.assertEqual(ladder.due(400), None)
+        self.assertEqual(ladder.due(600), 'reboot')
+        self.assertEqual(self.commands, [
+            ['sudo', 'dhcpcd', '--rebind', 'eth0'],
+            ['sudo', 'ip', 'link', 'set', 'eth0', 'down'],
+            ['sudo', 'ip', 'link', 'set', 'eth0', 'up']
+        ])
+
+    def test_command_error_stops_step(self):
+        self.failing.add('ip')
+        ladder = self.ladder()
+        ladder.attempt(60)
+        ladder.attempt(120)
+        record = ladder.attempt(300)
+        self.assertEqual(record['result'], 'error')
+        self.assertEqual(record['error'], 'comando fallito')
+        self.assertEqual(self.commands[-1], ['sudo', 'ip', 'link', 'set', 'eth0', 'down'])
+
+    def test_reset_on_success(self):
+        ladder = self.ladder()
+        ladder.attempt(60)
+        self.online = True
+        record = ladder.attempt(120)
+        self.assertEqual(record['result'], 'recovered')
+        ladder.reset()
+        # Nuova interruzione: si riparte dal primo gradino
+        self.assertEqual(ladder.attempt(60)['action'], 'reprobe')
+        self.assertEqual(ladder.report()['totals']['dhcp'], {'attempts': 1, 'recovered': 1})
+
+    def test_skipped_without_placeholder_value(self):
+        ladder = self.ladder()
+        ladder.context = lambda: {'interface': None}
+        ladder.attempt(60)
+        record = ladder.attempt(120)
+        self.assertEqual(record['result'], 'skipped')
+        self.assertEqual(self.commands, [])
+
+    def test_reboot_is_retried_and_saved_first(self):
+        ladder = self.ladder()
+        # Anche dopo 10 minuti i gradini precedenti vengono tentati prima
+        self.assertEqual([ladder.attempt(600)['action'] for _ in range(3)], ['reprobe', 'dhcp', 'interface'])
+        for _ in range(2):
+            record = ladder.attempt(600)
+            self.assertEqual(record['action'], 'reboot')
+            self.assertEqual(record['result'], 'rebooting')
+            self.assertEqual(record['commands'], ['sudo reboot'])
+        with open(self.history_path) as f:
+            self.assertEqual(json.load(f)['attempts'][-1]['result'], 'rebooting')
+        # Dopo il riavvio il tentativo risulta eseguito e viene riportato
+        report = self.ladder().report()
+        self.assertEqual(report['attempts'][0]['result'], 'rebooted')
+
+    def test_reboot_when_history_cannot_be_saved(self):
+        blocker = os.path.join(self.root, 'file')
+        open(blocker, 'w').close()
+        ladder = self.ladder(steps=[], history_path=os.path.join(blocker, 'recovery.json'))
+        with self.assertLogs('recovery', level='ERROR'):
+            record = ladder.attempt(600)
+        self.assertEqual(record['result'], 'rebooting')
+        self.assertEqual(self.commands, [['sudo', 'reboot']])
+
+
+if __name__ == '__main__':
+    unittest.main()
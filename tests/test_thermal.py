@@ -0,0 +1,83 @@
+"""
+Test di ThermalCollector su un albero sysfs finto
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from thermal import ThermalCollector, decode_throttled
+
+
+def write(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class ThermalCollectorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.thermal = os.path.join(self.root, 'thermal')
+        self.cpu = os.path.join(self.root, 'cpu')
+        self.throttled = os.path.join(self.root, 'get_throttled')
+        write(os.path.join(self.thermal, 'thermal_zone0', 'type'), 'cpu-thermal\n')
+        write(os.path.join(self.thermal, 'thermal_zone0', 'temp'), '52100\n')
+        write(os.path.join(self.thermal, 'thermal_zone1', 'type'), 'cpu-thermal\n')
+        write(os.path.join(self.thermal, 'thermal_zone1', 'temp'), '61850\n')
+        # Zona senza temp: ignorata
+        write(os.path.join(self.thermal, 'thermal_zone2', 'type'), 'gpu-thermal\n')
+        write(os.path.join(self.cpu, 'cpufreq', 'policy0', 'scaling_cur_freq'), '1500000\n')
+        write(os.path.join(self.cpu, 'cpufreq', 'policy4', 'scaling_cur_freq'), '600000\n')
+        write(self.throttled, '50005\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def collector(self, **kwargs) -> ThermalCollector:
+        options = {'thermal_root': self.thermal, 'cpufreq_root': self.cpu,
+                   'throttled_path': self.throttled, 'vcio_path': None}
+        return ThermalCollector(**{**options, **kwargs})
+
+    def test_sample(self):
+        self.assertEqual(self.collector().sample(), {
+            'zones': {'cpu-thermal': 52.1, 'cpu-thermal-1': 61.85},
+            'temperature_c': 61.85,
+            'cpu_freq_mhz': 1050.0,
+            'throttled': 0x50005
+        })
+
+    def test_per_core_cpufreq(self):
+        shutil.rmtree(os.path.join(self.cpu, 'cpufreq'))
+        for core, freq in (('cpu0', '1200000'), ('cpu1', '1400000')):
+            write(os.path.join(self.cpu, core, 'cpufreq', 'scaling_cur_freq'), freq)
+        self.assertEqual(self.collector().sample()['cpu_freq_mhz'], 1300.0)
+
+    def test_missing_files(self):
+        collector = self.collector(thermal_root=os.path.join(self.root, 'nope'),
+                                   cpufreq_root=os.path.join(self.root, 'nope'),
+                                   throttled_path=os.path.join(self.root, 'nope'))
+        self.assertEqual(collector.sample(), {
+            'zones': {}, 'temperature_c': None, 'cpu_freq_mhz': None, 'throttled': None
+        })
+
+    def test_unreadable_value_is_skipped(self):
+        write(os.path.join(self.thermal, 'thermal_zone1', 'temp'), 'n/a\n')
+        sample = self.collector().sample()
+        self.assertEqual(sample['zones'], {'cpu-thermal': 52.1})
+        self.assertEqual(sample['temperature_c'], 52.1)
+
+    def test_decode_throttled(self):
+        flags = decode_throttled(0x50005)
+        self.assertEqual(flags['current'], {
+            'under_voltage': True, 'freq_capped': False, 'throttled': True, 'soft_temp_limit': False
+        })
+        self.assertEqual(flags['since_boot'], {
+            'under_voltage': True, 'freq_capped': False, 'throttled': True, 'soft_temp_limit': False
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Test della lettura dei parametri WiFi da /proc/net/wireless e nl80211
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from wireless import (
+    NL80211_ATTR_IFINDEX, NL80211_ATTR_STA_INFO, NL80211_RATE_INFO_BITRATE,
+    NL80211_RATE_INFO_BITRATE32, NL80211_STA_INFO_RX_BITRATE, NL80211_STA_INFO_SIGNAL,
+    NL80211_STA_INFO_SIGNAL_AVG, NL80211_STA_INFO_TX_BITRATE, NL80211_STA_INFO_TX_FAILED,
+    NL80211_STA_INFO_TX_RETRIES, WirelessReader, parse_proc_wireless, parse_station_info
+)
+
+
+PROC_NET_WIRELESS = """\
+Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE
+ face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22
+ wlan0: 0000   54.  -56.  -256        0      0      0     12      3        7
+ wlan1: 0000   70.  216.  161.        0      0      0      0      0        0
+ wlan2: 0000    0.    0.     0        0      0      0      0      0        0
+"""
+
+
+def nla(attr_type: int, payload: bytes) -> bytes:
+    """Attributo netlink con padding a 4 byte"""
+    data = struct.pack('HH', 4 + len(payload), attr_type) + payload
+    return data + b'\0' * (-len(data) % 4)
+
+
+class ParseProcWirelessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.result = parse_proc_wireless(PROC_NET_WIRELESS)
+
+    def test_values(self):
+        self.assertEqual(self.result['wlan0'], {
+            'link_quality': 54.0,
+            'signal_dbm': -56,
+            'noise_dbm': None,
+            'discarded_retry': 12,
+            'missed_beacons': 7
+        })
+
+    def test_unsigned_dbm(self):
+        # 216 e 161 sono -40 e -95 dBm riportati senza segno
+        self.assertEqual(self.result['wlan1']['signal_dbm'], -40)
+        self.assertEqual(self.result['wlan1']['noise_dbm'], -95)
+
+    def test_level_not_available(self):
+        self.assertIsNone(self.result['wlan2']['signal_dbm'])
+        self.assertIsNone(self.result['wlan2']['noise_dbm'])
+
+    def test_header_only(self):
+        self.assertEqual(parse_proc_wireless('\n'.join(PROC_NET_WIRELESS.splitlines()[:2])), {})
+
+
+class ParseStationInfoTest(unittest.TestCase):
+
+    def test_values(self):
+        info = (
+            nla(NL80211_STA_INFO_SIGNAL, struct.pack('b', -61))
+            + nla(NL80211_STA_INFO_SIGNAL_AVG, struct.pack('b', -63))
+            + nla(NL80211_STA_INFO_TX_BITRATE, nla(NL80211_RATE_INFO_BITRATE32, struct.pack('I', 8667)))
+            + nla(NL80211_STA_INFO_RX_BITRATE, nla(NL80211_RATE_INFO_BITRATE, struct.pack('H', 540)))
+            + nla(NL80211_STA_INFO_TX_RETRIES, struct.pack('I', 42))
+            + nla(NL80211_STA_INFO_TX_FAILED, struct.pack('I', 3))
+        )
+        payload = nla(NL80211_ATTR_IFINDEX, struct.pack('I', 3)) + nla(NL80211_ATTR_STA_INFO, info)
+        self.assertEqual(parse_station_info(payload), {
+            'signal_dbm': -61,
+            'signal_avg_dbm': -63,
+            'tx_bitrate_mbps': 866.7,
+            'rx_bitrate_mbps': 54.0,
+            'tx_retries': 42,
+            'tx_failed': 3
+        })
+
+    def test_without_station_info(self):
+        self.assertEqual(parse_station_info(nla(NL80211_ATTR_IFINDEX, struct.pack('I', 3))), {})
+
+
+class WirelessReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'w') as f:
+            f.write(PROC_NET_WIRELESS)
+        self.reader = WirelessReader(proc_path=self.path, use_nl80211=False)
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_signal_falls_back_to_nl80211(self):
+        self.reader._station_info = lambda iface: {'signal_dbm': -61, 'tx_bitrate_mbps': 72.2}
+        self.assertEqual(self.reader.read('wlan2')['signal_dbm'], -61)
+        self.assertEqual(self.reader.read('wlan0')['signal_dbm'], -56)
+
+    def test_counters_are_deltas(self):
+        self.assertIsNone(self.reader.read('wlan0')['missed_beacons'])
+        with open(self.path, 'w') as f:
+            f.write(PROC_NET_WIRELESS.replace('3        7', '3        9'))
+        self.assertEqual(self.reader.read('wlan0')['missed_beacons'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Temperatura, frequenza CPU e throttling del SoC letti da sysfs
+"""
+
+import array
+import fcntl
+import glob
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+
+# Bit di get_throttled (firmware Raspberry Pi): condizione attuale nei bit
+# 0-3, condizione verificatasi dall'avvio nei bit 16-19
+THROTTLED_FLAGS = {
+    'under_voltage': 0,
+    'freq_capped': 1,
+    'throttled': 2,
+    'soft_temp_limit': 3
+}
+THROTTLED_OCCURRED_SHIFT = 16
+
+# Mailbox del firmware (/dev/vcio), usata da vcgencmd get_throttled
+MBOX_TAG_GET_THROTTLED = 0x00030046
+MBOX_RESPONSE_OK = 0x80000000
+
+
+def _ioctl_mbox_property() -> int:
+    """IOCTL_MBOX_PROPERTY = _IOWR(100, 0, char *)"""
+    return (3 << 30) | (struct.calcsize('P') << 16) | (100 << 8)
+
+
+def decode_throttled(value: int) -> Dict[str, Dict[str, bool]]:
+    """
+    Decodifica la maschera di get_throttled
+
+    Returns:
+        {'current': {flag: bool}, 'since_boot': {flag: bool}}
+    """
+    return {
+        'current': {name: bool(value >> bit & 1) for name, bit in THROTTLED_FLAGS.items()},
+        'since_boot': {
+            name: bool(value >> (bit + THROTTLED_OCCURRED_SHIFT) & 1)
+            for name, bit in THROTTLED_FLAGS.items()
+        }
+    }
+
+
+class ThermalCollector:
+    """
+    Temperatura delle zone termiche, frequenza CPU e stato di throttling
+
+    Le zone termiche e i file cpufreq sono cercati una sola volta alla
+    creazione; a ogni campione si leggono solo i file già individuati. La
+    maschera di throttling arriva dal file get_throttled del firmware o, se
+    manca, dalla mailbox /dev/vcio (come vcgencmd, ma senza processi esterni).
+    I path radice sono configurabili per poter usare alberi sysfs finti.
+    """
+
+    def __init__(self, thermal_root: str = '/sys/class/thermal',
+                 cpufreq_root: str = '/sys/devices/system/cpu',
+                 throttled_path: str = '/sys/devices/platform/soc/soc:firmware/get_throttled',
+                 vcio_path: Optional[str] = '/dev/vcio'):
+        """
+        Args:
+            thermal_root: Directory delle zone termiche (thermal_zone*)
+            cpufreq_root: Directory delle CPU (cpufreq/policy* o cpu*/cpufreq)
+            throttled_path: File get_throttled del firmware
+            vcio_path: Dispositivo mailbox del firmware (None = non usarlo)
+        """
+        self.throttled_path = throttled_path
+        self.vcio_path = vcio_path
+        self.zones = self._find_zones(thermal_root)
+        self.freq_paths = self._find_freq_paths(cpufreq_root)
+        self._vcio_failed = vcio_path is None
+
+    @staticmethod
+    def _find_zones(root: str) -> List[Tuple[str, str]]:
+        """(nome, path di temp) di ogni zona termica"""
+        zones = []
+        for zone in sorted(glob.glob(os.path.join(root, 'thermal_zone*'))):
+            temp = os.path.join(zone, 'temp')
+            if not os.path.exists(temp):
+                continue
+            try:
+                with open(os.path.join(zone, 'type')) as f:
+                    name = f.read().strip()
+            except OSError:
+                name = os.path.basename(zone)
+            # Nomi duplicati (es. due zone 'cpu-thermal'): si aggiunge l'indice
+            if any(name == existing for existing, _ in zones):
+                name = f"{name}-{os.path.basename(zone)[len('thermal_zone'):]}"
+            zones.append((name, temp))
+        return zones
+
+    @staticmethod
+    def _find_freq_paths(root: str) -> List[str]:
+        """File della frequenza corrente: uno per policy, altrimenti uno per core"""
+        paths = sorted(glob.glob(os.path.join(root, 'cpufreq', 'policy*', 'scaling_cur_freq')))
+        if not paths:
+            paths = sorted(glob.glob(os.path.join(root, 'cpu[0-9]*', 'cpufreq', 'scaling_cur_freq')))
+        return paths
+
+    @staticmethod
+    def _read_int(path: str, base: int = 10) -> Optional[int]:
+        try:
+            with open(path) as f:
+                return int(f.read().strip(), base)
+        except (OSError, ValueError):
+            return None
+
+    def _read_vcio(self) -> Optional[int]:
+        """Maschera di throttling dalla mailbox del firmware"""
+        if self._vcio_failed:
+            return None
+        # Dimensione, codice richiesta, tag, dimensione valore, indicatore, valore, fine
+        buffer = array.array('I', [7 * 4, 0, MBOX_TAG_GET_THROTTLED, 4, 0, 0, 0])
+        try:
+            fd = os.open(self.vcio_path, os.O_RDWR)
+            try:
+                fcntl.ioctl(fd, _ioctl_mbox_property(), buffer, True)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Non è un Raspberry Pi o mancano i permessi: non si riprova
+            self._vcio_failed = True
+            return None
+        return buffer[5] if buffer[1] == MBOX_RESPONSE_OK else None
+
+    def read_throttled(self) -> Optional[int]:
+        """Maschera get_throttled (None se non disponibile)"""
+        value = self._read_int(self.throttled_path, 16)
+        return value if value is not None else self._read_vcio()
+
+    def sample(self) -> Dict:
+        """
+        Letture correnti
+
+        Returns:
+            'zones' (nome -> °C), 'temperature_c' (zona più calda),
+            'cpu_freq_mhz' (media delle policy) e 'throttled' (maschera);
+            i valori non disponibili sono None
+        """
+        zones = {}
+        for name, path in self.zones:
+            value = self._read_int(path)
+            if value is not None:
+                zones[name] = value / 1000
+
+        freqs = [f for f in (self._read_int(path) for path in self.freq_paths) if f is not None]
+        return {
+            'zones': zones,
+            'temperature_c': max(zones.values()) if zones else None,
+            'cpu_freq_mhz': sum(freqs) / len(freqs) / 1000 if freqs else None,
+            'throttled': self.read_throttled()
+        }
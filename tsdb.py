@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Archivio locale di serie temporali (SQLite in modalità WAL) con aggregazioni
+a 1 minuto e a 1 ora, interrogabile anche da riga di comando
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Livelli di aggregazione: nome -> durata del bucket in secondi
+TIERS = {'1m': 60, '1h': 3600}
+
+AGGREGATES = ('avg', 'min', 'max', 'sum', 'count')
+
+
+class TimeSeriesStore:
+    """
+    Serie temporali su SQLite con tre livelli di conservazione
+
+    - raw: ogni campione, conservato per raw_retention secondi
+    - 1m: count/sum/min/max per minuto
+    - 1h: count/sum/min/max per ora
+
+    Le aggregazioni sono aggiornate in modo incrementale a ogni flush, quindi
+    una query su una settimana legge al massimo 168 righe per metrica.
+    """
+
+    MAX_PENDING = 20000
+    PRUNE_INTERVAL = 600
+
+    def __init__(self, path: str, raw_retention: float = 24 * 3600,
+                 minute_retention: float = 7 * 86400, hour_retention: float = 90 * 86400):
+        """
+        Args:
+            path: Path del database SQLite
+            raw_retention: Secondi di conservazione dei campioni grezzi
+            minute_retention: Secondi di conservazione dell'aggregato a 1 minuto
+            hour_retention: Secondi di conservazione dell'aggregato a 1 ora
+        """
+        self.path = path
+        self.retention = {'raw': raw_retention, '1m': minute_retention, '1h': hour_retention}
+        self._pending: List[Tuple[float, str, float]] = []
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._last_prune = 0.0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS raw ('
+            ' metric TEXT NOT NULL, ts REAL NOT NULL, value REAL NOT NULL,'
+            ' PRIMARY KEY (metric, ts)) WITHOUT ROWID'
+        )
+        for tier in TIERS:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS rollup_{tier} ('
+                ' metric TEXT NOT NULL, bucket INTEGER NOT NULL,'
+                ' count INTEGER NOT NULL, sum REAL NOT NULL,'
+                ' min REAL NOT NULL, max REAL NOT NULL,'
+                ' PRIMARY KEY (metric, bucket)) WITHOUT ROWID'
+            )
+        self._conn.commit()
+
+    def add(self, timestamp: float, values: Dict[str, Optional[float]]):
+        """
+        Accoda i valori di un campione (scritti su disco al prossimo flush)
+
+        Args:
+            timestamp: Ora Unix del campione
+            values: Metrica -> valore; i valori None vengono ignorati
+        """
+        with self._pending_lock:
+            if len(self._pending) >= self.MAX_PENDING:
+                # Database non scrivibile da tempo: scarta i più vecchi
+                del self._pending[:len(values)]
+            self._pending.extend(
+                (timestamp, metric, float(value))
+                for metric, value in values.items() if value is not None
+            )
+
+    def flush(self) -> int:
+        """Scrive i campioni in attesa e aggiorna le aggregazioni"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        # Aggregazione in memoria dei nuovi campioni per bucket
+        rollups: Dict[str, Dict[Tuple[str, int], List[float]]] = {tier: {} for tier in TIERS}
+        for ts, metric, value in pending:
+            for tier, seconds in TIERS.items():
+                key = (metric, int(ts // seconds) * seconds)
+                acc = rollups[tier].get(key)
+                if acc is None:
+                    rollups[tier][key] = [1, value, value, value]
+                else:
+                    acc[0] += 1
+                    acc[1] += value
+                    acc[2] = min(acc[2], value)
+                    acc[3] = max(acc[3], value)
+
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO raw (metric, ts, value) VALUES (?, ?, ?)',
+                    [(metric, ts, value) for ts, metric, value in pending]
+                )
+                for tier, buckets in rollups.items():
+                    self._conn.executemany(
+                        f'INSERT INTO rollup_{tier} (metric, bucket, count, sum, min, max)'
+                        ' VALUES (?, ?, ?, ?, ?, ?)'
+                        ' ON CONFLICT (metric, bucket) DO UPDATE SET'
+                        ' count = count + excluded.count, sum = sum + excluded.sum,'
+                        ' min = MIN(min, excluded.min), max = MAX(max, excluded.max)',
+                        [(metric, bucket, *acc) for (metric, bucket), acc in buckets.items()]
+                    )
+        except sqlite3.Error:
+            # Rimette in coda i campioni per il prossimo tentativo
+            with self._pending_lock:
+                self._pending[:0] = pending[-self.MAX_PENDING:]
+            raise
+
+        if time.time() - self._last_prune >= self.PRUNE_INTERVAL:
+            self.prune()
+        return len(pending)
+
+    def prune(self, now: Optional[float] = None):
+        """Elimina i dati oltre il periodo di conservazione di ogni livello"""
+        now = time.time() if now is None else now
+        with self._db_lock, self._conn:
+            self._conn.execute('DELETE FROM raw WHERE ts < ?', (now - self.retention['raw'],))
+            for tier in TIERS:
+                self._conn.execute(
+                    f'DELETE FROM rollup_{tier} WHERE bucket < ?',
+                    (now - self.retention[tier],)
+                )
+        self._last_prune = now
+
+    def metrics(self) -> List[str]:
+        """Nomi delle metriche presenti"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                'SELECT DISTINCT metric FROM rollup_1h ORDER BY metric'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def query(self, metric: str, tier: str = 'auto', agg: str = 'avg',
+              since: Optional[float] = None, until: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Serie di una metrica nell'intervallo richiesto
+
+        Args:
+            metric: Nome della metrica (es: 'cpu')
+            tier: 'raw', '1m', '1h' oppure 'auto' (il livello più fine che
+                  copre ancora tutto l'intervallo)
+            agg: Funzione per i livelli aggregati: avg, min, max, sum, count
+            since: Ora Unix di inizio (default: 24 ore fa)
+            until: Ora Unix di fine (default: adesso)
+
+        Returns:
+            Lista di (ora Unix, valore) in ordine cronologico
+        """
+        now = time.time()
+        until = now if until is None else until
+        since = until - 86400 if since is None else since
+
+        if tier == 'auto':
+            tier = next(
+                (t for t in ('raw', '1m', '1h') if now - since <= self.retention[t]),
+                '1h'
+            )
+        if tier != 'raw' and tier not in TIERS:
+            raise ValueError(f"Livello non valido: {tier}")
+        if agg not in AGGREGATES:
+            raise ValueError(f"Aggregazione non valida: {agg}")
+
+        if tier == 'raw':
+            sql = 'SELECT ts, value FROM raw WHERE metric = ? AND ts >= ? AND ts <= ? ORDER BY ts'
+        else:
+            column = 'sum * 1.0 / count' if agg == 'avg' else agg
+            sql = (f'SELECT bucket, {column} FROM rollup_{tier}'
+                   ' WHERE metric = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket')
+            since = int(since // TIERS[tier]) * TIERS[tier]
+
+        with self._db_lock:
+            return self._conn.execute(sql, (metric, since, until)).fetchall()
+
+    def close(self):
+        """Scrive i dati in attesa e chiude il database"""
+        try:
+            self.flush()
+        finally:
+            with self._db_lock:
+                self._conn.close()
+
+
+def parse_time(value: str, now: float) -> float:
+    """Converte '7d', '12h', '30m', '90s' o una data ISO 8601 in ora Unix"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', value)
+    if match:
+        seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+        return now - float(match.group(1)) * seconds
+    return datetime.fromisoformat(value).timestamp()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Interrogazione dell'archivio da riga di comando"""
+    parser = argparse.ArgumentParser(
+        description="Interroga lo storico locale delle metriche del monitor",
+        epilog="Esempio: tsdb.py cpu --agg max --tier 1h --since 7d"
+    )
+    parser.add_argument('metric', nargs='?', help="Metrica da leggere (senza argomento: elenco metriche)")
+    parser.add_argument('--db', help="Path del database (default: <log_dir>/metrics.db)")
+    parser.add_argument('--tier', default='auto', choices=['auto', 'raw', *TIERS])
+    parser.add_argument('--agg', default='avg', choices=AGGREGATES)
+    parser.add_argument('--since', default='24h', help="Inizio: 7d, 12h, 30m o data ISO (default: 24h)")
+    parser.add_argument('--until', help="Fine: come --since (default: adesso)")
+    parser.add_argument('--json', action='store_true', help="Output JSON")
+    args = parser.parse_args(argv)
+
+    db_path = args.db
+    if db_path is None:
+        from config import Config
+        db_path = str(Path(Config().log_dir) / 'metrics.db')
+    if not Path(db_path).exists():
+        print(f"Database non trovato: {db_path}", file=sys.stderr)
+        return 1
+
+    store = TimeSeriesStore(db_path)
+    if not args.metric:
+        print('\n'.join(store.metrics()))
+        return 0
+
+    now = time.time()
+    rows = store.query(
+        args.metric, tier=args.tier, agg=args.agg,
+        since=parse_time(args.since, now),
+        until=parse_time(args.until, now) if args.until else None
+    )
+
+    if args.json:
+        print(json.dumps([{'timestamp': ts, 'value': value} for ts, value in rows]))
+    else:
+        for ts, value in rows:
+            print(f"{datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')}  {value:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Formato compatto dei payload: CBOR con chiavi numeriche e invio differenziale
+
+Il codec CBOR (RFC 8949) copre solo i tipi presenti nei payload (dict,
+liste, stringhe, interi, float, bool, null) e non richiede pacchetti
+esterni. Le chiavi note sono sostituite dal loro indice in SCHEMA_KEYS;
+le altre (nomi di interfacce, processi, ...) restano stringhe.
+
+In modalità differenziale ogni payload indica in "_base" il timestamp del
+payload precedente confermato dall'API e, in "_same" a ogni livello, le
+chiavi dei sotto-oggetti identici a quelli del payload di base (che non
+vengono inviati). Vedi make_delta e apply_delta.
+"""
+
+import struct
+from typing import Dict, List, Optional
+
+
+CONTENT_TYPE_CBOR = 'application/cbor'
+
+# Versione della tabella delle chiavi, inviata nel Content-Type
+SCHEMA_VERSION = 1
+
+# Tabella fissa delle chiavi: l'indice è il valore inviato al posto della
+# chiave. Si possono solo aggiungere voci in fondo, mai modificarle o
+# riordinarle, altrimenti i server con la tabella precedente leggerebbero
+# chiavi sbagliate (in quel caso va incrementato SCHEMA_VERSION).
+SCHEMA_KEYS = (
+    # Intestazione e blocchi
+    'device_id', 'timestamp', 'period_seconds', 'samples_count',
+    'cpu', 'memory', 'network', 'disk', 'disks', 'pressure', 'load', 'processes',
+    'thermal', 'ethernet', 'wifi', 'interfaces', 'internet', 'self', 'sampling',
+    # Statistiche comuni
+    'max_percent', 'avg_percent', 'p95_percent', 'stddev_percent', 'samples', 'percent',
+    # cpu
+    'iowait_max_percent', 'iowait_avg_percent', 'steal_max_percent', 'steal_avg_percent',
+    'per_core_max_percent', 'per_core_avg_percent',
+    # memory
+    'current', 'total_mb', 'used_mb', 'available_mb',
+    # network
+    'rx', 'tx', 'max_bytes_per_s', 'avg_bytes_per_s', 'max_packets_per_s', 'avg_packets_per_s',
+    'bytes', 'errors', 'drops',
+    # disk, disks
+    'total_gb', 'used_gb', 'free_gb', 'io', 'device',
+    'max_read_iops', 'avg_read_iops', 'max_write_iops', 'avg_write_iops',
+    'max_read_bytes_per_s', 'avg_read_bytes_per_s', 'max_write_bytes_per_s', 'avg_write_bytes_per_s',
+    'max_await_ms', 'avg_await_ms', 'max_util_percent', 'avg_util_percent', 'written_bytes',
+    # pressure, load
+    'some_max_percent', 'some_avg_percent', 'some_stall_ms', 'some_avg10_max', 'some_avg60_max',
+    'full_max_percent', 'full_avg_percent', 'full_stall_ms', 'full_avg10_max', 'full_avg60_max',
+    'load1_max', 'load1_avg', 'load5', 'load15', 'cpu_count',
+    # processes
+    'running', 'pids', 'up_percent', 'restarts', 'rss_max_mb', 'rss_avg_mb',
+    'cpu_max_percent', 'cpu_avg_percent', 'threads_max', 'fds_max',
+    # thermal
+    'max_c', 'avg_c', 'p95_c', 'stddev_c', 'zones',
+    'cpu_freq_max_mhz', 'cpu_freq_avg_mhz', 'cpu_freq_min_mhz',
+    'throttling', 'active', 'active_percent', 'since_boot', 'throttled_mask',
+    # ethernet, wifi, interfaces
+    'interface', 'connected', 'ip_address', 'signal_strength_dbm', 'noise_dbm', 'link_quality',
+    'tx_bitrate_mbps', 'rx_bitrate_mbps', 'tx_retries', 'tx_failed', 'discarded_retry', 'missed_beacons',
+    'type', 'is_up', 'mac_address', 'speed_mbps', 'mtu',
+    # internet
+    'decision_ms', 'dns_ms', 'targets', 'name', 'ok', 'rtt_ms', 'avg_rtt_ms', 'loss_percent', 'window',
+    # self
+    'cpu_percent', 'cpu_seconds', 'rss_mb', 'peak_rss_mb', 'threads', 'timings',
+    'count', 'avg_ms', 'p95_ms', 'max_ms', 'histogram_ms',
+    'le_0.1', 'le_0.25', 'le_0.5', 'le_1', 'le_2.5', 'le_5', 'le_10', 'le_25', 'le_50', 'le_100',
+    'le_250', 'le_500', 'le_1000', 'le_2500', 'le_5000', 'le_10000', 'inf',
+    # sampling
+    'interval_seconds', 'expected_samples', 'ticks', 'skipped_ticks', 'overruns',
+    'jitter_avg_ms', 'jitter_max_ms',
+    # Modalità differenziale
+    '_base', '_same',
+    # sampling con campionamento adattivo
+    'adaptive', 'min_interval_seconds', 'max_interval_seconds', 'shortened',
+    # alerts
+    'alerts', 'firing', 'rules', 'fired', 'value', 'suppressed',
+    # recovery
+    'recovery', 'attempts', 'totals', 'action', 'outage_seconds', 'commands', 'error', 'result',
+    'duration_ms', 'recovered'
+)
+
+_KEY_INDEX = {key: index for index, key in enumerate(SCHEMA_KEYS)}
+
+
+class DecodeError(ValueError):
+    """Dati CBOR non validi o non supportati"""
+
+
+# --- Chiavi numeriche ---
+
+def compact_keys(obj):
+    """Sostituisce le chiavi note con il loro indice in SCHEMA_KEYS"""
+    if isinstance(obj, dict):
+        return {_KEY_INDEX.get(key, key): compact_keys(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [compact_keys(value) for value in obj]
+    return obj
+
+
+def expand_keys(obj):
+    """Inverso di compact_keys"""
+    if isinstance(obj, dict):
+        result = {}
+        for key, value in obj.items():
+            if isinstance(key, int):
+                if not 0 <= key < len(SCHEMA_KEYS):
+                    raise DecodeError(f"Chiave {key} non presente nella tabella (schema {SCHEMA_VERSION})")
+                key = SCHEMA_KEYS[key]
+            result[key] = expand_keys(value)
+        return result
+    if isinstance(obj, list):
+        return [expand_keys(value) for value in obj]
+    return obj
+
+
+# --- CBOR ---
+
+def _head(major: int, value: int) -> bytes:
+    """Byte iniziale con tipo e argomento (lunghezza o valore)"""
+    if value < 24:
+        return bytes((major << 5 | value,))
+    if value < 0x100:
+        return struct.pack('>BB', major << 5 | 24, value)
+    if value < 0x10000:
+        return struct.pack('>BH', major << 5 | 25, value)
+    if value < 0x100000000:
+        return struct.pack('>BI', major << 5 | 26, value)
+    return struct.pack('>BQ', major << 5 | 27, value)
+
+
+def _encode_float(value: float) -> bytes:
+    """Float nella precisione più corta che lo rappresenta esattamente"""
+    for fmt, additional in (('>e', 25), ('>f', 26)):
+        try:
+            packed = struct.pack(fmt, value)
+        except OverflowError:
+            continue
+        if struct.unpack(fmt, packed)[0] == value or value != value:
+            return bytes((0xe0 | additional,)) + packed
+    return b'\xfb' + struct.pack('>d', value)
+
+
+def _encode(obj, out: List[bytes]):
+    if obj is None:
+        out.append(b'\xf6')
+    elif obj is True:
+        out.append(b'\xf5')
+    elif obj is False:
+        out.append(b'\xf4')
+    elif isinstance(obj, int):
+        if obj >= 0:
+            out.append(_head(0, obj))
+        else:
+            out.append(_head(1, -1 - obj))
+    elif isinstance(obj, float):
+        out.append(_encode_float(obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        out.append(_head(3, len(data)))
+        out.append(data)
+    elif isinstance(obj, (bytes, bytearray)):
+        out.append(_head(2, len(obj)))
+        out.append(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        out.append(_head(4, len(obj)))
+        for value in obj:
+            _encode(value, out)
+    elif isinstance(obj, dict):
+        out.append(_head(5, len(obj)))
+        for key, value in obj.items():
+            _encode(key, out)
+            _encode(value, out)
+    else:
+        raise TypeError(f"Tipo non serializzabile in CBOR: {type(obj).__name__}")
+
+
+def encode_cbor(obj) -> bytes:
+    """Serializza obj in CBOR"""
+    out: List[bytes] = []
+    _encode(obj, out)
+    return b''.join(out)
+
+
+class _Decoder:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def _take(self, size: int) -> bytes:
+        end = self.pos + size
+        if end > len(self.data):
+            raise DecodeError("Dati CBOR troncati")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def _argument(self, additional: int) -> int:
+        if additional < 24:
+            return additional
+        if additional == 24:
+            return self._take(1)[0]
+        if additional == 25:
+            return struct.unpack('>H', self._take(2))[0]
+        if additional == 26:
+            return struct.unpack('>I', self._take(4))[0]
+        if additional == 27:
+            return struct.unpack('>Q', self._take(8))[0]
+        raise DecodeError(f"Lunghezza indefinita o riservata non supportata ({additional})")
+
+    def decode(self):
+        initial = self._take(1)[0]
+        major, additional = initial >> 5, initial & 0x1f
+        if major == 7:
+            if additional == 20:
+                return False
+            if additional == 21:
+                return True
+            if additional in (22, 23):
+                return None
+            if additional == 25:
+                return struct.unpack('>e', self._take(2))[0]
+            if additional == 26:
+                return struct.unpack('>f', self._take(4))[0]
+            if additional == 27:
+                return struct.unpack('>d', self._take(8))[0]
+            raise DecodeError(f"Valore semplice non supportato ({additional})")
+
+        value = self._argument(additional)
+        if major == 0:
+            return value
+        if major == 1:
+            return -1 - value
+        if major == 2:
+            return self._take(value)
+        if major == 3:
+            return self._take(value).decode('utf-8')
+        if major == 4:
+            return [self.decode() for _ in range(value)]
+        if major == 5:
+            result = {}
+            for _ in range(value):
+                key = self.decode()
+                result[key] = self.decode()
+            return result
+        raise DecodeError(f"Tipo CBOR non supportato ({major})")
+
+
+def decode_cbor(data: bytes):
+    """Deserializza un documento CBOR prodotto da encode_cbor"""
+    decoder = _Decoder(data)
+    obj = decoder.decode()
+    if decoder.pos != len(data):
+        raise DecodeError("Dati in eccesso dopo il documento CBOR")
+    return obj
+
+
+# --- Modalità differenziale ---
+
+def _diff(new: Dict, old: Dict) -> Dict:
+    result = {}
+    same = []
+    for key, value in new.items():
+        old_value = old.get(key)
+        if isinstance(value, (dict, list)) and value == old_value:
+            same.append(key)
+        elif isinstance(value, dict) and isinstance(old_value, dict):
+            result[key] = _diff(value, old_value)
+        else:
+            result[key] = value
+    if same:
+        result['_same'] = same
+    return result
+
+
+def make_delta(payload: Dict, base: Dict) -> Dict:
+    """
+    Payload con i sotto-oggetti uguali a quelli di base sostituiti da riferimenti
+
+    Oggetti e liste identici sono elencati in "_same"; gli oggetti cambiati
+    sono a loro volta differenziali rispetto all'oggetto di base con la
+    stessa chiave. I valori semplici sono sempre inviati.
+    """
+    delta = _diff(payload, base)
+    delta['_base'] = base.get('timestamp')
+    return delta
+
+
+def _apply(delta: Dict, old: Dict) -> Dict:
+    result = {}
+    for key in delta.get('_same', ()):
+        if key not in old:
+            raise KeyError(key)
+        result[key] = old[key]
+    for key, value in delta.items():
+        if key in ('_same', '_base'):
+            continue
+        old_value = old.get(key)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            result[key] = _apply(value, old_value)
+        else:
+            result[key] = value
+    return result
+
+
+def apply_delta(delta: Dict, base: Optional[Dict]) -> Dict:
+    """
+    Ricostruisce il payload completo (lato server)
+
+    Raises:
+        KeyError: Se base non è il payload a cui fa riferimento delta
+    """
+    if '_base' not in delta:
+        return delta
+    if base is None or base.get('timestamp') != delta['_base']:
+        raise KeyError('_base')
+    return _apply(delta, base)
+
+
+def make_delta_batch(payloads: List[Dict], base: Optional[Dict]) -> List[Dict]:
+    """Lista di payload in cui ognuno è differenziale rispetto al precedente"""
+    result = []
+    for payload in payloads:
+        result.append(make_delta(payload, base) if base is not None else payload)
+        base = payload
+    return result
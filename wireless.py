@@ -0,0 +1,300 @@
+"""
+Lettura dei parametri WiFi senza processi esterni (/proc/net/wireless e nl80211)
+"""
+
+import os
+import socket
+import struct
+import threading
+from typing import Dict, Optional
+
+
+# Netlink
+NETLINK_GENERIC = 16
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLA_TYPE_MASK = 0x3fff
+
+# Controller generic netlink
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+# nl80211
+NL80211_CMD_GET_STATION = 17
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_STA_INFO = 21
+NL80211_STA_INFO_SIGNAL = 7
+NL80211_STA_INFO_TX_BITRATE = 8
+NL80211_STA_INFO_TX_RETRIES = 11
+NL80211_STA_INFO_TX_FAILED = 12
+NL80211_STA_INFO_SIGNAL_AVG = 13
+NL80211_STA_INFO_RX_BITRATE = 14
+NL80211_RATE_INFO_BITRATE = 1
+NL80211_RATE_INFO_BITRATE32 = 5
+
+
+def parse_proc_wireless(text: str) -> Dict[str, Dict]:
+    """
+    Interpreta il contenuto di /proc/net/wireless
+
+    Returns:
+        Interfaccia -> valori (qualità del link, segnale e rumore in dBm,
+        pacchetti scartati per ritrasmissioni, beacon persi)
+    """
+    result = {}
+    for line in text.splitlines()[2:]:
+        if ':' not in line:
+            continue
+        name, _, values = line.partition(':')
+        fields = values.split()
+        if len(fields) < 10:
+            continue
+
+        def number(value: str) -> Optional[float]:
+            try:
+                return float(value.rstrip('.'))
+            except ValueError:
+                return None
+
+        level = number(fields[2])
+        noise = number(fields[3])
+        # Alcuni driver riportano i dBm come valore senza segno (es: 216 = -40)
+        if level is not None and level > 63:
+            level -= 256
+        if noise is not None and noise > 63:
+            noise -= 256
+
+        result[name.strip()] = {
+            'link_quality': number(fields[1]),
+            'signal_dbm': int(level) if level is not None and level != 0 else None,
+            # -256 (o 0) indica rumore non disponibile
+            'noise_dbm': int(noise) if noise is not None and -256 < noise < 0 else None,
+            'discarded_retry': int(fields[7]),
+            'missed_beacons': int(fields[9])
+        }
+    return result
+
+
+def parse_attributes(data: bytes) -> Dict[int, bytes]:
+    """Interpreta una sequenza di attributi netlink (tipo -> payload)"""
+    attrs = {}
+    offset = 0
+    while offset + 4 <= len(data):
+        length, attr_type = struct.unpack_from('HH', data, offset)
+        if length < 4:
+            break
+        attrs[attr_type & NLA_TYPE_MASK] = data[offset + 4:offset + length]
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def _bitrate_mbps(data: bytes) -> Optional[float]:
+    """Bitrate da un attributo nl80211_rate_info (unità di 100 kbit/s)"""
+    rate = parse_attributes(data)
+    if NL80211_RATE_INFO_BITRATE32 in rate:
+        return struct.unpack('I', rate[NL80211_RATE_INFO_BITRATE32][:4])[0] / 10
+    if NL80211_RATE_INFO_BITRATE in rate:
+        return struct.unpack('H', rate[NL80211_RATE_INFO_BITRATE][:2])[0] / 10
+    return None
+
+
+def parse_station_info(payload: bytes) -> Dict:
+    """
+    Interpreta gli attributi di una risposta NL80211_CMD_GET_STATION
+
+    Args:
+        payload: Attributi del messaggio (dopo l'intestazione genetlink)
+    """
+    attrs = parse_attributes(payload)
+    if NL80211_ATTR_STA_INFO not in attrs:
+        return {}
+    info = parse_attributes(attrs[NL80211_ATTR_STA_INFO])
+
+    result = {}
+    for key, attr in (('signal_dbm', NL80211_STA_INFO_SIGNAL),
+                      ('signal_avg_dbm', NL80211_STA_INFO_SIGNAL_AVG)):
+        if attr in info:
+            result[key] = struct.unpack('b', info[attr][:1])[0]
+    for key, attr in (('tx_bitrate_mbps', NL80211_STA_INFO_TX_BITRATE),
+                      ('rx_bitrate_mbps', NL80211_STA_INFO_RX_BITRATE)):
+        if attr in info:
+            result[key] = _bitrate_mbps(info[attr])
+    for key, attr in (('tx_retries', NL80211_STA_INFO_TX_RETRIES),
+                      ('tx_failed', NL80211_STA_INFO_TX_FAILED)):
+        if attr in info:
+            result[key] = struct.unpack('I', info[attr][:4])[0]
+    return result
+
+
+class Nl80211Client:
+    """Client minimale nl80211 (generic netlink) per le statistiche della stazione"""
+
+    def __init__(self):
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+        self._sock.settimeout(1.0)
+        self._sock.bind((0, 0))
+        self._seq = 0
+        self.family_id = self._resolve_family('nl80211')
+
+    def _request(self, msg_type: int, flags: int, cmd: int, attrs: bytes):
+        """Invia una richiesta e ritorna i payload delle risposte"""
+        self._seq += 1
+        body = struct.pack('BBH', cmd, 1, 0) + attrs
+        header = struct.pack('IHHII', 16 + len(body), msg_type, NLM_F_REQUEST | flags, self._seq, 0)
+        self._sock.send(header + body)
+
+        payloads = []
+        while True:
+            data = self._sock.recv(65536)
+            offset = 0
+            while offset + 16 <= len(data):
+                length, reply_type, _, seq, _ = struct.unpack_from('IHHII', data, offset)
+                if length < 16:
+                    return payloads
+                message = data[offset + 16:offset + length]
+                offset += (length + 3) & ~3
+                if seq != self._seq:
+                    continue
+                if reply_type == NLMSG_DONE:
+                    return payloads
+                if reply_type == NLMSG_ERROR:
+                    error = struct.unpack_from('i', message)[0]
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                    return payloads
+                # Salta l'intestazione genetlink (cmd, versione, riservato)
+                payloads.append(message[4:])
+            if not flags & NLM_F_DUMP:
+                return payloads
+
+    @staticmethod
+    def _attr(attr_type: int, value: bytes) -> bytes:
+        data = struct.pack('HH', 4 + len(value), attr_type) + value
+        return data + b'\0' * (-len(data) % 4)
+
+    def _resolve_family(self, name: str) -> int:
+        payloads = self._request(
+            GENL_ID_CTRL, 0, CTRL_CMD_GETFAMILY,
+            self._attr(CTRL_ATTR_FAMILY_NAME, name.encode() + b'\0')
+        )
+        for payload in payloads:
+            attrs = parse_attributes(payload)
+            if CTRL_ATTR_FAMILY_ID in attrs:
+                return struct.unpack('H', attrs[CTRL_ATTR_FAMILY_ID][:2])[0]
+        raise OSError(f"Famiglia generic netlink non trovata: {name}")
+
+    def station_info(self, ifindex: int) -> Dict:
+        """Statistiche dell'access point a cui è associata l'interfaccia"""
+        payloads = self._request(
+            self.family_id, NLM_F_DUMP, NL80211_CMD_GET_STATION,
+            self._attr(NL80211_ATTR_IFINDEX, struct.pack('I', ifindex))
+        )
+        for payload in payloads:
+            info = parse_station_info(payload)
+            if info:
+                return info
+        return {}
+
+    def close(self):
+        self._sock.close()
+
+
+class WirelessReader:
+    """
+    Parametri del collegamento WiFi letti in-process
+
+    Segnale, rumore, qualità e beacon persi arrivano da /proc/net/wireless;
+    bitrate, ritrasmissioni e invii falliti da nl80211 se disponibile. I
+    contatori sono riportati come differenza rispetto alla lettura
+    precedente della stessa interfaccia.
+    """
+
+    COUNTERS = ('discarded_retry', 'missed_beacons', 'tx_retries', 'tx_failed')
+
+    def __init__(self, proc_path: str = '/proc/net/wireless', use_nl80211: bool = True):
+        """
+        Args:
+            proc_path: Path di /proc/net/wireless (sostituibile nei test)
+            use_nl80211: Interroga anche nl80211 per bitrate e ritrasmissioni
+        """
+        self.proc_path = proc_path
+        self.use_nl80211 = use_nl80211
+        self._nl: Optional[Nl80211Client] = None
+        self._nl_failed = False
+        self._last_counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _station_info(self, iface: str) -> Dict:
+        """Statistiche nl80211 (vuote se nl80211 non è disponibile)"""
+        if not self.use_nl80211 or self._nl_failed:
+            return {}
+        try:
+            if self._nl is None:
+                self._nl = Nl80211Client()
+            return self._nl.station_info(socket.if_nametoindex(iface))
+        except OSError:
+            # Kernel senza nl80211 o interfaccia non associata
+            if self._nl is None:
+                self._nl_failed = True
+            return {}
+
+    def read(self, iface: str) -> Dict:
+        """
+        Parametri del collegamento per l'interfaccia
+
+        Returns:
+            signal_dbm, noise_dbm, link_quality, tx/rx_bitrate_mbps e
+            contatori nel periodo (None se non disponibili)
+        """
+        try:
+            with open(self.proc_path) as f:
+                proc = parse_proc_wireless(f.read()).get(iface, {})
+        except OSError:
+            proc = {}
+
+        with self._lock:
+            station = self._station_info(iface)
+
+            # Livello assente o nullo in /proc/net/wireless (None): si usa nl80211
+            signal_dbm = proc.get('signal_dbm')
+            if signal_dbm is None:
+                signal_dbm = station.get('signal_dbm')
+
+            result = {
+                'signal_dbm': signal_dbm,
+                'noise_dbm': proc.get('noise_dbm'),
+                'link_quality': proc.get('link_quality'),
+                'tx_bitrate_mbps': station.get('tx_bitrate_mbps'),
+                'rx_bitrate_mbps': station.get('rx_bitrate_mbps')
+            }
+
+            counters = {**{k: proc[k] for k in self.COUNTERS if k in proc},
+                        **{k: station[k] for k in self.COUNTERS if k in station}}
+            last = self._last_counters.get(iface, {})
+            for key in self.COUNTERS:
+                if key not in counters or key not in last:
+                    result[key] = None
+                elif counters[key] >= last[key]:
+                    result[key] = counters[key] - last[key]
+                else:
+                    # Contatore azzerato (driver ricaricato, riassociazione)
+                    result[key] = counters[key]
+            self._last_counters[iface] = counters
+        return result
+
+    def signal_dbm(self, iface: str) -> Optional[float]:
+        """Solo il segnale da /proc/net/wireless, senza toccare i contatori del periodo"""
+        try:
+            with open(self.proc_path) as f:
+                return parse_proc_wireless(f.read()).get(iface, {}).get('signal_dbm')
+        except OSError:
+            return None
+
+    def close(self):
+        if self._nl is not None:
+            self._nl.close()
+            self._nl = None